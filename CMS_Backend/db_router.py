@@ -0,0 +1,251 @@
+"""
+Read replicas with read-your-writes stickiness.
+
+ReplicaRouter sends reads to a replica only while ReplicaMiddleware has
+picked one for the current request, which it does for safe-method (GET,
+HEAD, OPTIONS) requests under ``READ_REPLICA_PATHS``. Everything else
+(unsafe requests, management commands, background threads) reads and writes
+``default``. Once a request writes anything, its remaining reads go to the
+primary as well.
+
+A request that writes also pins its client (the JWT user, or the session)
+to the primary for ``READ_REPLICA_STICKY_SECONDS``, so the next reads see
+the write even if the replicas have not replayed it yet. That only holds if
+the pin outlasts the lag a replica in rotation can have, so the middleware
+requires it to be at least ``READ_REPLICA_MAX_LAG`` plus
+``READ_REPLICA_CHECK_INTERVAL``. The pin is kept in
+the cache; with the default per-process LocMemCache it only holds within one
+worker, so use a shared cache (see CACHES) when running several.
+
+Replicas are chosen by weight (``DATABASE_REPLICAS``). Each process checks a
+replica at most every ``READ_REPLICA_CHECK_INTERVAL`` seconds; one that
+cannot be queried or lags more than ``READ_REPLICA_MAX_LAG`` seconds leaves
+the rotation until a later check passes. With no healthy replica, reads use
+the primary. Code that fills a shared cache from the database wraps its
+queries in ``reads_from_primary()`` so a lagging replica's rows are never
+cached under a version that is newer than they are.
+"""
+
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.http import FileResponse
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+logger = logging.getLogger(__name__)
+
+STICKY_CACHE_PREFIX = "db-sticky:"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Seconds the replica is behind. A replica that has replayed everything it
+# received reports 0 even if the primary has been idle for a while.
+LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+
+class RequestRouting:
+    """Routing state of one request"""
+
+    def __init__(self, replica=None):
+        self.replica = replica
+        self.wrote = False
+
+
+_routing = ContextVar("db_routing", default=None)
+
+
+@contextmanager
+def reads_from_primary():
+    """Send the block's reads to the primary, e.g. to fill a shared cache"""
+    outer = _routing.get()
+    routing = RequestRouting()
+    token = _routing.set(routing)
+    try:
+        yield
+    finally:
+        _routing.reset(token)
+        if outer is not None and routing.wrote:
+            outer.wrote = True
+
+
+def replica_lag(alias):
+    with connections[alias].cursor() as cursor:
+        cursor.execute(LAG_SQL)
+        return float(cursor.fetchone()[0])
+
+
+class ReplicaPool:
+    """Weighted choice among the replicas that passed their last check"""
+
+    def __init__(self):
+        self._checks = {}  # alias -> (healthy, checked at)
+        self._lock = threading.Lock()
+
+    def healthy(self, alias):
+        now = time.monotonic()
+        with self._lock:
+            check = self._checks.get(alias)
+        if check is not None and now - check[1] < settings.READ_REPLICA_CHECK_INTERVAL:
+            return check[0]
+        healthy = self.check(alias)
+        with self._lock:
+            self._checks[alias] = (healthy, now)
+        return healthy
+
+    def check(self, alias):
+        try:
+            lag = replica_lag(alias)
+        except DatabaseError as exc:
+            logger.warning("Replica %s failed its health check: %s", alias, exc)
+            connections[alias].close()
+            return False
+        if lag > settings.READ_REPLICA_MAX_LAG:
+            logger.warning("Replica %s is %.1fs behind the primary", alias, lag)
+            return False
+        return True
+
+    def choose(self):
+        candidates = [
+            (alias, weight)
+            for alias, weight in settings.DATABASE_REPLICAS.items()
+            if weight > 0 and self.healthy(alias)
+        ]
+        if not candidates:
+            return None
+        aliases, weights = zip(*candidates)
+        return random.choices(aliases, weights)[0]
+
+    def reset(self):
+        with self._lock:
+            self._checks.clear()
+
+
+pool = ReplicaPool()
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        routing = _routing.get()
+        if routing is None or routing.replica is None or routing.wrote:
+            return DEFAULT_DB_ALIAS
+        return routing.replica
+
+    def db_for_write(self, model, **hints):
+        routing = _routing.get()
+        if routing is not None:
+            routing.wrote = True
+        # Explicit, or instances read from a replica would be saved back to it
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+# -----------------------------
+# Middleware
+# -----------------------------
+def client_key(request):
+    """Who to pin after a write: the JWT user, else the session, else None"""
+    header = request.headers.get("Authorization", "")
+    if header.startswith("Bearer "):
+        try:
+            token = AccessToken(header.removeprefix("Bearer "))
+        except TokenError:
+            return None
+        return f"user:{token[jwt_settings.USER_ID_CLAIM]}"
+    session = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    return f"session:{session}" if session else None
+
+
+def is_pinned(key):
+    return key is not None and cache.get(STICKY_CACHE_PREFIX + key) is not None
+
+
+def pin_to_primary(key):
+    cache.set(STICKY_CACHE_PREFIX + key, 1, settings.READ_REPLICA_STICKY_SECONDS)
+
+
+def _with_routing(content, routing):
+    """Keep a streaming response's reads (exports, archives) on its replica"""
+    iterator = iter(content)
+    while True:
+        token = _routing.set(routing)
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            _routing.reset(token)
+        yield chunk
+
+
+def check_sticky_seconds():
+    longest_lag = settings.READ_REPLICA_MAX_LAG + settings.READ_REPLICA_CHECK_INTERVAL
+    if settings.READ_REPLICA_STICKY_SECONDS < longest_lag:
+        raise ImproperlyConfigured(
+            f"READ_REPLICA_STICKY_SECONDS ({settings.READ_REPLICA_STICKY_SECONDS}) "
+            "must be at least READ_REPLICA_MAX_LAG + READ_REPLICA_CHECK_INTERVAL "
+            f"({longest_lag}), or clients may read from a replica that has not "
+            "applied their writes yet."
+        )
+
+
+class ReplicaMiddleware:
+    def __init__(self, get_response):
+        check_sticky_seconds()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        key = client_key(request)
+        replica = None
+        if self.reads_from_replica(request) and not is_pinned(key):
+            replica = pool.choose()
+        request.db_replica = replica
+
+        routing = RequestRouting(replica)
+        token = _routing.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+            if routing.wrote and key is not None:
+                pin_to_primary(key)
+        # Only plain sync iterators: async streams (SSE) cannot be wrapped
+        # here, and FileResponse must keep its file for wsgi.file_wrapper.
+        if (
+            replica is not None
+            and response.streaming
+            and not response.is_async
+            and not isinstance(response, FileResponse)
+        ):
+            response.streaming_content = _with_routing(
+                response.streaming_content, routing
+            )
+        return response
+
+    @staticmethod
+    def reads_from_replica(request):
+        return (
+            bool(settings.DATABASE_REPLICAS)
+            and request.method in SAFE_METHODS
+            and request.path.startswith(tuple(settings.READ_REPLICA_PATHS))
+        )
@@ -0,0 +1,261 @@
+"""
+Per-request SQL and latency metrics.
+
+MetricsMiddleware times every request and, through ``execute_wrapper`` on
+each database connection, counts its queries and their time. Results are
+recorded per route (the URL pattern's view name, e.g. ``contracts-detail``)
+in in-process histograms that ``/metrics`` exposes in the Prometheus text
+format. The phases are:
+
+* ``view``: from URL resolution to the view's return, including serializer
+  work done inside the view;
+* ``render``: rendering the response (DRF's JSON encoding);
+* ``total``: the whole middleware chain.
+
+Histograms live in the memory of each server process; scrape every process
+(or run one process per target) to see all traffic.
+
+Admins can ask for a ``Server-Timing`` header on any response by sending
+``X-Server-Timing: 1``; browsers show it in their network panel.
+"""
+
+import bisect
+import hmac
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import Http404, HttpResponse
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    """Cumulative histogram with one series per label tuple"""
+
+    def __init__(self, name, help, labels, buckets):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [
+                    [0] * (len(self.buckets) + 1),
+                    0.0,
+                ]
+            series[0][index] += 1
+            series[1] += value
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def collect(self):
+        """The series as Prometheus exposition lines"""
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = sorted(
+                (labels, list(counts), total)
+                for labels, (counts, total) in self._series.items()
+            )
+        for label_values, counts, total in series:
+            labels = ",".join(
+                f'{name}="{_escape(value)}"'
+                for name, value in zip(self.labels, label_values)
+            )
+            prefix = f"{labels}," if labels else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}'
+            cumulative += counts[-1]
+            yield f'{self.name}_bucket{{{prefix}le="+Inf"}} {cumulative}'
+            yield f"{self.name}_sum{{{labels}}} {total}"
+            yield f"{self.name}_count{{{labels}}} {cumulative}"
+
+
+def _escape(value):
+    return str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+REQUEST_DURATION = Histogram(
+    "cms_request_duration_seconds",
+    "Time spent in the middleware chain per request.",
+    ("route", "method", "status"),
+    LATENCY_BUCKETS,
+)
+VIEW_DURATION = Histogram(
+    "cms_view_duration_seconds",
+    "Time spent in the view, including serializers.",
+    ("route", "method"),
+    LATENCY_BUCKETS,
+)
+RENDER_DURATION = Histogram(
+    "cms_render_duration_seconds",
+    "Time spent rendering the response.",
+    ("route", "method"),
+    LATENCY_BUCKETS,
+)
+DB_QUERIES = Histogram(
+    "cms_db_queries",
+    "SQL queries executed per request.",
+    ("route", "method"),
+    QUERY_BUCKETS,
+)
+DB_DURATION = Histogram(
+    "cms_db_duration_seconds",
+    "Time spent executing SQL per request.",
+    ("route", "method"),
+    LATENCY_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    "cms_response_size_bytes",
+    "Response body size (not recorded for streaming responses of unknown length).",
+    ("route", "method"),
+    SIZE_BUCKETS,
+)
+HISTOGRAMS = (
+    REQUEST_DURATION,
+    VIEW_DURATION,
+    RENDER_DURATION,
+    DB_QUERIES,
+    DB_DURATION,
+    RESPONSE_SIZE,
+)
+
+
+def reset_metrics():
+    for histogram in HISTOGRAMS:
+        histogram.clear()
+
+
+class QueryTimer:
+    """``execute_wrapper`` hook counting queries and their duration"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+def route_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.view_name or match.route
+
+
+def wants_server_timing(request):
+    if request.headers.get("X-Server-Timing") != "1":
+        return False
+    user = getattr(request, "user", None)
+    return bool(
+        getattr(user, "is_authenticated", False)
+        and (user.is_staff or getattr(user, "role", None) == "admin")
+    )
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        request._metrics = {"timer": timer}
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+
+        marks = request._metrics
+        view = render = None
+        if "view_start" in marks:
+            view_end = marks.get("view_end", start + total)
+            view = view_end - marks["view_start"]
+            if "render_end" in marks:
+                render = marks["render_end"] - view_end
+
+        route, method = route_name(request), request.method
+        REQUEST_DURATION.observe(total, route, method, response.status_code)
+        DB_QUERIES.observe(timer.count, route, method)
+        DB_DURATION.observe(timer.duration, route, method)
+        if view is not None:
+            VIEW_DURATION.observe(view, route, method)
+        if render is not None:
+            RENDER_DURATION.observe(render, route, method)
+        size = self.response_size(response)
+        if size is not None:
+            RESPONSE_SIZE.observe(size, route, method)
+
+        if wants_server_timing(request):
+            phases = [
+                f'db;dur={timer.duration * 1000:.1f};desc="{timer.count} queries"'
+            ]
+            if view is not None:
+                phases.append(f"view;dur={view * 1000:.1f}")
+            if render is not None:
+                phases.append(f"render;dur={render * 1000:.1f}")
+            phases.append(f"total;dur={total * 1000:.1f}")
+            response["Server-Timing"] = ", ".join(phases)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._metrics["view_start"] = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # Runs between the view returning and the response being rendered.
+        marks = request._metrics
+        marks["view_end"] = time.perf_counter()
+        response.add_post_render_callback(
+            lambda rendered: marks.__setitem__("render_end", time.perf_counter())
+        )
+        return response
+
+    @staticmethod
+    def response_size(response):
+        if not response.streaming:
+            return len(response.content)
+        if response.has_header("Content-Length"):
+            return int(response["Content-Length"])
+        return None
+
+
+def render_metrics():
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.collect())
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view(request):
+    """Prometheus scrape target; requires ``Authorization: Bearer <METRICS_TOKEN>``"""
+    token = settings.METRICS_TOKEN
+    if not token:
+        raise Http404("Metrics are disabled.")
+    supplied = request.headers.get("Authorization", "").removeprefix("Bearer ")
+    if not hmac.compare_digest(supplied.encode(), token.encode()):
+        return HttpResponse("Invalid metrics token.", status=401)
+    return HttpResponse(
+        render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,199 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def estimate_count(queryset):
+    """Row estimate from the PostgreSQL planner instead of a COUNT(*) scan"""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return queryset.count()
+
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination.
+
+    Pages are addressed by an opaque cursor holding the ordering values of the
+    last row seen, so every page is an index range scan with a LIMIT instead of
+    COUNT(*) plus OFFSET. ``ordering`` must end with a unique column (``id``)
+    and reference non-null columns on the model itself.
+    """
+
+    ordering = ("-created_at", "-id")
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    invalid_cursor_message = _("Invalid cursor")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.count_queryset = queryset
+
+        values, self.reversed = self.decode_cursor(request, queryset.model)
+        ordering = self.get_ordering(reverse=self.reversed)
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self.seek_filter(ordering, values))
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if self.reversed:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_ordering(self, reverse=False):
+        if not reverse:
+            return list(self.ordering)
+        return [f[1:] if f.startswith("-") else f"-{f}" for f in self.ordering]
+
+    @staticmethod
+    def seek_filter(ordering, values):
+        """Rows strictly after ``values``: a > x OR (a = x AND b > y), bounded on a"""
+        fields = [(f.lstrip("-"), f.startswith("-")) for f in ordering]
+        condition = Q()
+        for index, (name, descending) in enumerate(fields):
+            term = Q(**{f"{name}__{'lt' if descending else 'gt'}": values[index]})
+            for prev_index in range(index):
+                term &= Q(**{fields[prev_index][0]: values[prev_index]})
+            condition |= term
+        first_name, first_desc = fields[0]
+        bound = Q(**{f"{first_name}__{'lte' if first_desc else 'gte'}": values[0]})
+        return bound & condition
+
+    # Cursor encoding -------------------------------------------------------
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            raw_values = payload["v"]
+            fields = [f.lstrip("-") for f in self.ordering]
+            if len(raw_values) != len(fields):
+                raise ValueError
+            values = [
+                model._meta.get_field(name).to_python(value)
+                for name, value in zip(fields, raw_values)
+            ]
+        except (AttributeError, KeyError, TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return values, bool(payload.get("r"))
+
+    def encode_cursor(self, obj, reverse):
+        values = []
+        for field in self.ordering:
+            name = field.lstrip("-")
+            values.append(obj[name] if isinstance(obj, dict) else getattr(obj, name))
+        payload = {"v": values}
+        if reverse:
+            payload["r"] = 1
+        data = json.dumps(payload, cls=JSONEncoder, separators=(",", ":"))
+        encoded = urlsafe_b64encode(data.encode("utf-8")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    # Responses -------------------------------------------------------------
+
+    def wants_estimated_count(self):
+        return self.request.query_params.get(self.count_query_param) == "estimate"
+
+    def get_paginated_response(self, data):
+        payload = OrderedDict(
+            [
+                ("next", self.get_next_link()),
+                ("previous", self.get_previous_link()),
+            ]
+        )
+        if self.wants_estimated_count():
+            payload["estimated_count"] = estimate_count(self.count_queryset)
+        payload["results"] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "estimated_count": {
+                    "type": "integer",
+                    "description": "Planner estimate, only with ?count=estimate",
+                },
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Pass 'estimate' to include a planner row estimate.",
+                "schema": {"type": "string", "enum": ["estimate"]},
+            },
+        ]
@@ -10,8 +10,10 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+import tempfile
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 from datetime import timedelta
 import dj_database_url
 
@@ -56,6 +58,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "CMS_Backend.metrics.MetricsMiddleware",  # outermost, times everything below
+    "CMS_Backend.db_router.ReplicaMiddleware",  # before anything that reads the DB
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -109,6 +113,60 @@ DATABASES = {
     )
 }
 
+# Read replicas
+# DATABASE_REPLICA_URLS: comma-separated URLs of streaming replicas of the
+# default database, with optional DATABASE_REPLICA_WEIGHTS (relative, default
+# 1 each). Safe-method API requests read from them; see CMS_Backend/db_router.py.
+# To try it locally, point a URL at a second local database. Tests mirror every
+# replica onto the test default database and keep it out of rotation (see
+# CMS_Backend/test_runner.py).
+
+DATABASE_REPLICAS = {}
+_replica_weights = config("DATABASE_REPLICA_WEIGHTS", default="", cast=Csv(int))
+for _index, _url in enumerate(
+    config("DATABASE_REPLICA_URLS", default="", cast=Csv()), start=1
+):
+    _alias = f"replica_{_index}"
+    DATABASES[_alias] = dj_database_url.parse(
+        _url, conn_max_age=600, ssl_require=True
+    )
+    DATABASES[_alias].setdefault("OPTIONS", {})["connect_timeout"] = 3
+    DATABASES[_alias]["TEST"] = {"MIRROR": "default"}
+    DATABASE_REPLICAS[_alias] = (
+        _replica_weights[_index - 1] if _index <= len(_replica_weights) else 1
+    )
+
+DATABASE_ROUTERS = ["CMS_Backend.db_router.ReplicaRouter"]
+TEST_RUNNER = "CMS_Backend.test_runner.TestRunner"
+READ_REPLICA_PATHS = ("/api/",)
+READ_REPLICA_MAX_LAG = config("READ_REPLICA_MAX_LAG", default=5, cast=float)
+READ_REPLICA_CHECK_INTERVAL = config(
+    "READ_REPLICA_CHECK_INTERVAL", default=5, cast=float
+)
+# Reads of a client that just wrote stay on the primary this long. A replica
+# may pass its check READ_REPLICA_MAX_LAG behind and fall further behind until
+# the next check, so this must cover both; ReplicaMiddleware refuses to start
+# with less.
+READ_REPLICA_STICKY_SECONDS = config(
+    "READ_REPLICA_STICKY_SECONDS",
+    default=READ_REPLICA_MAX_LAG + READ_REPLICA_CHECK_INTERVAL,
+    cast=float,
+)
+
+
+# Cache
+# Point CACHE_BACKEND/CACHE_LOCATION at Redis or Memcached so cached data is
+# shared (and invalidated) across worker processes.
+
+CACHES = {
+    "default": {
+        "BACKEND": config(
+            "CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": config("CACHE_LOCATION", default="cms-backend"),
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -155,11 +213,18 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # Email Backend Configuration
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
+# Outbox delivered by `manage.py send_outbox`
+EMAIL_OUTBOX_BATCH_SIZE = config("EMAIL_OUTBOX_BATCH_SIZE", default=50, cast=int)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config("EMAIL_OUTBOX_MAX_ATTEMPTS", default=8, cast=int)
+EMAIL_OUTBOX_RETRY_DELAY = 60  # seconds, doubled after every failed attempt
+EMAIL_OUTBOX_MAX_RETRY_DELAY = 60 * 60
+EMAIL_OUTBOX_LEASE = 5 * 60  # claimed messages return to the queue after this
+
 
 # Django REST Framework Configuration
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_RENDERER_CLASSES": [
@@ -198,11 +263,67 @@ SIMPLE_JWT = {
     "TOKEN_TYPE_CLAIM": "token_type",
 }
 
+# Per-process cache of users resolved from access tokens. Deactivations and
+# password changes reach other worker processes through the shared cache; with a
+# per-process cache backend (LocMemCache, the default) they cannot, so entries
+# then live at most AUTH_USER_CACHE_LOCAL_TTL seconds. Use a shared cache (see
+# CACHES) when running several workers.
+AUTH_USER_CACHE_TTL = config("AUTH_USER_CACHE_TTL", default=300, cast=int)  # seconds
+AUTH_USER_CACHE_LOCAL_TTL = config("AUTH_USER_CACHE_LOCAL_TTL", default=5, cast=int)
+AUTH_USER_CACHE_SIZE = config("AUTH_USER_CACHE_SIZE", default=1024, cast=int)
+
+# Seconds between batched last_active writes (0 = write immediately)
+LAST_ACTIVE_FLUSH_INTERVAL = config("LAST_ACTIVE_FLUSH_INTERVAL", default=30, cast=int)
+
+# Live notification stream (/api/notifications/stream/, served over ASGI)
+NOTIFICATION_BROKER = config(
+    "NOTIFICATION_BROKER", default="notification.broker.InProcessBroker"
+)
+SSE_HEARTBEAT_SECONDS = 15
+SSE_RETRY_MILLISECONDS = 5000
+SSE_REPLAY_BUFFER = 1000  # events kept for Last-Event-ID resumption
+SSE_QUEUE_SIZE = 100  # per connection; slower clients are told to resync
+
 FRONTEND_URL = config("FRONTEND_URL", default="http://localhost:3000")
 
+# Background text extraction for uploaded contract documents (0 = only via
+# `manage.py index_documents`)
+DOCUMENT_INDEX_WORKERS = config("DOCUMENT_INDEX_WORKERS", default=2, cast=int)
+
+# Document uploads (contract.uploads): hashed while streaming, stored by content
+FILE_UPLOAD_HANDLERS = [
+    "contract.uploads.HashingMemoryFileUploadHandler",
+    "contract.uploads.HashingTemporaryFileUploadHandler",
+]
+DOCUMENT_UPLOAD_WORKERS = 4  # parallel blob writes per multi-file request
+# Part files of resumable uploads; must be shared by all workers on a host
+DOCUMENT_UPLOAD_TEMP_DIR = config(
+    "DOCUMENT_UPLOAD_TEMP_DIR",
+    default=os.path.join(tempfile.gettempdir(), "cms-document-uploads"),
+)
+DOCUMENT_UPLOAD_SESSION_TTL = 60 * 60 * 24  # idle sessions are discarded after
+
+# How document downloads are sent (contract.downloads): "direct" (sendfile via
+# the WSGI server), "x-accel" (nginx internal location) or "x-sendfile"
+DOCUMENT_DOWNLOAD_MODE = config("DOCUMENT_DOWNLOAD_MODE", default="direct")
+DOCUMENT_X_ACCEL_PREFIX = config("DOCUMENT_X_ACCEL_PREFIX", default="/protected-media/")
+
+# Rows fetched per server-side cursor round trip by CSV/NDJSON exports
+EXPORT_CHUNK_SIZE = 2000
+
+# Rows validated and inserted together by the bulk contract import
+CONTRACT_IMPORT_BATCH_SIZE = 500
+
+# Bearer token Prometheus sends to scrape /metrics; the endpoint is disabled
+# while it is empty
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+
 
 # WhiteNoise for static files
-MIDDLEWARE.insert(1, "whitenoise.middleware.WhiteNoiseMiddleware")
+MIDDLEWARE.insert(
+    MIDDLEWARE.index("django.middleware.security.SecurityMiddleware") + 1,
+    "whitenoise.middleware.WhiteNoiseMiddleware",
+)
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
 CORS_ALLOWED_ORIGINS = [
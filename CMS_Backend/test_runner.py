@@ -0,0 +1,27 @@
+from django.db import connections
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Takes read replicas out of rotation for the test run. The runner mirrors
+    them onto the default test database, where their separate connection
+    cannot see a TestCase's uncommitted rows; tests that exercise replicas
+    opt back in with ``override_settings(DATABASE_REPLICAS=...)``.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._no_replicas = override_settings(DATABASE_REPLICAS={})
+        self._no_replicas.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._no_replicas.disable()
+        super().teardown_test_environment(**kwargs)
+
+    def teardown_databases(self, old_config, **kwargs):
+        # Replica connections point at the test database too; an open one
+        # would stop it from being dropped.
+        connections.close_all()
+        super().teardown_databases(old_config, **kwargs)
@@ -1,6 +1,22 @@
 from django.contrib import admin
-from django.core.exceptions import ValidationError
 from .models import Contract, ContractDocument, ContractType, ContractStatusHistory
+from .exports import (
+    CONTRACT_EXPORT_FIELDS,
+    STATUS_HISTORY_EXPORT_FIELDS,
+    export_response,
+)
+from .services import bulk_change_status
+
+
+def export_action(fields, export_format, filename):
+    """Admin action streaming the selected rows as ``export_format``"""
+
+    def export(modeladmin, request, queryset):
+        return export_response(queryset.order_by("pk"), fields, export_format, filename)
+
+    export.__name__ = f"export_{export_format}"
+    export.short_description = f"Export selected rows as {export_format.upper()}"
+    return export
 
 
 class ContractDocumentInline(admin.TabularInline):
@@ -43,6 +59,20 @@ class ContractAdmin(admin.ModelAdmin):
     readonly_fields = ("contract_code", "created_at", "updated_at")
     inlines = [ContractDocumentInline, ContractStatusHistoryInline]
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_expiry()
+
+    def is_active(self, obj):
+        return obj.currently_active
+
+    is_active.boolean = True
+    is_active.admin_order_field = "currently_active"
+
+    def days_remaining(self, obj):
+        return obj.remaining_days
+
+    days_remaining.admin_order_field = "remaining_days"
+
     fieldsets = (
         (
             None,
@@ -93,41 +123,41 @@ class ContractAdmin(admin.ModelAdmin):
         "mark_as_approved",
         "mark_as_rejected",
         "mark_as_returned",
+        export_action(CONTRACT_EXPORT_FIELDS, "csv", "contracts"),
+        export_action(CONTRACT_EXPORT_FIELDS, "ndjson", "contracts"),
     ]
 
+    def _bulk_change_status(self, request, queryset, new_status):
+        updated, failures = bulk_change_status(
+            list(queryset.values_list("id", flat=True)), new_status, user=request.user
+        )
+        if updated:
+            self.message_user(
+                request, f"{len(updated)} contract(s) marked as {new_status}."
+            )
+        reasons = {}
+        for error in failures.values():
+            reasons[error] = reasons.get(error, 0) + 1
+        for error, count in reasons.items():
+            self.message_user(request, f"{count} contract(s): {error}", level="error")
+
     def mark_as_submitted(self, request, queryset):
-        for contract in queryset:
-            try:
-                contract.set_status("submitted", user=request.user)
-            except ValidationError as e:
-                self.message_user(request, f"{contract}: {e}", level="error")
+        self._bulk_change_status(request, queryset, "submitted")
 
     mark_as_submitted.short_description = "Mark selected contracts as Submitted"
 
     def mark_as_approved(self, request, queryset):
-        for contract in queryset:
-            try:
-                contract.set_status("approved", user=request.user)
-            except ValidationError as e:
-                self.message_user(request, f"{contract}: {e}", level="error")
+        self._bulk_change_status(request, queryset, "approved")
 
     mark_as_approved.short_description = "Mark selected contracts as Approved"
 
     def mark_as_rejected(self, request, queryset):
-        for contract in queryset:
-            try:
-                contract.set_status("rejected", user=request.user)
-            except ValidationError as e:
-                self.message_user(request, f"{contract}: {e}", level="error")
+        self._bulk_change_status(request, queryset, "rejected")
 
     mark_as_rejected.short_description = "Mark selected contracts as Rejected"
 
     def mark_as_returned(self, request, queryset):
-        for contract in queryset:
-            try:
-                contract.set_status("returned", user=request.user)
-            except ValidationError as e:
-                self.message_user(request, f"{contract}: {e}", level="error")
+        self._bulk_change_status(request, queryset, "returned")
 
     mark_as_returned.short_description = "Mark selected contracts as Returned"
 
@@ -136,3 +166,27 @@ class ContractAdmin(admin.ModelAdmin):
 class ContractTypeAdmin(admin.ModelAdmin):
     list_display = ("type_name",)
     search_fields = ("type_name",)
+
+
+@admin.register(ContractStatusHistory)
+class ContractStatusHistoryAdmin(admin.ModelAdmin):
+    list_display = ("contract", "old_status", "new_status", "changed_by", "changed_at")
+    list_filter = ("new_status", "old_status", "changed_at")
+    search_fields = ("contract__contract_code", "remarks")
+    list_select_related = ("contract", "changed_by")
+    date_hierarchy = "changed_at"
+    readonly_fields = (
+        "contract",
+        "old_status",
+        "new_status",
+        "changed_by",
+        "remarks",
+        "changed_at",
+    )
+    actions = [
+        export_action(STATUS_HISTORY_EXPORT_FIELDS, "csv", "status-history"),
+        export_action(STATUS_HISTORY_EXPORT_FIELDS, "ndjson", "status-history"),
+    ]
+
+    def has_add_permission(self, request):
+        return False
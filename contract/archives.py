@@ -0,0 +1,138 @@
+"""
+ZIP archives of contract documents, streamed while they are built.
+
+``zipfile`` writes to an unseekable sink (it then emits data descriptors
+instead of seeking back to patch headers), and everything written is handed
+to the response as soon as a block has been compressed. Memory use is bounded
+by the read block size whatever the number or size of the documents, and
+nothing is written to disk. Formats that are already compressed are stored
+as-is rather than deflated a second time.
+"""
+
+import logging
+import os
+import zipfile
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import ContractDocument
+
+logger = logging.getLogger(__name__)
+
+READ_BLOCK_SIZE = 64 * 1024
+MAX_ARCHIVE_CONTRACTS = 200
+# Containers and media that deflate cannot shrink further
+STORED_EXTENSIONS = {
+    ".pdf",
+    ".jpg",
+    ".jpeg",
+    ".png",
+    ".gif",
+    ".webp",
+    ".zip",
+    ".gz",
+    ".7z",
+    ".rar",
+    ".docx",
+    ".xlsx",
+    ".pptx",
+    ".odt",
+    ".ods",
+    ".odp",
+    ".mp3",
+    ".mp4",
+}
+
+
+class _Sink:
+    """Write-only, unseekable buffer drained after every write"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _unique(name, used):
+    base, extension = os.path.splitext(name)
+    candidate, counter = name, 1
+    while candidate in used:
+        counter += 1
+        candidate = f"{base} ({counter}){extension}"
+    used.add(candidate)
+    return candidate
+
+
+def _zip_info(name, document):
+    local = timezone.localtime(document.uploaded_at)
+    info = zipfile.ZipInfo(name, date_time=local.timetuple()[:6])
+    info.external_attr = 0o644 << 16
+    if os.path.splitext(name)[1].lower() in STORED_EXTENSIONS:
+        info.compress_type = zipfile.ZIP_STORED
+    else:
+        info.compress_type = zipfile.ZIP_DEFLATED
+    if document.size is not None:
+        info.file_size = document.size  # lets zipfile choose ZIP64 up front
+    return info
+
+
+def iter_archive(entries):
+    """
+    Yield the bytes of a ZIP containing ``entries``, an iterable of
+    ``(folder, document)`` pairs (``folder`` may be empty).
+    """
+    sink = _Sink()
+    used = set()
+    with zipfile.ZipFile(sink, mode="w", allowZip64=True) as archive:
+        for folder, document in entries:
+            name = _unique(os.path.join(folder, document.display_name), used)
+            try:
+                source = document.file.storage.open(document.file.name, "rb")
+            except FileNotFoundError:
+                logger.warning("Skipping missing file for document %s", document.pk)
+                continue
+            with source, archive.open(_zip_info(name, document), "w") as target:
+                for block in iter(lambda: source.read(READ_BLOCK_SIZE), b""):
+                    target.write(block)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            yield sink.drain()
+    yield sink.drain()
+
+
+def folder_name(contract):
+    return (contract.contract_code or str(contract.pk)).replace("/", "-")
+
+
+def document_entries(contracts, folders=True):
+    """Every document of ``contracts``, one folder per contract if ``folders``"""
+    names = {
+        contract.pk: folder_name(contract) if folders else "" for contract in contracts
+    }
+    documents = ContractDocument.objects.filter(contract_id__in=names).order_by(
+        "contract_id", "uploaded_at", "id"
+    )
+    for document in documents.iterator(chunk_size=200):
+        yield names[document.contract_id], document
+
+
+def archive_response(entries, filename):
+    response = StreamingHttpResponse(
+        (chunk for chunk in iter_archive(entries) if chunk),
+        content_type="application/zip",
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response["Cache-Control"] = "private, no-store"
+    return response
@@ -0,0 +1,410 @@
+import hashlib
+import random
+import statistics
+import threading
+import time
+import tracemalloc
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from users.models import ROLE_CHOICES, Department
+from .models import (
+    Contract,
+    ContractComment,
+    ContractDocument,
+    ContractStatusHistory,
+    ContractType,
+)
+from .participants import add_participants, contract_participants
+from .rollups import rebuild_contract_stats
+
+User = get_user_model()
+
+BENCHMARK_PASSWORD = "benchmark-password"
+
+
+def run_code_allocation_benchmark(contract_type, department, threads=8, per_thread=25):
+    """
+    Create contracts from many threads at once and report throughput.
+    Every thread uses its own database connection, as concurrent API workers do.
+    """
+    today = timezone.localdate()
+    codes, errors = [], []
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def worker(worker_index):
+        try:
+            barrier.wait()
+            for index in range(per_thread):
+                contract = Contract.objects.create(
+                    contract_title=f"Benchmark {worker_index}-{index}",
+                    vendor_name="Benchmark vendor",
+                    contract_type=contract_type,
+                    department=department,
+                    start_date=today,
+                    end_date=today + timedelta(days=30),
+                    payment_terms="one_time_payment",
+                )
+                with lock:
+                    codes.append(contract.contract_code)
+        except Exception as exc:
+            with lock:
+                errors.append(exc)
+        finally:
+            connections.close_all()
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "created": len(codes),
+        "unique_codes": len(set(codes)),
+        "errors": errors,
+        "seconds": elapsed,
+        "per_second": len(codes) / elapsed if elapsed else 0.0,
+    }
+
+
+# -----------------------------
+# API benchmark
+# -----------------------------
+def seed_benchmark_data(
+    departments=5,
+    users_per_role=5,
+    contracts=500,
+    documents=2,
+    history=2,
+    comments=3,
+    seed=0,
+):
+    """
+    Bulk-insert a synthetic dataset. Every user's password is
+    BENCHMARK_PASSWORD (hashed once). Returns the created users by role.
+    """
+    rng = random.Random(seed)
+    password = make_password(BENCHMARK_PASSWORD)
+    department_rows = Department.objects.bulk_create(
+        Department(name=f"Benchmark department {index}") for index in range(departments)
+    )
+    contract_types = ContractType.objects.bulk_create(
+        ContractType(type_name=name) for name in ("Service", "Supply", "Lease")
+    )
+    users = {}
+    for role, _ in ROLE_CHOICES:
+        users[role] = User.objects.bulk_create(
+            User(
+                email=f"{role}{index}@benchmark.example",
+                full_name=f"{role.replace('_', ' ').title()} {index}",
+                role=role,
+                department=department_rows[index % departments],
+                password=password,
+                is_staff=role == "admin",
+            )
+            for index in range(users_per_role)
+        )
+
+    today = timezone.localdate()
+    codes = Contract.allocate_codes(contracts)
+    statuses = ["draft", "submitted", "approved", "returned", "rejected"]
+    contract_rows = Contract.objects.bulk_create(
+        (
+            Contract(
+                contract_code=code,
+                contract_title=f"Benchmark contract {index}",
+                vendor_name=f"Vendor {index % 50}",
+                contract_type=rng.choice(contract_types),
+                department=rng.choice(department_rows),
+                start_date=today - timedelta(days=rng.randint(0, 365)),
+                end_date=today + timedelta(days=rng.randint(1, 730)),
+                payment_terms="installment",
+                estimated_contract_value=Decimal(rng.randint(1000, 1000000)),
+                status=rng.choice(statuses),
+                legal_officer=rng.choice(users["legal_reviewer"]),
+                department_head=rng.choice(users["department_head"]),
+                signatory=rng.choice(users["signatory"]),
+                created_by=rng.choice(users["procurement_officer"]),
+            )
+            for index, code in enumerate(codes)
+        ),
+        batch_size=1000,
+    )
+    add_participants(contract_participants(contract_rows))
+    rebuild_contract_stats()
+
+    ContractDocument.objects.bulk_create(
+        (
+            ContractDocument(
+                contract=contract,
+                file=f"benchmark/{contract.pk}/document-{index}.pdf",
+                filename=f"document-{index}.pdf",
+                size=1024,
+                mime_type="application/pdf",
+                sha256=hashlib.sha256(f"{contract.pk}-{index}".encode()).hexdigest(),
+            )
+            for contract in contract_rows
+            for index in range(documents)
+        ),
+        batch_size=1000,
+    )
+    ContractStatusHistory.objects.bulk_create(
+        (
+            ContractStatusHistory(
+                contract=contract,
+                old_status="draft",
+                new_status="submitted",
+                changed_by_id=contract.created_by_id,
+            )
+            for contract in contract_rows
+            for _ in range(history)
+        ),
+        batch_size=1000,
+    )
+    ContractComment.objects.bulk_create(
+        (
+            ContractComment(
+                contract=contract,
+                user_id=contract.legal_officer_id,
+                comment=f"Benchmark comment {index}",
+            )
+            for contract in contract_rows
+            for index in range(comments)
+        ),
+        batch_size=1000,
+    )
+    return users
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    rank = max(1, round(percent / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class BenchmarkContext:
+    """Clients and ids shared by the scenarios"""
+
+    def __init__(self, users, draft_pool):
+        self.officer = users["procurement_officer"][0]
+        self.admin = users["admin"][0]
+        self.reviewer = users["legal_reviewer"][0]
+        self.officer_client = self._client(self.officer)
+        self.admin_client = self._client(self.admin)
+        self.reviewer_client = self._client(self.reviewer)
+        self.anonymous_client = APIClient()
+        self.contract_ids = list(
+            Contract.objects.order_by("-created_at", "-id").values_list("id", flat=True)[
+                :200
+            ]
+        )
+        self.reviewer_contract_ids = list(
+            Contract.objects.filter(legal_officer=self.reviewer).values_list(
+                "id", flat=True
+            )[:200]
+        )
+        self.draft_pool = draft_pool
+        self.contract_type_id = ContractType.objects.values_list("id", flat=True)[0]
+
+    @staticmethod
+    def _client(user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def pick(self, ids, index):
+        return ids[index % len(ids)]
+
+
+def _contract_payload(context, index):
+    today = timezone.localdate()
+    return {
+        "contract_title": f"Benchmark create {index}",
+        "vendor_name": "Benchmark vendor",
+        "contract_type_id": context.contract_type_id,
+        "department": context.officer.department_id,
+        "start_date": today.isoformat(),
+        "end_date": (today + timedelta(days=365)).isoformat(),
+        "payment_terms": "installment",
+        "estimated_contract_value": "1000.00",
+    }
+
+
+# name: (callable(context, index) -> response, expected status)
+SCENARIOS = {
+    "contract-list": (
+        lambda ctx, i: ctx.officer_client.get("/api/contracts/"),
+        200,
+    ),
+    "contract-detail": (
+        lambda ctx, i: ctx.officer_client.get(
+            f"/api/contracts/{ctx.pick(ctx.contract_ids, i)}/"
+        ),
+        200,
+    ),
+    "contract-create": (
+        lambda ctx, i: ctx.officer_client.post(
+            "/api/contracts/", _contract_payload(ctx, i), format="json"
+        ),
+        201,
+    ),
+    "change-status": (
+        lambda ctx, i: ctx.officer_client.post(
+            f"/api/contracts/{ctx.draft_pool.pop()}/change_status/",
+            {"status": "submitted"},
+            format="json",
+        ),
+        200,
+    ),
+    "comment-list": (
+        lambda ctx, i: ctx.reviewer_client.get(
+            f"/api/contracts/{ctx.pick(ctx.reviewer_contract_ids, i)}/comments/"
+        ),
+        200,
+    ),
+    "comment-create": (
+        lambda ctx, i: ctx.reviewer_client.post(
+            f"/api/contracts/{ctx.pick(ctx.reviewer_contract_ids, i)}/comments/",
+            {
+                "contract": ctx.pick(ctx.reviewer_contract_ids, i),
+                "comment": f"Benchmark comment {i}",
+            },
+            format="json",
+        ),
+        201,
+    ),
+    "user-list": (
+        lambda ctx, i: ctx.admin_client.get("/api/users/"),
+        200,
+    ),
+    "login": (
+        lambda ctx, i: ctx.anonymous_client.post(
+            "/api/auth/login/",
+            {"email": ctx.officer.email, "password": BENCHMARK_PASSWORD},
+            format="json",
+        ),
+        200,
+    ),
+}
+
+
+def _draft_pool(users, size):
+    """Fresh drafts for change-status, created before any timing starts"""
+    officer = users["procurement_officer"][0]
+    contract_type = ContractType.objects.first()
+    today = timezone.localdate()
+    drafts = Contract.objects.bulk_create(
+        Contract(
+            contract_code=code,
+            contract_title=f"Benchmark draft {index}",
+            vendor_name="Benchmark vendor",
+            contract_type=contract_type,
+            department_id=officer.department_id,
+            start_date=today,
+            end_date=today + timedelta(days=365),
+            payment_terms="installment",
+            created_by=officer,
+        )
+        for index, code in enumerate(Contract.allocate_codes(size))
+    )
+    add_participants(contract_participants(drafts))
+    return [draft.pk for draft in drafts]
+
+
+def run_api_benchmark(users, scenarios=None, iterations=50, warmup=5, memory_runs=3):
+    """
+    Drive each scenario through the in-process client. Latency and query
+    counts come from ``iterations`` timed requests after ``warmup`` untimed
+    ones; peak allocation from ``memory_runs`` separate requests traced by
+    tracemalloc (tracing slows requests down, so it is kept out of timing).
+    """
+    scenarios = scenarios or list(SCENARIOS)
+    per_scenario = warmup + iterations + memory_runs
+    context = BenchmarkContext(users, _draft_pool(users, per_scenario))
+    results = {}
+    for name in scenarios:
+        request, expected = SCENARIOS[name]
+        counter = iter(range(per_scenario))
+
+        def call():
+            response = request(context, next(counter))
+            if response.status_code != expected:
+                raise AssertionError(
+                    f"{name}: expected {expected}, got {response.status_code}: "
+                    f"{getattr(response, 'data', response.content)!r}"
+                )
+            return response
+
+        for _ in range(warmup):
+            call()
+
+        timings, queries = [], []
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                call()
+                timings.append((time.perf_counter() - start) * 1000)
+            queries.append(len(captured))
+
+        peaks = []
+        for _ in range(memory_runs):
+            tracemalloc.start()
+            try:
+                call()
+                peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+            finally:
+                tracemalloc.stop()
+
+        results[name] = {
+            "requests": iterations,
+            "p50_ms": round(percentile(timings, 50), 2),
+            "p95_ms": round(percentile(timings, 95), 2),
+            "p99_ms": round(percentile(timings, 99), 2),
+            "mean_ms": round(statistics.fmean(timings), 2),
+            "queries": max(queries),
+            "peak_kib": round(max(peaks), 1) if peaks else None,
+        }
+    return results
+
+
+# Result keys a baseline may set a ceiling for
+BASELINE_METRICS = ("p50_ms", "p95_ms", "p99_ms", "queries", "peak_kib")
+
+
+def compare_to_baseline(results, baseline):
+    """``[(scenario, metric, value, limit)]`` for every exceeded ceiling"""
+    failures = []
+    for name, limits in baseline.items():
+        if name not in results:
+            continue
+        for metric in BASELINE_METRICS:
+            limit = limits.get(metric)
+            value = results[name].get(metric)
+            if limit is not None and value is not None and value > limit:
+                failures.append((name, metric, value, limit))
+    return failures
+
+
+def baseline_from(results, headroom=3.0):
+    """Ceilings for a new baseline: timings and memory times ``headroom``"""
+    return {
+        name: {
+            "p95_ms": round(result["p95_ms"] * headroom, 1),
+            "p99_ms": round(result["p99_ms"] * headroom, 1),
+            "queries": result["queries"],
+            "peak_kib": round(result["peak_kib"] * headroom),
+        }
+        for name, result in results.items()
+    }
@@ -0,0 +1,96 @@
+"""
+Reference data the frontend loads on every page (contract types, departments
+and the reviewer / department head / signatory pickers), bundled into one
+response that is cached in process memory and in the shared cache.
+
+A version token in the shared cache is replaced whenever the underlying rows
+change (see contract.signals); every process compares it with the version of
+its in-memory copy, so no request needs the database once the cache is warm.
+"""
+
+import hashlib
+import json
+import threading
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.utils.encoders import JSONEncoder
+
+from CMS_Backend.db_router import reads_from_primary
+from users.models import Department
+from .models import ContractType
+
+User = get_user_model()
+
+VERSION_KEY = "bootstrap:version"
+PAYLOAD_KEY = "bootstrap:payload"
+PAYLOAD_TIMEOUT = 60 * 60 * 24
+PICKER_ROLES = {
+    "legal_reviewer": "legal_reviewers",
+    "department_head": "department_heads",
+    "signatory": "signatories",
+}
+# CustomUser columns that appear in the payload; saves touching only other
+# columns (last_active, last_login, password) leave the cache alone.
+USER_FIELDS = {"full_name", "email", "role", "department", "status", "is_active"}
+
+_local = {"version": None, "etag": None, "body": None}
+_local_lock = threading.Lock()
+
+
+def build_payload():
+    payload = {
+        "contract_types": list(
+            ContractType.objects.order_by("type_name").values("id", "type_name")
+        ),
+        "departments": list(Department.objects.order_by("name").values("id", "name")),
+    }
+    for key in PICKER_ROLES.values():
+        payload[key] = []
+    users = (
+        User.objects.filter(role__in=PICKER_ROLES, status=True, is_active=True)
+        .order_by("full_name", "id")
+        .values("id", "full_name", "email", "role", "department_id")
+    )
+    for user in users:
+        payload[PICKER_ROLES[user["role"]]].append(user)
+    return payload
+
+
+def current_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def get_bootstrap():
+    """Return ``(etag, body)`` for the current reference data"""
+    version = current_version()
+    with _local_lock:
+        if _local["version"] == version:
+            return _local["etag"], _local["body"]
+
+    entry = cache.get(PAYLOAD_KEY)
+    if entry and entry[0] == version:
+        _, etag, body = entry
+    else:
+        with reads_from_primary():
+            payload = build_payload()
+        body = json.dumps(payload, cls=JSONEncoder, separators=(",", ":")).encode(
+            "utf-8"
+        )
+        etag = '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+        cache.set(PAYLOAD_KEY, (version, etag, body), PAYLOAD_TIMEOUT)
+
+    with _local_lock:
+        _local.update(version=version, etag=etag, body=body)
+    return etag, body
+
+
+def invalidate_bootstrap():
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+    with _local_lock:
+        _local.update(version=None, etag=None, body=None)
@@ -0,0 +1,77 @@
+"""
+Cheap validators (ETag / Last-Modified) for contract representations.
+
+A contract's JSON changes when the contract row changes (``updated_at``) or
+when documents, status history or comments are added or removed. One query
+annotates each contract with the latest timestamp and row count of those
+relations (correlated subqueries on the indexed ``contract_id`` columns), so
+validators can be checked without loading or serialising anything.
+
+Only the ETag is compared. Last-Modified is the newest timestamp among the
+rows that still exist, so deleting the newest document or comment moves it
+backwards; it is sent on detail responses for information, never on lists,
+and If-Modified-Since is not used to answer 304.
+"""
+
+import hashlib
+
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery
+from django.utils.http import http_date
+
+from .models import ContractComment, ContractDocument, ContractStatusHistory
+
+RELATED_TIMESTAMPS = (
+    ("documents", ContractDocument, "uploaded_at"),
+    ("history", ContractStatusHistory, "changed_at"),
+    ("comments", ContractComment, "created_at"),
+)
+
+
+def _related(model, aggregate, output_field=None):
+    rows = (
+        model.objects.filter(contract=OuterRef("pk"))
+        .order_by()
+        .values("contract")
+        .annotate(value=aggregate)
+        .values("value")
+    )
+    return Subquery(rows[:1], output_field=output_field)
+
+
+def with_validators(queryset):
+    """Reduce ``queryset`` to the values validators are computed from"""
+    annotations = {}
+    for name, model, field in RELATED_TIMESTAMPS:
+        annotations[f"{name}_changed"] = _related(model, Max(field))
+        annotations[f"{name}_count"] = _related(
+            model, Count("id"), output_field=IntegerField()
+        )
+    fields = ["id", "created_at", "updated_at", *annotations]
+    return queryset.annotate(**annotations).values(*fields)
+
+
+def compute_validators(rows, request):
+    """Return ``(etag, last_modified)`` for rows produced by with_validators()"""
+    digest = hashlib.sha256(request.get_full_path().encode("utf-8"))
+    renderer = getattr(request, "accepted_media_type", "")
+    digest.update(renderer.encode("utf-8"))
+
+    last_modified = None
+    for row in rows:
+        digest.update(repr(sorted(row.items())).encode("utf-8"))
+        timestamps = [row["updated_at"]]
+        timestamps += [row[f"{name}_changed"] for name, _, _ in RELATED_TIMESTAMPS]
+        for value in timestamps:
+            if value and (last_modified is None or value > last_modified):
+                last_modified = value
+    # Weak: related objects rendered inline (e.g. user names) are not hashed.
+    etag = 'W/"%s"' % digest.hexdigest()[:32]
+    return etag, last_modified
+
+
+def set_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    response["Cache-Control"] = "private, no-cache"
+    return response
@@ -0,0 +1,152 @@
+"""
+Serving contract documents through the API.
+
+After the view has checked access, the bytes are sent without passing through
+Python where possible (``settings.DOCUMENT_DOWNLOAD_MODE``):
+
+* ``direct`` returns a FileResponse. Under gunicorn the open file reaches
+  ``wsgi.file_wrapper`` and is sent with ``os.sendfile``; a byte range is
+  served by positioning the file and limiting Content-Length.
+* ``x-accel`` (nginx) and ``x-sendfile`` (Apache, lighttpd) return headers
+  only and let the proxy send the file, including range requests.
+
+Single ``Range: bytes=`` requests get a 206 (honouring ``If-Range``);
+multi-range requests are answered with the whole file.
+"""
+
+import re
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import (
+    content_disposition_header,
+    http_date,
+    parse_http_date_safe,
+)
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeFile:
+    """Read-only view of ``length`` bytes of an open file from ``start``"""
+
+    def __init__(self, fileobj, start, length):
+        self.fileobj = fileobj
+        self.remaining = length
+        fileobj.seek(start)
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.fileobj.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        # Lets wsgi.file_wrapper use sendfile from the current offset.
+        return self.fileobj.fileno()
+
+    def close(self):
+        self.fileobj.close()
+
+
+def document_validators(document):
+    etag = f'"{document.sha256}"' if document.sha256 else None
+    return etag, document.uploaded_at
+
+
+def parse_range(header, size):
+    """
+    ``(start, end)`` for a satisfiable single range, None to serve the whole
+    file, or ``False`` when the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.replace(" ", "")) if header else None
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if start >= size or end < start:
+            return False
+    else:
+        suffix = int(last)
+        if suffix == 0:
+            return False
+        start, end = max(size - suffix, 0), size - 1
+    return start, end
+
+
+def _if_range_matches(request, etag, last_modified):
+    if_range = request.headers.get("If-Range")
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return etag is not None and if_range == etag
+    parsed = parse_http_date_safe(if_range)
+    return parsed is not None and parsed == int(last_modified.timestamp())
+
+
+def serve_document(request, document, as_attachment=False):
+    etag, last_modified = document_validators(document)
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified.timestamp())
+    )
+    if not_modified is not None:
+        return not_modified
+
+    mode = settings.DOCUMENT_DOWNLOAD_MODE
+    if mode in ("x-accel", "x-sendfile"):
+        response = HttpResponse(content_type=document.mime_type or None)
+        if mode == "x-accel":
+            prefix = settings.DOCUMENT_X_ACCEL_PREFIX.rstrip("/")
+            response["X-Accel-Redirect"] = f"{prefix}/{document.file.name}"
+        else:
+            response["X-Sendfile"] = document.file.path
+        response["Content-Disposition"] = content_disposition_header(
+            as_attachment, document.display_name
+        )
+    else:
+        response = _file_response(
+            request, document, as_attachment, etag, last_modified
+        )
+
+    response["Accept-Ranges"] = "bytes"
+    response["Last-Modified"] = http_date(last_modified.timestamp())
+    response["Cache-Control"] = "private"
+    if etag:
+        response["ETag"] = etag
+    return response
+
+
+def _file_response(request, document, as_attachment, etag, last_modified):
+    try:
+        fileobj = document.file.storage.open(document.file.name, "rb")
+    except FileNotFoundError:
+        raise Http404("The document file is missing.")
+    size = document.size if document.size is not None else document.file.size
+
+    byte_range = None
+    if _if_range_matches(request, etag, last_modified):
+        byte_range = parse_range(request.headers.get("Range"), size)
+    if byte_range is False:
+        fileobj.close()
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    start, end = byte_range or (0, size - 1)
+    response = FileResponse(
+        RangeFile(fileobj, start, end - start + 1),
+        as_attachment=as_attachment,
+        filename=document.display_name,
+        content_type=document.mime_type or "application/octet-stream",
+    )
+    response["Content-Length"] = end - start + 1
+    if byte_range:
+        response.status_code = 206
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return response
@@ -0,0 +1,36 @@
+import django_filters
+
+from .models import Contract, ContractStatusHistory
+
+
+class ContractFilter(django_filters.FilterSet):
+    """Query filters of the contract list, shared with its exports"""
+
+    class Meta:
+        model = Contract
+        fields = {
+            "status": ["exact", "in"],
+            "department": ["exact"],
+            "contract_type": ["exact"],
+            "payment_terms": ["exact"],
+            "vendor_name": ["icontains"],
+            "start_date": ["gte", "lte"],
+            "end_date": ["gte", "lte"],
+            "created_at": ["gte", "lte"],
+        }
+
+
+class ContractStatusHistoryFilter(django_filters.FilterSet):
+    # Plain ids: model choice filters would load the user or contract first.
+    contract = django_filters.NumberFilter()
+    changed_by = django_filters.NumberFilter()
+    changed_by_email = django_filters.CharFilter(field_name="changed_by__email")
+    department = django_filters.NumberFilter(field_name="contract__department")
+
+    class Meta:
+        model = ContractStatusHistory
+        fields = {
+            "old_status": ["exact"],
+            "new_status": ["exact"],
+            "changed_at": ["gte", "lt", "lte"],
+        }
@@ -0,0 +1,270 @@
+"""
+Bulk import of contracts from CSV or NDJSON.
+
+Rows are processed in batches of ``CONTRACT_IMPORT_BATCH_SIZE``: every row is
+validated with ContractImportRowSerializer (no queries), then the contract
+types, departments and reviewers named by the whole batch are fetched with
+one query each, a block of contract codes is reserved, and the valid rows are
+inserted with one ``bulk_create``. Participants, rollups and assignment
+notifications are written in bulk in the same transaction. Invalid rows are reported and
+skipped; they do not stop the rest of the file.
+"""
+
+import codecs
+import csv
+import json
+import os
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, transaction
+from rest_framework import serializers
+
+from notification.services import assignment_notifications, create_notifications
+from users.models import Department
+from .models import ASSIGNMENT_FIELDS, Contract, ContractType
+from .participants import add_participants, contract_participants
+from .rollups import apply_rollup_deltas, rollup_delta, tracked_values
+from .serializers import ContractImportRowSerializer
+
+User = get_user_model()
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+
+class ImportReport:
+    def __init__(self):
+        self.created = []
+        self.errors = []
+
+    def add_error(self, row, errors):
+        self.errors.append({"row": row, "errors": errors})
+
+    def as_dict(self):
+        return {
+            "created": len(self.created),
+            "failed": len(self.errors),
+            "contracts": self.created,
+            "errors": sorted(self.errors, key=lambda error: error["row"]),
+        }
+
+
+# -----------------------------
+# Reading
+# -----------------------------
+def detect_format(name, content_type=""):
+    extension = os.path.splitext(name or "")[1].lower()
+    if extension in (".ndjson", ".jsonl") or "ndjson" in (content_type or ""):
+        return "ndjson"
+    return "csv"
+
+
+def _decoded_lines(fileobj):
+    """
+    The file's lines as text. Bytes that are not UTF-8, and NUL (which
+    PostgreSQL cannot store), become lone surrogates instead of stopping the
+    file, so only the rows containing them are reported.
+    """
+    for index, line in enumerate(fileobj):
+        if index == 0:
+            line = line.removeprefix(codecs.BOM_UTF8)
+        yield line.decode("utf-8", "surrogateescape").replace("\x00", "\udc00")
+
+
+def _unreadable(values):
+    try:
+        "".join(value for value in values if isinstance(value, str)).encode("utf-8")
+    except UnicodeEncodeError:
+        return True
+    return False
+
+
+def read_rows(fileobj, import_format):
+    """Yield ``(row_number, data)`` from a binary file; data is None if unreadable"""
+    lines = _decoded_lines(fileobj)
+    if import_format == "csv":
+        reader = csv.DictReader(lines)
+        try:
+            header = reader.fieldnames or []
+        except csv.Error as exc:
+            raise serializers.ValidationError({"file": [f"Unreadable header: {exc}"]})
+        if _unreadable(header):
+            raise serializers.ValidationError(
+                {"file": ["The header row is not UTF-8 text."]}
+            )
+        number = 0
+        while True:
+            number += 1
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error:
+                yield number, None
+                continue
+            row.pop(None, None)  # cells beyond the header
+            yield number, None if _unreadable(row.values()) else row
+    number = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            data = None if _unreadable([line]) else json.loads(line)
+        except ValueError:
+            data = None
+        yield number, data if isinstance(data, dict) else None
+
+
+# -----------------------------
+# Importing
+# -----------------------------
+def _lookup_by(model, field, values, **filters):
+    values = {value for value in values if value}
+    if not values:
+        return {}
+    queryset = model.objects.filter(**{f"{field}__in": values}, **filters)
+    return {getattr(obj, field): obj.pk for obj in queryset}
+
+
+def _reviewer_roles():
+    return {
+        field: Contract._meta.get_field(field).remote_field.limit_choices_to["role"]
+        for field in (name.removesuffix("_id") for name in ASSIGNMENT_FIELDS)
+    }
+
+
+def _resolve(batch, user):
+    """Replace names and emails in validated rows with ids, or report errors"""
+    types = _lookup_by(
+        ContractType, "type_name", (data["contract_type"] for _, data in batch)
+    )
+    departments = _lookup_by(
+        Department, "name", (data.get("department") for _, data in batch)
+    )
+    roles = _reviewer_roles()
+    emails = {data.get(field) for _, data in batch for field in roles}
+    reviewers = {
+        (email, role): pk
+        for email, role, pk in User.objects.filter(
+            email__in=emails - {None}, is_active=True
+        ).values_list("email", "role", "pk")
+    }
+
+    resolved, errors = [], []
+    for number, data in batch:
+        row_errors = {}
+        values = dict(data)
+        values["contract_type_id"] = types.get(values.pop("contract_type"))
+        if values["contract_type_id"] is None:
+            row_errors["contract_type"] = [
+                f"Unknown contract type '{data['contract_type']}'."
+            ]
+
+        department = values.pop("department", None)
+        if department:
+            values["department_id"] = departments.get(department)
+            if values["department_id"] is None:
+                row_errors["department"] = [f"Unknown department '{department}'."]
+        else:
+            values["department_id"] = getattr(user, "department_id", None)
+            if values["department_id"] is None:
+                row_errors["department"] = ["This field is required."]
+
+        for field, role in roles.items():
+            email = values.pop(field, None)
+            if not email:
+                continue
+            values[f"{field}_id"] = reviewers.get((email, role))
+            if values[f"{field}_id"] is None:
+                row_errors[field] = [f"No active {role} with email '{email}'."]
+
+        if row_errors:
+            errors.append((number, row_errors))
+        else:
+            resolved.append((number, values))
+    return resolved, errors
+
+
+def import_batch(rows, user, report):
+    """Validate, resolve and insert one batch of ``(row_number, data)``"""
+    # One instance for the whole batch: building a ModelSerializer's fields
+    # costs far more than validating a row with them.
+    validator = ContractImportRowSerializer()
+    valid = []
+    for number, data in rows:
+        if data is None:
+            report.add_error(
+                number,
+                {
+                    "non_field_errors": [
+                        "Unreadable row: not UTF-8 text, or not a JSON object."
+                    ]
+                },
+            )
+            continue
+        try:
+            valid.append((number, validator.run_validation(data)))
+        except serializers.ValidationError as exc:
+            report.add_error(
+                number,
+                {
+                    field: [str(message) for message in messages]
+                    for field, messages in exc.detail.items()
+                },
+            )
+
+    resolved, errors = _resolve(valid, user)
+    for number, row_errors in errors:
+        report.add_error(number, row_errors)
+    if not resolved:
+        return
+
+    # Reserved outside the transaction so the sequence row is not held locked
+    # for the whole batch; codes of a failed batch are simply skipped.
+    codes = Contract.allocate_codes(len(resolved))
+    contracts = [
+        Contract(
+            contract_code=code,
+            created_by=user,
+            updated_by=user,
+            **values,
+        )
+        for code, (_, values) in zip(codes, resolved)
+    ]
+    try:
+        with transaction.atomic():
+            Contract.objects.bulk_create(contracts)
+            add_participants(contract_participants(contracts))
+            deltas = {}
+            for contract in contracts:
+                rollup_delta(None, tracked_values(contract), deltas)
+            apply_rollup_deltas(deltas)
+            create_notifications(
+                notification
+                for contract in contracts
+                for notification in assignment_notifications(
+                    contract, contract.new_assignments(None)
+                )
+            )
+    except DatabaseError as exc:
+        message = f"Database error: {exc}"
+        for number, _ in resolved:
+            report.add_error(number, {"non_field_errors": [message]})
+        return
+
+    report.created.extend(
+        {"row": number, "id": contract.pk, "contract_code": contract.contract_code}
+        for (number, _), contract in zip(resolved, contracts)
+    )
+
+
+def import_contracts(rows, user=None, batch_size=None):
+    """Import ``(row_number, data)`` pairs; returns an ImportReport"""
+    batch_size = batch_size or settings.CONTRACT_IMPORT_BATCH_SIZE
+    report = ImportReport()
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        import_batch(batch, user, report)
+    return report
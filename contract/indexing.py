@@ -0,0 +1,200 @@
+"""
+Background text extraction for contract documents.
+
+Uploads only schedule work; extraction runs on a small thread pool after the
+upload transaction commits (or from ``manage.py index_documents``). A document
+is re-processed only when the SHA-256 of its file differs from the hash it was
+last indexed with.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from xml.etree import ElementTree
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import ContractDocument, ContractDocumentChunk, ContractDocumentIndex
+from .search import SEARCH_CONFIG
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 2000
+READ_BLOCK_SIZE = 64 * 1024
+PLAIN_TEXT_EXTENSIONS = {".txt", ".csv", ".md", ".rtf", ".json", ".xml", ".html"}
+OFFICE_XML_PARTS = {
+    ".docx": re.compile(r"^word/(document|header\d*|footer\d*)\.xml$"),
+    ".pptx": re.compile(r"^ppt/slides/slide\d+\.xml$"),
+    ".xlsx": re.compile(r"^xl/sharedStrings\.xml$"),
+    ".odt": re.compile(r"^content\.xml$"),
+    ".ods": re.compile(r"^content\.xml$"),
+    ".odp": re.compile(r"^content\.xml$"),
+}
+
+
+class UnsupportedDocument(Exception):
+    pass
+
+
+# -----------------------------
+# Extraction
+# -----------------------------
+def _extract_pdf(fileobj):
+    from pypdf import PdfReader
+
+    reader = PdfReader(fileobj)
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def _extract_office_xml(fileobj, part_pattern):
+    paragraphs = []
+    with zipfile.ZipFile(fileobj) as archive:
+        for name in sorted(archive.namelist()):
+            if not part_pattern.match(name):
+                continue
+            root = ElementTree.fromstring(archive.read(name))
+            for element in root.iter():
+                # w:p, a:p, text:p, si ... end a paragraph-like block
+                if element.tag.rsplit("}", 1)[-1] in ("p", "si", "h"):
+                    text = "".join(element.itertext()).strip()
+                    if text:
+                        paragraphs.append(text)
+    return "\n".join(paragraphs)
+
+
+def extract_text(fileobj, name):
+    extension = os.path.splitext(name)[1].lower()
+    if extension == ".pdf":
+        return _extract_pdf(fileobj)
+    if extension in OFFICE_XML_PARTS:
+        return _extract_office_xml(fileobj, OFFICE_XML_PARTS[extension])
+    if extension in PLAIN_TEXT_EXTENSIONS:
+        return fileobj.read().decode("utf-8", errors="replace")
+    raise UnsupportedDocument(f"No text extractor for '{extension or name}'")
+
+
+def chunk_text(text, size=CHUNK_SIZE):
+    """Yield (start_offset, chunk) pieces of about ``size`` chars, split on whitespace"""
+    start, length = 0, len(text)
+    while start < length:
+        end = min(start + size, length)
+        if end < length:
+            split = text.rfind(" ", start + size // 2, end)
+            if split == -1:
+                split = text.rfind("\n", start + size // 2, end)
+            if split != -1:
+                end = split + 1
+        chunk = text[start:end]
+        if chunk.strip():
+            yield start, chunk
+        start = end
+
+
+def file_sha256(field_file):
+    digest = hashlib.sha256()
+    with field_file.open("rb") as handle:
+        for block in iter(lambda: handle.read(READ_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# -----------------------------
+# Indexing
+# -----------------------------
+def index_document(document_id, force=False):
+    """Extract and index one document; returns the resulting index status"""
+    document = ContractDocument.objects.filter(pk=document_id).first()
+    if document is None:
+        return None
+
+    index, _ = ContractDocumentIndex.objects.get_or_create(document=document)
+    # Content-addressed uploads carry their hash; older documents are read.
+    sha256 = document.sha256
+    if not sha256:
+        sha256 = file_sha256(document.file)
+        ContractDocument.objects.filter(pk=document.pk).update(
+            sha256=sha256, size=document.file.size
+        )
+    if not force and index.content_sha256 == sha256 and index.status != "failed":
+        return index.status
+
+    index.content_sha256 = sha256
+    index.error = ""
+    try:
+        with document.file.open("rb") as handle:
+            text = extract_text(handle, document.display_name)
+    except UnsupportedDocument as exc:
+        text, index.status, index.error = "", "unsupported", str(exc)
+    except Exception as exc:  # corrupt files must not stall the queue
+        logger.exception("Text extraction failed for document %s", document_id)
+        text, index.status, index.error = "", "failed", str(exc)
+    else:
+        index.status = "indexed"
+
+    with transaction.atomic():
+        ContractDocumentChunk.objects.filter(document=document).delete()
+        ContractDocumentChunk.objects.bulk_create(
+            ContractDocumentChunk(
+                document=document,
+                contract_id=document.contract_id,
+                position=position,
+                start_offset=start,
+                text=chunk,
+            )
+            for position, (start, chunk) in enumerate(chunk_text(text))
+        )
+        ContractDocumentChunk.objects.filter(document=document).update(
+            search_vector=SearchVector("text", config=SEARCH_CONFIG)
+        )
+        index.indexed_at = timezone.now()
+        index.save()
+    return index.status
+
+
+# -----------------------------
+# Worker pool
+# -----------------------------
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.DOCUMENT_INDEX_WORKERS,
+                thread_name_prefix="document-index",
+            )
+        return _executor
+
+
+def _run_index_job(document_id):
+    close_old_connections()
+    try:
+        index_document(document_id)
+    except Exception:
+        logger.exception("Indexing document %s failed", document_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_document_indexing(document_ids):
+    """Queue documents for extraction once the current transaction commits"""
+    if settings.DOCUMENT_INDEX_WORKERS <= 0:
+        return  # left to `manage.py index_documents`
+    document_ids = list(document_ids)
+
+    def submit():
+        executor = get_executor()
+        for document_id in document_ids:
+            executor.submit(_run_index_job, document_id)
+
+    transaction.on_commit(submit)
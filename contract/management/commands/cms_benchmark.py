@@ -0,0 +1,145 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from contract.benchmarks import (
+    SCENARIOS,
+    baseline_from,
+    compare_to_baseline,
+    run_api_benchmark,
+    seed_benchmark_data,
+)
+from users import activity
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / "contract" / "benchmark_baseline.json"
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic dataset in a throwaway test database, drive the main API "
+        "endpoints through an in-process client and report latency percentiles, "
+        "queries per request and peak memory. Fails when a result exceeds the "
+        "baseline thresholds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--departments", type=int, default=5)
+        parser.add_argument("--users-per-role", type=int, default=5)
+        parser.add_argument("--contracts", type=int, default=2000)
+        parser.add_argument(
+            "--documents", type=int, default=2, help="Documents per contract."
+        )
+        parser.add_argument(
+            "--history", type=int, default=2, help="Status changes per contract."
+        )
+        parser.add_argument(
+            "--comments", type=int, default=3, help="Comments per contract."
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            choices=sorted(SCENARIOS),
+            help="Run only this scenario; may be repeated.",
+        )
+        parser.add_argument("--output", help="Write the results as JSON to this file.")
+        parser.add_argument(
+            "--baseline",
+            default=str(DEFAULT_BASELINE),
+            help="JSON file of per-scenario ceilings (p50_ms, p95_ms, p99_ms, "
+            "queries, peak_kib).",
+        )
+        parser.add_argument(
+            "--no-baseline", action="store_true", help="Report without comparing."
+        )
+        parser.add_argument(
+            "--write-baseline",
+            action="store_true",
+            help="Store these results (with --headroom) as the new baseline.",
+        )
+        parser.add_argument(
+            "--headroom",
+            type=float,
+            default=3.0,
+            help="Multiplier applied to timings and memory by --write-baseline.",
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Reuse the test database between runs (it is still re-seeded).",
+        )
+
+    def handle(self, *args, **options):
+        # The benchmark writes thousands of rows; never let it touch the real
+        # database.
+        setup_test_environment(debug=False)
+        old_config = setup_databases(
+            verbosity=0, interactive=False, keepdb=options["keepdb"]
+        )
+        try:
+            users = seed_benchmark_data(
+                departments=options["departments"],
+                users_per_role=options["users_per_role"],
+                contracts=options["contracts"],
+                documents=options["documents"],
+                history=options["history"],
+                comments=options["comments"],
+                seed=options["seed"],
+            )
+            results = run_api_benchmark(
+                users,
+                scenarios=options["scenario"],
+                iterations=options["iterations"],
+                warmup=options["warmup"],
+            )
+        finally:
+            activity.flush()
+            teardown_databases(old_config, verbosity=0, keepdb=options["keepdb"])
+            teardown_test_environment()
+
+        self.report(results)
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(results, indent=2) + "\n")
+
+        baseline_path = Path(options["baseline"])
+        if options["write_baseline"]:
+            baseline = baseline_from(results, options["headroom"])
+            baseline_path.write_text(json.dumps(baseline, indent=2) + "\n")
+            self.stdout.write(f"Baseline written to {baseline_path}.")
+            return
+        if options["no_baseline"]:
+            return
+        try:
+            baseline = json.loads(baseline_path.read_text())
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot read baseline {baseline_path}: {exc}")
+
+        failures = compare_to_baseline(results, baseline)
+        for name, metric, value, limit in failures:
+            self.stderr.write(f"{name}: {metric} {value} exceeds baseline {limit}")
+        if failures:
+            raise CommandError(f"{len(failures)} result(s) exceed the baseline.")
+        self.stdout.write(self.style.SUCCESS("All results within the baseline."))
+
+    def report(self, results):
+        header = (
+            f"{'scenario':<16}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'queries':>9}{'peak KiB':>10}"
+        )
+        self.stdout.write(header)
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<16}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}"
+                f"{result['p99_ms']:>9.2f}{result['queries']:>9}"
+                f"{result['peak_kib']:>10.1f}"
+            )
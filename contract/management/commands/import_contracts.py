@@ -0,0 +1,56 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from contract.imports import IMPORT_FORMATS, detect_format, import_contracts, read_rows
+
+
+class Command(BaseCommand):
+    help = "Import contracts from a CSV or NDJSON file, reporting rows that fail."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or NDJSON (.ndjson/.jsonl) file.")
+        parser.add_argument(
+            "--format",
+            dest="import_format",
+            choices=IMPORT_FORMATS,
+            help="Input format; guessed from the file extension by default.",
+        )
+        parser.add_argument(
+            "--user",
+            help="Email of the user recorded as creator; their department is the "
+            "default for rows without one.",
+        )
+        parser.add_argument("--batch-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        user = None
+        if options["user"]:
+            user = get_user_model().objects.filter(email=options["user"]).first()
+            if user is None:
+                raise CommandError(f"No user with email {options['user']}.")
+
+        import_format = options["import_format"] or detect_format(options["path"])
+        try:
+            source = open(options["path"], "rb")
+        except OSError as exc:
+            raise CommandError(exc)
+        with source:
+            try:
+                report = import_contracts(
+                    read_rows(source, import_format),
+                    user=user,
+                    batch_size=options["batch_size"],
+                )
+            except ValidationError as exc:
+                raise CommandError(exc.detail)
+
+        result = report.as_dict()
+        for error in result["errors"]:
+            self.stderr.write(f"row {error['row']}: {error['errors']}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{result['created']} contract(s) imported, "
+                f"{result['failed']} row(s) failed."
+            )
+        )
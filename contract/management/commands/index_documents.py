@@ -0,0 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.db.models import Q
+
+from contract.indexing import index_document
+from contract.models import ContractDocument
+
+
+class Command(BaseCommand):
+    help = (
+        "Extract and index contract document text. Documents whose file hash "
+        "matches their last indexed hash are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Check every document, not only unindexed or failed ones.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-extract even when the content hash is unchanged.",
+        )
+        parser.add_argument("--workers", type=int, default=4)
+
+    def handle(self, *args, **options):
+        documents = ContractDocument.objects.order_by("id")
+        if not options["all"] and not options["force"]:
+            documents = documents.filter(
+                Q(text_index__isnull=True)
+                | Q(text_index__status__in=["pending", "failed"])
+            )
+        document_ids = list(documents.values_list("id", flat=True))
+
+        def run(document_id):
+            close_old_connections()
+            try:
+                return index_document(document_id, force=options["force"])
+            finally:
+                close_old_connections()
+
+        counts = {}
+        with ThreadPoolExecutor(max_workers=max(options["workers"], 1)) as pool:
+            for status in pool.map(run, document_ids):
+                counts[status] = counts.get(status, 0) + 1
+
+        summary = ", ".join(f"{k}: {v}" for k, v in sorted(counts.items(), key=str))
+        self.stdout.write(
+            self.style.SUCCESS(f"Processed {len(document_ids)} documents. {summary}")
+        )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from contract.rollups import rebuild_contract_stats, verify_contract_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the contract dashboard rollup table from scratch and verify it."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify-only",
+            action="store_true",
+            help="Compare the rollup table with the contracts table without rebuilding.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["verify_only"]:
+            rebuild_contract_stats()
+            self.stdout.write("Rollup table rebuilt.")
+
+        mismatches = verify_contract_stats()
+        for (status, department, contract_type), (stored, actual) in sorted(
+            mismatches.items(), key=str
+        ):
+            self.stderr.write(
+                f"status={status} department={department} type={contract_type}: "
+                f"stored {stored}, actual {actual}"
+            )
+        if mismatches:
+            raise CommandError(f"{len(mismatches)} rollup row(s) do not match.")
+        self.stdout.write(self.style.SUCCESS("Rollup table verified."))
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contract', '0002_contractcomment'),
+        ('users', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contract',
+            index=models.Index(fields=['-created_at', '-id'], name='contract_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contractcomment',
+            index=models.Index(fields=['contract', 'created_at', 'id'], name='comment_contract_created_idx'),
+        ),
+    ]
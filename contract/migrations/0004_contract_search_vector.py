@@ -0,0 +1,58 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:55
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations, models
+
+SEARCH_VECTOR_SQL = """
+CREATE OR REPLACE FUNCTION contract_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', translate(coalesce(NEW.contract_code, ''), '-', ' ')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.contract_title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.vendor_name, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.scope_of_work, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(NEW.instructions_for_reviewers, '')), 'D');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER contract_search_vector_trigger
+BEFORE INSERT OR UPDATE OF contract_code, contract_title, vendor_name, scope_of_work, instructions_for_reviewers
+ON contract_contract
+FOR EACH ROW EXECUTE FUNCTION contract_search_vector_update();
+
+UPDATE contract_contract SET contract_code = contract_code;
+"""
+
+DROP_SEARCH_VECTOR_SQL = """
+DROP TRIGGER IF EXISTS contract_search_vector_trigger ON contract_contract;
+DROP FUNCTION IF EXISTS contract_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contract', '0003_contract_keyset_indexes'),
+        ('users', '0002_customuser_keyset_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contract',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='Maintained by a database trigger', null=True),
+        ),
+        migrations.RunSQL(SEARCH_VECTOR_SQL, DROP_SEARCH_VECTOR_SQL),
+        migrations.AddIndex(
+            model_name='contract',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='contract_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contract',
+            index=models.Index(fields=['contract_code'], name='contract_code_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:57
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contract', '0004_contract_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContractDocumentIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_sha256', models.CharField(blank=True, max_length=64)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('indexed', 'Indexed'), ('unsupported', 'Unsupported'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('error', models.TextField(blank=True)),
+                ('indexed_at', models.DateTimeField(blank=True, null=True)),
+                ('document', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='text_index', to='contract.contractdocument')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ContractDocumentChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('start_offset', models.PositiveIntegerField()),
+                ('text', models.TextField()),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(editable=False, null=True)),
+                ('contract', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='document_chunks', to='contract.contract')),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='text_chunks', to='contract.contractdocument')),
+            ],
+            options={
+                'ordering': ['document', 'position'],
+                'indexes': [django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='document_chunk_search_idx')],
+                'constraints': [models.UniqueConstraint(fields=('document', 'position'), name='unique_document_chunk')],
+            },
+        ),
+    ]
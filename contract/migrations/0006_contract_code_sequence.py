@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:58
+
+import re
+
+from django.db import migrations, models
+
+CODE_RE = re.compile(r"^CON-(\d{4})-(\d+)$")
+
+
+def seed_sequences(apps, schema_editor):
+    """Start each year's counter after the highest code already issued"""
+    Contract = apps.get_model("contract", "Contract")
+    ContractCodeSequence = apps.get_model("contract", "ContractCodeSequence")
+    highest = {}
+    for code in Contract.objects.values_list("contract_code", flat=True).iterator():
+        match = CODE_RE.match(code or "")
+        if match:
+            year, number = int(match.group(1)), int(match.group(2))
+            highest[year] = max(highest.get(year, 0), number)
+    ContractCodeSequence.objects.bulk_create(
+        ContractCodeSequence(year=year, last_value=value)
+        for year, value in highest.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contract', '0005_contract_document_text_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContractCodeSequence',
+            fields=[
+                ('year', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('last_value', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_sequences, migrations.RunPython.noop),
+    ]
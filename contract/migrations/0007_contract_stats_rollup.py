@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def build_rollups(apps, schema_editor):
+    Contract = apps.get_model("contract", "Contract")
+    ContractStatsRollup = apps.get_model("contract", "ContractStatsRollup")
+    rows = (
+        Contract.objects.order_by()
+        .values("status", "department_id", "contract_type_id")
+        .annotate(count=Count("id"), value=Sum("estimated_contract_value"))
+    )
+    ContractStatsRollup.objects.bulk_create(
+        ContractStatsRollup(
+            status=row["status"],
+            department_id=row["department_id"],
+            contract_type_id=row["contract_type_id"],
+            contract_count=row["count"],
+            total_value=row["value"] or 0,
+        )
+        for row in rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contract', '0006_contract_code_sequence'),
+        ('users', '0002_customuser_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContractStatsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('draft', 'Draft'), ('submitted', 'Submitted'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('returned', 'Returned')], max_length=20)),
+                ('contract_count', models.IntegerField(default=0)),
+                ('total_value', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('contract_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contract.contracttype')),
+                ('department', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='users.department')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('status', 'department', 'contract_type'), name='unique_contract_stats_rollup')],
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:20
+
+import mimetypes
+import os
+
+import contract.models
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_metadata(apps, schema_editor):
+    # Hashes are filled in by the indexer, which reads every file anyway.
+    ContractDocument = apps.get_model("contract", "ContractDocument")
+    for document in ContractDocument.objects.filter(filename="").iterator():
+        document.filename = os.path.basename(document.file.name)[:255]
+        document.mime_type = (
+            mimetypes.guess_type(document.filename)[0] or "application/octet-stream"
+        )
+        try:
+            document.size = document.file.size
+        except OSError:
+            pass
+        document.save(update_fields=["filename", "mime_type", "size"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contract', '0007_contract_stats_rollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contractdocument',
+            name='filename',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='contractdocument',
+            name='mime_type',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='contractdocument',
+            name='sha256',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='contractdocument',
+            name='size',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='contractdocument',
+            name='file',
+            field=models.FileField(max_length=255, upload_to=contract.models.contract_document_path),
+        ),
+        migrations.CreateModel(
+            name='ContractDocumentUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255)),
+                ('mime_type', models.CharField(blank=True, max_length=100)),
+                ('size', models.BigIntegerField()),
+                ('received', models.BigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('contract', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='document_uploads', to='contract.contract')),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(backfill_metadata, migrations.RunPython.noop),
+    ]
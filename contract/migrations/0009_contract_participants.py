@@ -0,0 +1,100 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Mirrors contract.models.PARTICIPANT_ROLES at the time of this migration
+PARTICIPANT_ROLES = {
+    "legal_officer_id": "legal_officer",
+    "department_head_id": "department_head",
+    "signatory_id": "signatory",
+    "created_by_id": "creator",
+}
+
+
+def backfill_participants(apps, schema_editor):
+    Contract = apps.get_model("contract", "Contract")
+    ContractParticipant = apps.get_model("contract", "ContractParticipant")
+    batch = []
+    rows = Contract.objects.values_list("id", *PARTICIPANT_ROLES).iterator(
+        chunk_size=2000
+    )
+    for contract_id, *user_ids in rows:
+        batch.extend(
+            ContractParticipant(contract_id=contract_id, user_id=user_id, role=role)
+            for user_id, role in zip(user_ids, PARTICIPANT_ROLES.values())
+            if user_id
+        )
+        if len(batch) >= 2000:
+            ContractParticipant.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    ContractParticipant.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contract", "0008_document_content_addressing"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ContractParticipant",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "role",
+                    models.CharField(
+                        choices=[
+                            ("legal_officer", "Legal officer"),
+                            ("department_head", "Department head"),
+                            ("signatory", "Signatory"),
+                            ("creator", "Creator"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "contract",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="participants",
+                        to="contract.contract",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="contract_participations",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["user", "role", "contract"],
+                        name="participant_user_role_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("contract", "user", "role"),
+                        name="unique_contract_participant",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_participants, migrations.RunPython.noop),
+    ]
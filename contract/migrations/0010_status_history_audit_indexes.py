@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:35
+
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contract", "0009_contract_participants"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="contractstatushistory",
+            index=django.contrib.postgres.indexes.BrinIndex(
+                autosummarize=True,
+                fields=["changed_at"],
+                name="history_changed_at_brin",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="contractstatushistory",
+            index=models.Index(
+                fields=["changed_by", "changed_at", "id"],
+                name="history_changed_by_at_idx",
+            ),
+        ),
+    ]
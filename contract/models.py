@@ -1,8 +1,15 @@
-from django.db import models, transaction
+import os
+import uuid
+
+from django.db import connections, models, router, transaction
+from django.contrib.postgres.indexes import BrinIndex, GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db.models.functions import ExtractDay, Greatest
 from django.contrib.auth import get_user_model
 from users.models import Department
 from django.core.exceptions import ValidationError
 from django.utils import timezone
+from datetime import timedelta
 
 User = get_user_model()
 
@@ -27,6 +34,82 @@ CONTRACT_STATUS = [
     ("returned", "Returned"),
 ]
 
+EXPIRING_SOON_DAYS = 30
+
+# Columns whose previous values Contract.save() reads to maintain derived data
+TRACKED_FIELDS = (
+    "status",
+    "department_id",
+    "contract_type_id",
+    "estimated_contract_value",
+)
+
+# Reviewer roles; assigning someone to one of these notifies them
+ASSIGNMENT_FIELDS = {
+    "legal_officer_id": "legal officer",
+    "department_head_id": "department head",
+    "signatory_id": "signatory",
+}
+
+# Users notified about a contract's status changes and comments
+PARTICIPANT_FIELDS = (*ASSIGNMENT_FIELDS, "created_by_id")
+
+PARTICIPANT_ROLE_CHOICES = [
+    ("legal_officer", "Legal officer"),
+    ("department_head", "Department head"),
+    ("signatory", "Signatory"),
+    ("creator", "Creator"),
+]
+
+# ContractParticipant.role for each participant field
+PARTICIPANT_ROLES = {
+    "legal_officer_id": "legal_officer",
+    "department_head_id": "department_head",
+    "signatory_id": "signatory",
+    "created_by_id": "creator",
+}
+
+STATUS_TRANSITIONS = {
+    "draft": ["submitted"],
+    "submitted": ["approved", "rejected", "returned"],
+    "returned": ["submitted", "draft"],
+    "approved": [],
+    "rejected": [],
+}
+
+
+class ContractCodeSequence(models.Model):
+    """Per-year counter behind contract_code; numbers are unique, gaps are tolerated"""
+
+    year = models.PositiveIntegerField(primary_key=True)
+    last_value = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.year}: {self.last_value}"
+
+    @classmethod
+    def reserve(cls, year, count=1):
+        """
+        Atomically reserve ``count`` consecutive numbers for ``year``.
+
+        A single upsert on one small row; when called outside a transaction the
+        row lock is released immediately, so concurrent creates never queue
+        behind each other's inserts.
+        """
+        using = router.db_for_write(cls)
+        connection = connections[using]
+        table = connection.ops.quote_name(cls._meta.db_table)
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} (year, last_value) VALUES (%s, %s) "
+                f"ON CONFLICT (year) DO UPDATE "
+                f"SET last_value = {table}.last_value + EXCLUDED.last_value "
+                f"RETURNING last_value",
+                [year, count],
+            )
+            last_value = cursor.fetchone()[0]
+        return range(last_value - count + 1, last_value + 1)
+
 
 class ContractType(models.Model):
     type_name = models.CharField(max_length=100, unique=True)
@@ -44,11 +127,79 @@ class ContractDocument(models.Model):
     contract = models.ForeignKey(
         "Contract", on_delete=models.CASCADE, related_name="documents"
     )
-    file = models.FileField(upload_to=contract_document_path)
+    # Uploads through the API are stored content-addressed (blobs/ab/cd/<sha256>,
+    # see contract.uploads) and may be shared by several documents.
+    file = models.FileField(upload_to=contract_document_path, max_length=255)
+    filename = models.CharField(max_length=255, blank=True)
+    size = models.BigIntegerField(null=True, blank=True)
+    mime_type = models.CharField(max_length=100, blank=True)
+    sha256 = models.CharField(max_length=64, blank=True, db_index=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"{self.contract.contract_title} - {self.file.name}"
+        return f"{self.contract.contract_title} - {self.display_name}"
+
+    @property
+    def display_name(self):
+        return self.filename or os.path.basename(self.file.name)
+
+
+class ContractDocumentUpload(models.Model):
+    """A resumable upload in progress; bytes live in DOCUMENT_UPLOAD_TEMP_DIR"""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    contract = models.ForeignKey(
+        "Contract", on_delete=models.CASCADE, related_name="document_uploads"
+    )
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
+    filename = models.CharField(max_length=255)
+    mime_type = models.CharField(max_length=100, blank=True)
+    size = models.BigIntegerField()
+    received = models.BigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
+
+
+class ContractQuerySet(models.QuerySet):
+    def with_expiry(self, on=None):
+        """Annotate remaining_days, currently_active and expiring_soon as of ``on``"""
+        on = on or timezone.localdate()
+        remaining = models.ExpressionWrapper(
+            models.F("end_date") - models.Value(on, output_field=models.DateField()),
+            output_field=models.DurationField(),
+        )
+        return self.annotate(
+            remaining_days=Greatest(ExtractDay(remaining), models.Value(0)),
+            currently_active=models.Case(
+                models.When(
+                    status="approved", start_date__lte=on, end_date__gte=on, then=True
+                ),
+                default=False,
+                output_field=models.BooleanField(),
+            ),
+            expiring_soon=models.Case(
+                models.When(
+                    end_date__gt=on,
+                    end_date__lte=on + timedelta(days=EXPIRING_SOON_DAYS),
+                    then=True,
+                ),
+                default=False,
+                output_field=models.BooleanField(),
+            ),
+        )
+
+    def active_on(self, date):
+        return self.filter(status="approved", start_date__lte=date, end_date__gte=date)
+
+    def expiring_within(self, days, on=None):
+        """Approved contracts ending in the next ``days`` days (end_date/status indexes)"""
+        on = on or timezone.localdate()
+        return self.filter(
+            status="approved", end_date__gt=on, end_date__lte=on + timedelta(days=days)
+        )
 
 
 class Contract(models.Model):
@@ -105,6 +256,11 @@ class Contract(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(
+        null=True, editable=False, help_text="Maintained by a database trigger"
+    )
+
+    objects = ContractQuerySet.as_manager()
 
     class Meta:
         ordering = ["-created_at"]
@@ -114,6 +270,13 @@ class Contract(models.Model):
             models.Index(fields=["status"]),
             models.Index(fields=["end_date"]),
             models.Index(fields=["department"]),
+            models.Index(fields=["-created_at", "-id"], name="contract_created_id_idx"),
+            GinIndex(fields=["search_vector"], name="contract_search_vector_idx"),
+            models.Index(
+                fields=["contract_code"],
+                name="contract_code_prefix_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
         ]
 
     def __str__(self):
@@ -136,46 +299,83 @@ class Contract(models.Model):
     def total_days(self):
         return (self.end_date - self.start_date).days
 
+    # The properties below prefer values annotated by ContractQuerySet.with_expiry()
+
     @property
     def is_active(self):
+        if hasattr(self, "currently_active"):
+            return self.currently_active
         today = timezone.now().date()
         return self.start_date <= today <= self.end_date and self.status == "approved"
 
     @property
     def days_remaining(self):
+        if hasattr(self, "remaining_days"):
+            return self.remaining_days
         today = timezone.now().date()
         return max((self.end_date - today).days, 0)
 
     @property
     def is_expiring_soon(self):
-        return 0 < self.days_remaining <= 30
+        if hasattr(self, "expiring_soon"):
+            return self.expiring_soon
+        return 0 < self.days_remaining <= EXPIRING_SOON_DAYS
+
+    @classmethod
+    def allocate_codes(cls, count=1, year=None):
+        """Reserve a block of contract codes, e.g. for bulk creation"""
+        year = year or timezone.localdate().year
+        return [
+            f"CON-{year}-{number:04d}"
+            for number in ContractCodeSequence.reserve(year, count)
+        ]
+
+    def new_assignments(self, previous, update_fields=None):
+        """Reviewer fields whose (non-empty) value differs from ``previous``"""
+        saved = ASSIGNMENT_FIELDS.keys()
+        if update_fields is not None:
+            saved = {self._meta.get_field(name).attname for name in update_fields}
+        return {
+            field: getattr(self, field)
+            for field in ASSIGNMENT_FIELDS
+            if field in saved
+            and getattr(self, field)
+            and (previous is None or previous[field] != getattr(self, field))
+        }
 
-    @transaction.atomic
     def save(self, *args, **kwargs):
-        """Safe auto-generate contract code with transaction to avoid race conditions"""
+        from notification.services import notify_assignments
+        from .participants import sync_participants
+        from .rollups import apply_rollup_deltas, rollup_delta, tracked_values
+
         if not self.contract_code:
-            current_year = timezone.now().year
-            # Lock the table for safe counting
-            last_contract = (
-                Contract.objects.select_for_update()
-                .filter(created_at__year=timezone.now().year)
-                .order_by("id")
-                .last()
+            self.contract_code = self.allocate_codes()[0]
+
+        update_fields = kwargs.get("update_fields")
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = (
+                    Contract.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values(*TRACKED_FIELDS, *PARTICIPANT_FIELDS)
+                    .first()
+                )
+            super().save(*args, **kwargs)
+            current = tracked_values(self, previous, update_fields)
+            apply_rollup_deltas(rollup_delta(previous, current))
+            sync_participants(
+                self.pk,
+                previous,
+                tracked_values(self, previous, update_fields, PARTICIPANT_FIELDS),
             )
-            count = (last_contract.id if last_contract else 0) + 1
-            self.contract_code = f"CON-{current_year}-{count:04d}"
-        super().save(*args, **kwargs)
+            notify_assignments(self, self.new_assignments(previous, update_fields))
 
     def set_status(self, new_status, user=None, remarks=None):
         """Change status safely and log history"""
-        valid_transitions = {
-            "draft": ["submitted"],
-            "submitted": ["approved", "rejected", "returned"],
-            "returned": ["submitted", "draft"],
-            "approved": [],
-            "rejected": [],
-        }
-        if new_status not in valid_transitions.get(self.status, []):
+        from notification.services import contract_values, notify_status_changes
+
+        if new_status not in STATUS_TRANSITIONS.get(self.status, []):
             raise ValidationError(
                 f"Cannot transition from {self.status} to {new_status}"
             )
@@ -196,6 +396,109 @@ class Contract(models.Model):
             changed_by=user,
             remarks=remarks,
         )
+        notify_status_changes([contract_values(self)], new_status, actor=user)
+
+
+DOCUMENT_INDEX_STATUS = [
+    ("pending", "Pending"),
+    ("indexed", "Indexed"),
+    ("unsupported", "Unsupported"),
+    ("failed", "Failed"),
+]
+
+
+class ContractDocumentIndex(models.Model):
+    """Text extraction state of a document, keyed on its content hash"""
+
+    document = models.OneToOneField(
+        ContractDocument, on_delete=models.CASCADE, related_name="text_index"
+    )
+    content_sha256 = models.CharField(max_length=64, blank=True)
+    status = models.CharField(
+        max_length=20, choices=DOCUMENT_INDEX_STATUS, default="pending"
+    )
+    error = models.TextField(blank=True)
+    indexed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.document} ({self.status})"
+
+
+class ContractDocumentChunk(models.Model):
+    """A slice of extracted document text with its own search vector"""
+
+    document = models.ForeignKey(
+        ContractDocument, on_delete=models.CASCADE, related_name="text_chunks"
+    )
+    contract = models.ForeignKey(
+        "Contract", on_delete=models.CASCADE, related_name="document_chunks"
+    )
+    position = models.PositiveIntegerField()
+    start_offset = models.PositiveIntegerField()
+    text = models.TextField()
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        ordering = ["document", "position"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["document", "position"], name="unique_document_chunk"
+            ),
+        ]
+        indexes = [
+            GinIndex(fields=["search_vector"], name="document_chunk_search_idx"),
+        ]
+
+
+class ContractStatsRollup(models.Model):
+    """Running dashboard totals per (status, department, contract type)"""
+
+    status = models.CharField(max_length=20, choices=CONTRACT_STATUS)
+    department = models.ForeignKey(Department, on_delete=models.CASCADE)
+    contract_type = models.ForeignKey(ContractType, on_delete=models.CASCADE)
+    contract_count = models.IntegerField(default=0)
+    total_value = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["status", "department", "contract_type"],
+                name="unique_contract_stats_rollup",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.status} / {self.department_id} / {self.contract_type_id}"
+
+
+class ContractParticipant(models.Model):
+    """
+    Who is involved in a contract and how: one row per PARTICIPANT_FIELDS
+    value, maintained by Contract.save() (see contract.participants).
+    """
+
+    contract = models.ForeignKey(
+        Contract, on_delete=models.CASCADE, related_name="participants"
+    )
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="contract_participations"
+    )
+    role = models.CharField(max_length=20, choices=PARTICIPANT_ROLE_CHOICES)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["contract", "user", "role"], name="unique_contract_participant"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "role", "contract"], name="participant_user_role_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} as {self.role} on {self.contract_id}"
 
 
 class ContractStatusHistory(models.Model):
@@ -212,6 +515,18 @@ class ContractStatusHistory(models.Model):
 
     class Meta:
         ordering = ["-changed_at"]
+        indexes = [
+            # Rows are only ever appended, so changed_at follows the physical
+            # order and a BRIN index (a few pages for millions of rows) is
+            # enough to limit time-range scans to the matching block ranges.
+            BrinIndex(
+                fields=["changed_at"], name="history_changed_at_brin", autosummarize=True
+            ),
+            models.Index(
+                fields=["changed_by", "changed_at", "id"],
+                name="history_changed_by_at_idx",
+            ),
+        ]
 
 
 class ContractComment(models.Model):
@@ -226,19 +541,19 @@ class ContractComment(models.Model):
 
     class Meta:
         ordering = ["created_at"]
+        indexes = [
+            models.Index(
+                fields=["contract", "created_at", "id"],
+                name="comment_contract_created_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Comment by {self.user} on {self.contract.contract_title}"
 
     def clean(self):
         """Ensure only assigned users can comment"""
-        allowed_users = {
-            self.contract.legal_officer,
-            self.contract.department_head,
-            self.contract.signatory,
-            self.contract.created_by,
-        }
-        allowed_users.discard(None)  # remove None values
+        from .participants import is_participant
 
-        if self.user not in allowed_users:
+        if not is_participant(self.user_id, self.contract_id):
             raise ValidationError("You are not allowed to comment on this contract.")
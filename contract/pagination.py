@@ -0,0 +1,18 @@
+from CMS_Backend.pagination import KeysetPagination
+
+
+class ContractPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
+
+
+class ContractCommentPagination(KeysetPagination):
+    ordering = ("created_at", "id")
+
+
+class ExpiringContractPagination(KeysetPagination):
+    ordering = ("end_date", "id")
+
+
+class StatusHistoryPagination(KeysetPagination):
+    ordering = ("-changed_at", "-id")
+    max_page_size = 500
@@ -0,0 +1,69 @@
+"""
+Maintenance of ContractParticipant, the (contract, user, role) index behind
+comment authorisation and ``/api/contracts/mine/``.
+
+Membership questions become one indexed lookup on this table instead of an OR
+across the four user columns of Contract. Rows follow PARTICIPANT_FIELDS:
+Contract.save() diffs the old and new values, bulk imports insert them with
+the contracts, and deletes cascade from both the contract and the user.
+"""
+
+from django.db.models import Q
+
+from .models import PARTICIPANT_ROLES, ContractParticipant
+
+
+def participant_rows(values):
+    """``{(user_id, role)}`` for a contract's PARTICIPANT_FIELDS values"""
+    return {
+        (values[field], role)
+        for field, role in PARTICIPANT_ROLES.items()
+        if values.get(field)
+    }
+
+
+def sync_participants(contract_id, previous, current):
+    """Apply the participant changes between two sets of field values"""
+    old = participant_rows(previous) if previous else set()
+    new = participant_rows(current)
+    removed = old - new
+    if removed:
+        condition = Q()
+        for user_id, role in removed:
+            condition |= Q(user_id=user_id, role=role)
+        ContractParticipant.objects.filter(condition, contract_id=contract_id).delete()
+    add_participants(
+        ContractParticipant(contract_id=contract_id, user_id=user_id, role=role)
+        for user_id, role in new - old
+    )
+
+
+def add_participants(participants):
+    participants = list(participants)
+    if participants:
+        ContractParticipant.objects.bulk_create(participants, ignore_conflicts=True)
+
+
+def contract_participants(contracts):
+    """Unsaved ContractParticipant rows for freshly created ``contracts``"""
+    return [
+        ContractParticipant(contract_id=contract.pk, user_id=user_id, role=role)
+        for contract in contracts
+        for user_id, role in participant_rows(
+            {field: getattr(contract, field) for field in PARTICIPANT_ROLES}
+        )
+    ]
+
+
+def is_participant(user_id, contract_id):
+    return ContractParticipant.objects.filter(
+        contract_id=contract_id, user_id=user_id
+    ).exists()
+
+
+def participating_contract_ids(user, role=None):
+    """Subquery of the ids of contracts ``user`` takes part in"""
+    queryset = ContractParticipant.objects.filter(user=user)
+    if role:
+        queryset = queryset.filter(role=role)
+    return queryset.values("contract_id")
@@ -26,3 +26,25 @@ class IsProcurementOfficer(permissions.BasePermission):
             or request.user.role == "procurement_officer"
             or request.user.role == "admin"
         )
+
+
+class CanViewAllContracts(permissions.BasePermission):
+    """Staff, admins and procurement officers (read-only across contracts)"""
+
+    def has_permission(self, request, view):
+        return request.method in permissions.SAFE_METHODS and (
+            request.user.is_staff
+            or request.user.role in ("admin", "procurement_officer")
+        )
+
+
+def can_view_contract(user, contract):
+    """Staff, admins and procurement officers, or anyone assigned to the contract"""
+    if user.is_staff or user.role in ("admin", "procurement_officer"):
+        return True
+    return user.pk in {
+        contract.legal_officer_id,
+        contract.department_head_id,
+        contract.signatory_id,
+        contract.created_by_id,
+    }
@@ -0,0 +1,137 @@
+"""
+Incremental maintenance of ContractStatsRollup.
+
+Every write path that changes a contract's status, department, contract type
+or value (Contract.save, bulk_change_status, delete) turns the change into
+per-key deltas and applies them with one upsert, in the same transaction.
+"""
+
+from decimal import Decimal
+
+from django.db import connections, router, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
+
+from .models import TRACKED_FIELDS, Contract, ContractStatsRollup
+
+ZERO = Decimal("0")
+
+
+def tracked_values(contract, previous=None, update_fields=None, fields=TRACKED_FIELDS):
+    """Values of ``fields`` as stored after saving ``contract``"""
+    if previous is not None and update_fields is not None:
+        saved = {contract._meta.get_field(name).attname for name in update_fields}
+        return {
+            field: getattr(contract, field) if field in saved else previous[field]
+            for field in fields
+        }
+    return {field: getattr(contract, field) for field in fields}
+
+
+def _key(values):
+    return (values["status"], values["department_id"], values["contract_type_id"])
+
+
+def rollup_delta(previous, current, deltas=None):
+    """Accumulate {key: [count, value]} changes for one contract into ``deltas``"""
+    deltas = {} if deltas is None else deltas
+    for values, sign in ((previous, -1), (current, 1)):
+        if values is None:
+            continue
+        entry = deltas.setdefault(_key(values), [0, ZERO])
+        entry[0] += sign
+        entry[1] += sign * (values["estimated_contract_value"] or ZERO)
+    return deltas
+
+
+def apply_rollup_deltas(deltas):
+    rows = sorted(
+        (key, count, value)
+        for key, (count, value) in deltas.items()
+        if count or value
+    )
+    if not rows:
+        return
+
+    using = router.db_for_write(ContractStatsRollup)
+    connection = connections[using]
+    table = connection.ops.quote_name(ContractStatsRollup._meta.db_table)
+    placeholders = ", ".join(["(%s, %s, %s, %s, %s)"] * len(rows))
+    params = []
+    for (status, department_id, contract_type_id), count, value in rows:
+        params.extend([status, department_id, contract_type_id, count, value])
+
+    # Keys are sorted so concurrent writers lock rollup rows in the same order.
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} "
+            f"(status, department_id, contract_type_id, contract_count, total_value) "
+            f"VALUES {placeholders} "
+            f"ON CONFLICT (status, department_id, contract_type_id) DO UPDATE SET "
+            f"contract_count = {table}.contract_count + EXCLUDED.contract_count, "
+            f"total_value = {table}.total_value + EXCLUDED.total_value",
+            params,
+        )
+
+
+def computed_stats():
+    """Totals aggregated from the contracts table itself (rebuild/verify only)"""
+    rows = (
+        Contract.objects.order_by()
+        .values("status", "department_id", "contract_type_id")
+        .annotate(
+            contract_count=Count("id"),
+            total_value=Coalesce(Sum("estimated_contract_value"), ZERO),
+        )
+    )
+    return {
+        _key(row): (row["contract_count"], row["total_value"]) for row in rows
+    }
+
+
+def stored_stats():
+    rows = ContractStatsRollup.objects.exclude(contract_count=0, total_value=0)
+    return {
+        (row.status, row.department_id, row.contract_type_id): (
+            row.contract_count,
+            row.total_value,
+        )
+        for row in rows
+    }
+
+
+def verify_contract_stats():
+    """Return {key: (stored, computed)} for every rollup row that is wrong"""
+    computed, stored = computed_stats(), stored_stats()
+    empty = (0, ZERO)
+    return {
+        key: (stored.get(key, empty), computed.get(key, empty))
+        for key in computed.keys() | stored.keys()
+        if stored.get(key, empty) != computed.get(key, empty)
+    }
+
+
+@transaction.atomic
+def rebuild_contract_stats():
+    using = router.db_for_write(ContractStatsRollup)
+    connection = connections[using]
+    if connection.vendor == "postgresql":
+        # Hold off concurrent incremental updates while the table is replaced.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "LOCK TABLE %s IN EXCLUSIVE MODE"
+                % connection.ops.quote_name(ContractStatsRollup._meta.db_table)
+            )
+    ContractStatsRollup.objects.all().delete()
+    ContractStatsRollup.objects.bulk_create(
+        ContractStatsRollup(
+            status=status,
+            department_id=department_id,
+            contract_type_id=contract_type_id,
+            contract_count=count,
+            total_value=value,
+        )
+        for (status, department_id, contract_type_id), (count, value) in (
+            computed_stats().items()
+        )
+    )
@@ -0,0 +1,114 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import Case, F, FloatField, Q, Value, When
+
+SEARCH_CONFIG = "english"
+# Title/code, vendor, scope, reviewer instructions (D, C, B, A)
+SEARCH_WEIGHTS = [0.1, 0.2, 0.4, 1.0]
+SNIPPET_RADIUS = 120
+
+TERM_RE = re.compile(r"\w+")
+CONTRACT_CODE_RE = re.compile(r"^[A-Za-z]+-[\w-]*$")
+
+
+def build_search_query(text):
+    """Prefix-match every word: 'office clean' -> office:* & clean:*"""
+    terms = TERM_RE.findall(text)
+    if not terms:
+        return None
+    raw = " & ".join(f"{term}:*" for term in terms)
+    return SearchQuery(raw, search_type="raw", config=SEARCH_CONFIG)
+
+
+def search_contracts(queryset, text):
+    """
+    Rank contracts against ``text`` using the trigger-maintained search_vector
+    (GIN index). Inputs shaped like a contract code (``CON-2026-00``) also
+    match by code prefix through the varchar_pattern_ops index.
+    """
+    text = text.strip()
+    query = build_search_query(text)
+    if query is None:
+        return queryset.none()
+
+    condition = Q(search_vector=query)
+    rank = SearchRank(F("search_vector"), query, weights=SEARCH_WEIGHTS)
+    if CONTRACT_CODE_RE.match(text):
+        code_prefix = text.upper()
+        condition |= Q(contract_code__startswith=code_prefix)
+        rank = rank + Case(
+            When(contract_code__startswith=code_prefix, then=Value(1.0)),
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+
+    return queryset.filter(condition).annotate(rank=rank).order_by("-rank", "-id")
+
+
+def _match_offsets(text, terms):
+    pattern = re.compile(
+        r"\b(?:%s)\w*" % "|".join(re.escape(term) for term in terms), re.IGNORECASE
+    )
+    return [(match.start(), match.end()) for match in pattern.finditer(text)]
+
+
+def search_document_chunks(queryset, text, limit=20):
+    """
+    Best-matching chunk per document, with a snippet around the first hit.
+    Offsets (``snippet_start``, ``matches``) are positions in the document's
+    extracted text.
+    """
+    query = build_search_query(text)
+    if query is None:
+        return []
+    terms = TERM_RE.findall(text)
+
+    chunks = (
+        queryset.filter(search_vector=query)
+        .annotate(rank=SearchRank(F("search_vector"), query))
+        .select_related("document", "contract")
+        .only(
+            "id",
+            "position",
+            "start_offset",
+            "text",
+            "document__id",
+            "document__file",
+            "contract__id",
+            "contract__contract_code",
+            "contract__contract_title",
+        )
+        .order_by("-rank", "document_id", "position")[: limit * 3]
+    )
+
+    results, seen = [], set()
+    for chunk in chunks:
+        if chunk.document_id in seen:
+            continue
+        seen.add(chunk.document_id)
+
+        matches = _match_offsets(chunk.text, terms)
+        first = matches[0][0] if matches else 0
+        start = max(first - SNIPPET_RADIUS, 0)
+        end = min(first + SNIPPET_RADIUS, len(chunk.text))
+        results.append(
+            {
+                "contract_id": chunk.contract_id,
+                "contract_code": chunk.contract.contract_code,
+                "contract_title": chunk.contract.contract_title,
+                "document_id": chunk.document_id,
+                "file": chunk.document.file.name,
+                "rank": chunk.rank,
+                "snippet": chunk.text[start:end],
+                "snippet_start": chunk.start_offset + start,
+                "matches": [
+                    [chunk.start_offset + s, chunk.start_offset + e]
+                    for s, e in matches
+                    if start <= s < end
+                ],
+            }
+        )
+        if len(results) == limit:
+            break
+    return results
@@ -1,8 +1,11 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
 from .models import (
+    CONTRACT_STATUS,
     Contract,
     ContractDocument,
+    ContractDocumentUpload,
     ContractType,
     ContractStatusHistory,
     ContractComment,
@@ -20,8 +23,17 @@ class ContractTypeSerializer(serializers.ModelSerializer):
 class ContractDocumentSerializer(serializers.ModelSerializer):
     class Meta:
         model = ContractDocument
-        fields = ["id", "file", "uploaded_at"]
-        read_only_fields = ["uploaded_at"]
+        fields = [
+            "id",
+            "file",
+            "filename",
+            "size",
+            "mime_type",
+            "sha256",
+            "uploaded_at",
+        ]
+        # Content-addressed and immutable: upload a new document to replace one
+        read_only_fields = fields
 
 
 class ContractDocumentUploadSerializer(serializers.ModelSerializer):
@@ -32,6 +44,16 @@ class ContractDocumentUploadSerializer(serializers.ModelSerializer):
         fields = ["id", "file"]
 
 
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """A resumable upload session; ``received`` is the offset to continue from"""
+
+    class Meta:
+        model = ContractDocumentUpload
+        fields = ["id", "filename", "mime_type", "size", "received", "created_at"]
+        read_only_fields = ["id", "received", "created_at"]
+        extra_kwargs = {"size": {"min_value": 1}, "mime_type": {"required": False}}
+
+
 class ContractStatusHistorySerializer(serializers.ModelSerializer):
     changed_by = serializers.StringRelatedField(read_only=True)
 
@@ -41,6 +63,30 @@ class ContractStatusHistorySerializer(serializers.ModelSerializer):
         read_only_fields = ["changed_at", "changed_by"]
 
 
+class AuditStatusHistorySerializer(serializers.ModelSerializer):
+    contract_code = serializers.CharField(
+        source="contract.contract_code", read_only=True
+    )
+    changed_by_email = serializers.EmailField(
+        source="changed_by.email", read_only=True, default=None
+    )
+
+    class Meta:
+        model = ContractStatusHistory
+        fields = [
+            "id",
+            "contract",
+            "contract_code",
+            "old_status",
+            "new_status",
+            "changed_by",
+            "changed_by_email",
+            "remarks",
+            "changed_at",
+        ]
+        read_only_fields = fields
+
+
 class ContractSerializer(serializers.ModelSerializer):
     contract_type = ContractTypeSerializer(read_only=True)
     documents = ContractDocumentSerializer(many=True, read_only=True)
@@ -132,6 +178,19 @@ class ContractSerializer(serializers.ModelSerializer):
             "signatory",
         ]
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Load every relation the serializer renders in a fixed number of queries"""
+        return queryset.select_related(
+            "contract_type", "created_by", "updated_by"
+        ).prefetch_related(
+            Prefetch("documents", queryset=ContractDocument.objects.order_by("id")),
+            Prefetch(
+                "status_history",
+                queryset=ContractStatusHistory.objects.select_related("changed_by"),
+            ),
+        )
+
     def validate(self, data):
         start = data.get("start_date") or getattr(self.instance, "start_date", None)
         end = data.get("end_date") or getattr(self.instance, "end_date", None)
@@ -155,6 +214,129 @@ class ContractSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+class ContractImportRowSerializer(serializers.ModelSerializer):
+    """
+    One row of a bulk import. Related objects are given by name or email and
+    resolved per batch by contract.imports, so validating a row runs no queries.
+    """
+
+    contract_type = serializers.CharField(max_length=100)
+    department = serializers.CharField(max_length=100, required=False)
+    legal_officer = serializers.EmailField(required=False)
+    department_head = serializers.EmailField(required=False)
+    signatory = serializers.EmailField(required=False)
+
+    class Meta:
+        model = Contract
+        fields = [
+            "contract_title",
+            "vendor_name",
+            "contract_type",
+            "department",
+            "start_date",
+            "end_date",
+            "payment_terms",
+            "estimated_contract_value",
+            "renewal_terms",
+            "scope_of_work",
+            "status",
+            "remarks",
+            "instructions_for_reviewers",
+            "legal_officer",
+            "department_head",
+            "signatory",
+        ]
+
+    def to_internal_value(self, data):
+        # Empty CSV cells mean "not given"
+        if hasattr(data, "items"):
+            data = {
+                key: value for key, value in data.items() if value not in ("", None)
+            }
+        return super().to_internal_value(data)
+
+    def validate(self, data):
+        if data["end_date"] < data["start_date"]:
+            raise serializers.ValidationError("End date cannot be before start date.")
+        return data
+
+
+class BulkStatusChangeSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=10000
+    )
+    status = serializers.ChoiceField(choices=CONTRACT_STATUS)
+    remarks = serializers.CharField(required=False, allow_blank=True)
+
+
+class ContractExpirySerializer(serializers.ModelSerializer):
+    """Contract summary with values annotated by ContractQuerySet.with_expiry()"""
+
+    days_remaining = serializers.IntegerField(source="remaining_days", read_only=True)
+    is_active = serializers.BooleanField(source="currently_active", read_only=True)
+    is_expiring_soon = serializers.BooleanField(source="expiring_soon", read_only=True)
+
+    class Meta:
+        model = Contract
+        fields = [
+            "id",
+            "contract_code",
+            "contract_title",
+            "vendor_name",
+            "department",
+            "status",
+            "start_date",
+            "end_date",
+            "days_remaining",
+            "is_active",
+            "is_expiring_soon",
+        ]
+        read_only_fields = fields
+
+
+class MyContractSerializer(serializers.ModelSerializer):
+    """Contract summary with the requesting user's ``roles`` (annotated)"""
+
+    roles = serializers.ListField(child=serializers.CharField(), read_only=True)
+    status_display = serializers.CharField(source="get_status_display", read_only=True)
+
+    class Meta:
+        model = Contract
+        fields = [
+            "id",
+            "contract_code",
+            "contract_title",
+            "vendor_name",
+            "department",
+            "status",
+            "status_display",
+            "start_date",
+            "end_date",
+            "roles",
+        ]
+        read_only_fields = fields
+
+
+class ContractSearchResultSerializer(serializers.ModelSerializer):
+    rank = serializers.FloatField(read_only=True)
+    status_display = serializers.CharField(source="get_status_display", read_only=True)
+
+    class Meta:
+        model = Contract
+        fields = [
+            "id",
+            "contract_code",
+            "contract_title",
+            "vendor_name",
+            "department",
+            "status",
+            "status_display",
+            "end_date",
+            "rank",
+        ]
+        read_only_fields = fields
+
+
 class ContractCommentSerializer(serializers.ModelSerializer):
     user = serializers.StringRelatedField(read_only=True)
 
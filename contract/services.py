@@ -0,0 +1,78 @@
+from django.db import transaction
+from django.utils import timezone
+
+from notification.services import notify_status_changes
+from .models import (
+    CONTRACT_STATUS,
+    PARTICIPANT_FIELDS,
+    STATUS_TRANSITIONS,
+    TRACKED_FIELDS,
+    Contract,
+    ContractStatusHistory,
+)
+from .rollups import apply_rollup_deltas, rollup_delta
+
+
+def allowed_sources(new_status):
+    """Statuses a contract may be in to move to ``new_status``"""
+    return [source for source, targets in STATUS_TRANSITIONS.items() if new_status in targets]
+
+
+@transaction.atomic
+def bulk_change_status(contract_ids, new_status, user=None, remarks=None):
+    """
+    Move many contracts to ``new_status`` in a fixed number of queries: lock
+    and read current statuses, one conditional UPDATE, one rollup upsert, one
+    bulk history insert and one bulk notification insert.
+
+    Returns ``(updated_ids, failures)``; ``failures`` maps contract id to reason.
+    """
+    contract_ids = list(dict.fromkeys(contract_ids))
+    if new_status not in dict(CONTRACT_STATUS):
+        return [], {pk: f"Unknown status '{new_status}'." for pk in contract_ids}
+
+    sources = allowed_sources(new_status)
+    current = {
+        row["id"]: row
+        for row in Contract.objects.select_for_update()
+        .filter(id__in=contract_ids)
+        .order_by("id")
+        .values("id", "contract_code", *TRACKED_FIELDS, *PARTICIPANT_FIELDS)
+    }
+
+    failures = {}
+    for pk in contract_ids:
+        if pk not in current:
+            failures[pk] = "Contract not found."
+        elif current[pk]["status"] not in sources:
+            failures[pk] = (
+                f"Cannot transition from {current[pk]['status']} to {new_status}"
+            )
+    updated_ids = [pk for pk in contract_ids if pk not in failures]
+    if not updated_ids:
+        return [], failures
+
+    changes = {"status": new_status, "updated_at": timezone.now()}
+    if remarks:
+        changes["remarks"] = remarks
+    if user:
+        changes["updated_by"] = user
+    Contract.objects.filter(id__in=updated_ids, status__in=sources).update(**changes)
+
+    deltas = {}
+    for pk in updated_ids:
+        rollup_delta(current[pk], {**current[pk], "status": new_status}, deltas)
+    apply_rollup_deltas(deltas)
+
+    ContractStatusHistory.objects.bulk_create(
+        ContractStatusHistory(
+            contract_id=pk,
+            old_status=current[pk]["status"],
+            new_status=new_status,
+            changed_by=user,
+            remarks=remarks,
+        )
+        for pk in updated_ids
+    )
+    notify_status_changes([current[pk] for pk in updated_ids], new_status, actor=user)
+    return updated_ids, failures
@@ -0,0 +1,50 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from notification.services import notify_comment
+from users.models import Department
+from .bootstrap import USER_FIELDS, invalidate_bootstrap
+from .indexing import schedule_document_indexing
+from .models import Contract, ContractComment, ContractDocument, ContractType
+from .rollups import apply_rollup_deltas, rollup_delta, tracked_values
+
+
+@receiver(post_save, sender=ContractDocument)
+def index_uploaded_document(sender, instance, created, **kwargs):
+    """Extract text off the request path once the upload is committed"""
+    schedule_document_indexing([instance.pk])
+
+
+@receiver(post_save, sender=ContractComment)
+def notify_contract_participants(sender, instance, created, **kwargs):
+    if created:
+        notify_comment(instance)
+
+
+@receiver(post_delete, sender=Contract)
+def remove_contract_from_rollups(sender, instance, origin=None, **kwargs):
+    # Deleting a department or type cascades to its rollup rows as well;
+    # upserting a delta for them would reference the row being deleted.
+    model = getattr(origin, "model", type(origin))
+    if issubclass(model, (Department, ContractType)):
+        return
+    apply_rollup_deltas(rollup_delta(tracked_values(instance), None))
+
+
+@receiver(post_save, sender=ContractType)
+@receiver(post_delete, sender=ContractType)
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def refresh_bootstrap(sender, **kwargs):
+    # After commit, or a concurrent request could cache the old data under
+    # the new version until the next write.
+    transaction.on_commit(invalidate_bootstrap)
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def refresh_bootstrap_for_user(sender, update_fields=None, **kwargs):
+    if update_fields is None or USER_FIELDS.intersection(update_fields):
+        transaction.on_commit(invalidate_bootstrap)
@@ -1,3 +1,1379 @@
-from django.test import TestCase
+import csv
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, connections
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.test import (
+    RequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from CMS_Backend.db_router import (
+    ReplicaMiddleware,
+    ReplicaPool,
+    ReplicaRouter,
+    pool,
+    reads_from_primary,
+)
+from CMS_Backend.metrics import render_metrics, reset_metrics
+from users import activity
+from users.models import Department
+from .benchmarks import (
+    compare_to_baseline,
+    run_api_benchmark,
+    run_code_allocation_benchmark,
+    seed_benchmark_data,
+)
+from .bootstrap import invalidate_bootstrap
+from .indexing import index_document
+from notification.models import Notification
+from notification.services import unread_count
+from .models import (
+    Contract,
+    ContractCodeSequence,
+    ContractDocument,
+    ContractParticipant,
+    ContractStatsRollup,
+    ContractStatusHistory,
+    ContractType,
+)
+from .rollups import verify_contract_stats
+from .services import bulk_change_status
+
+User = get_user_model()
+
+
+class ContractTestMixin:
+    """Shared fixtures for contract API tests"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Finance")
+        cls.contract_type = ContractType.objects.create(type_name="Service")
+        cls.officer = User.objects.create_user(
+            email="officer@example.com",
+            password="password",
+            full_name="Procurement Officer",
+            role="procurement_officer",
+            department=cls.department,
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.officer)
+        self.addCleanup(activity.discard)
+
+    def make_contract(self, **kwargs):
+        today = timezone.now().date()
+        values = {
+            "contract_title": "Office cleaning",
+            "vendor_name": "Acme Services",
+            "contract_type": self.contract_type,
+            "department": self.department,
+            "start_date": today,
+            "end_date": today + timedelta(days=365),
+            "payment_terms": "installment",
+            "created_by": self.officer,
+            "updated_by": self.officer,
+        }
+        values.update(kwargs)
+        return Contract.objects.create(**values)
+
+
+class ContractListQueryCountTests(ContractTestMixin, TestCase):
+    def populate(self, count):
+        for index in range(count):
+            contract = self.make_contract(contract_title=f"Contract {index}")
+            ContractDocument.objects.create(
+                contract=contract, file=f"contracts/{contract.id}/scope.pdf"
+            )
+            ContractStatusHistory.objects.create(
+                contract=contract,
+                old_status="draft",
+                new_status="submitted",
+                changed_by=self.officer,
+            )
+
+    def test_list_query_count_does_not_grow_with_page(self):
+        self.populate(2)
+        # validators, page, documents prefetch, history prefetch
+        with self.assertNumQueries(4):
+            response = self.client.get("/api/contracts/")
+        self.assertEqual(len(response.data["results"]), 2)
+
+        self.populate(8)
+        with self.assertNumQueries(4):
+            response = self.client.get("/api/contracts/")
+        self.assertEqual(len(response.data["results"]), 10)
+
+    def test_detail_query_count(self):
+        self.populate(1)
+        contract = Contract.objects.get()
+        with self.assertNumQueries(4):
+            response = self.client.get(f"/api/contracts/{contract.id}/")
+        self.assertEqual(len(response.data["documents"]), 1)
+        self.assertEqual(response.data["status_history"][0]["changed_by"], str(self.officer))
+
+
+class ContractKeysetPaginationTests(ContractTestMixin, TestCase):
+    def test_walks_forward_and_back_without_gaps(self):
+        contracts = [self.make_contract(contract_title=f"C{i}") for i in range(7)]
+        # Identical timestamps exercise the id tiebreaker.
+        Contract.objects.update(created_at=timezone.now())
+        expected = [c.id for c in sorted(contracts, key=lambda c: -c.id)]
+
+        seen, url, pages = [], "/api/contracts/?page_size=3", []
+        while url:
+            response = self.client.get(url)
+            self.assertNotIn("count", response.data)
+            pages.append(response.data)
+            seen.extend(row["id"] for row in response.data["results"])
+            url = response.data["next"]
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(pages), 3)
+
+        response = self.client.get(pages[-1]["previous"])
+        self.assertEqual(
+            [row["id"] for row in response.data["results"]],
+            [row["id"] for row in pages[1]["results"]],
+        )
+
+    def test_estimated_count_on_request(self):
+        self.make_contract()
+        response = self.client.get("/api/contracts/?count=estimate")
+        self.assertIsInstance(response.data["estimated_count"], int)
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/contracts/?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, 404)
+
+
+class ContractSearchTests(ContractTestMixin, TestCase):
+    def test_ranked_search_and_code_prefix(self):
+        cleaning = self.make_contract(
+            contract_title="Office cleaning", scope_of_work="Daily janitorial work"
+        )
+        self.make_contract(contract_title="Printer lease", vendor_name="Cleanprint Ltd")
+        self.make_contract(contract_title="Catering", vendor_name="Foodies")
+
+        response = self.client.get("/api/contracts/search/?q=clean")
+        self.assertEqual(response.status_code, 200)
+        ids = [row["id"] for row in response.data]
+        self.assertEqual(len(ids), 2)
+        self.assertEqual(ids[0], cleaning.id)
+
+        response = self.client.get("/api/contracts/search/?q=janitor")
+        self.assertEqual([row["id"] for row in response.data], [cleaning.id])
+
+        prefix = cleaning.contract_code[:-2].lower()
+        response = self.client.get(f"/api/contracts/search/?q={prefix}")
+        self.assertIn(cleaning.id, [row["id"] for row in response.data])
+
+    def test_rejects_short_query(self):
+        response = self.client.get("/api/contracts/search/?q=a")
+        self.assertEqual(response.status_code, 400)
+
+
+class DocumentIndexingTests(ContractTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def make_document(self, contract, name, content):
+        document = ContractDocument(contract=contract)
+        document.file.save(name, ContentFile(content), save=True)
+        return document
+
+    def test_index_is_incremental_and_searchable(self):
+        contract = self.make_contract()
+        body = "Preamble. " * 300 + "The supplier shall carry indemnity insurance."
+        document = self.make_document(contract, "terms.txt", body.encode())
+
+        self.assertEqual(index_document(document.id), "indexed")
+        chunks = list(document.text_chunks.all())
+        self.assertGreater(len(chunks), 1)
+        first_chunk_id = chunks[0].id
+
+        # Unchanged content is not processed again.
+        self.assertEqual(index_document(document.id), "indexed")
+        self.assertEqual(document.text_chunks.first().id, first_chunk_id)
+
+        response = self.client.get("/api/contracts/documents/search/?q=indemnity")
+        self.assertEqual(response.status_code, 200)
+        [hit] = response.data
+        self.assertEqual(hit["document_id"], document.id)
+        self.assertEqual(hit["contract_id"], contract.id)
+        start, end = hit["matches"][0]
+        self.assertEqual(body[start:end], "indemnity")
+
+    def test_unsupported_format(self):
+        document = self.make_document(self.make_contract(), "scan.bin", b"\x00\x01")
+        self.assertEqual(index_document(document.id), "unsupported")
+
+
+class DocumentStorageMixin(ContractTestMixin):
+    """Contract fixtures with MEDIA_ROOT and upload dirs in a temp directory"""
+
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            DOCUMENT_UPLOAD_TEMP_DIR=os.path.join(self.media_root, "partial"),
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+
+class DocumentUploadTests(DocumentStorageMixin, TestCase):
+    def test_multi_file_upload_is_content_addressed(self):
+        first, second = self.make_contract(), self.make_contract()
+        body = b"Scope of work\n" * 100
+        sha256 = hashlib.sha256(body).hexdigest()
+
+        response = self.client.post(
+            f"/api/contracts/{first.id}/documents/",
+            {
+                "files": [
+                    SimpleUploadedFile("scope.txt", body, "text/plain"),
+                    SimpleUploadedFile("notes.pdf", b"%PDF-1.4 notes"),
+                ]
+            },
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 201)
+        scope = response.data[0]
+        self.assertEqual(scope["filename"], "scope.txt")
+        self.assertEqual(scope["size"], len(body))
+        self.assertEqual(scope["sha256"], sha256)
+        self.assertEqual(response.data[1]["mime_type"], "application/pdf")
+
+        self.client.post(
+            f"/api/contracts/{second.id}/documents/",
+            {"files": [SimpleUploadedFile("copy.txt", body)]},
+            format="multipart",
+        )
+        names = set(
+            ContractDocument.objects.filter(sha256=sha256).values_list("file", flat=True)
+        )
+        self.assertEqual(names, {f"blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}"})
+
+        response = self.client.get(f"/api/contracts/{second.id}/documents/")
+        self.assertEqual([d["filename"] for d in response.data["results"]], ["copy.txt"])
+
+    def test_resumable_upload(self):
+        contract = self.make_contract()
+        body = b"0123456789" * 10
+        response = self.client.post(
+            f"/api/contracts/{contract.id}/documents/uploads/",
+            {"filename": "scan.txt", "size": len(body)},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        url = f"/api/contracts/{contract.id}/documents/uploads/{response.data['id']}/"
+
+        def put(start, end):
+            return self.client.generic(
+                "PUT",
+                url,
+                body[start : end + 1],
+                content_type="application/octet-stream",
+                HTTP_CONTENT_RANGE=f"bytes {start}-{end}/{len(body)}",
+            )
+
+        self.assertEqual(put(0, 39).data["received"], 40)
+        # A retried or skipped chunk is rejected with the offset to resume from.
+        response = put(60, 99)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["received"], 40)
+        self.assertEqual(self.client.get(url).data["received"], 40)
+
+        response = put(40, 99)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["sha256"], hashlib.sha256(body).hexdigest())
+        document = ContractDocument.objects.get(pk=response.data["id"])
+        with document.file.open("rb") as handle:
+            self.assertEqual(handle.read(), body)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_resumable_upload_hashes_chunks_as_they_arrive(self):
+        contract = self.make_contract()
+        response = self.client.post(
+            f"/api/contracts/{contract.id}/documents/uploads/",
+            {"filename": "scan.txt", "size": 30},
+            format="json",
+        )
+        url = f"/api/contracts/{contract.id}/documents/uploads/{response.data['id']}/"
+
+        def upload(body):
+            responses = []
+            for start in range(0, len(body), 10):
+                with self.captureOnCommitCallbacks(execute=True):
+                    responses.append(
+                        self.client.generic(
+                            "PUT",
+                            url,
+                            body[start : start + 10],
+                            content_type="application/octet-stream",
+                            HTTP_CONTENT_RANGE=f"bytes {start}-{start + 9}/30",
+                        )
+                    )
+            return responses[-1]
+
+        body = b"abcdefghij" * 3
+        with mock.patch("contract.uploads.file_digest") as file_digest:
+            response = upload(body)
+        file_digest.assert_not_called()
+        self.assertEqual(response.data["sha256"], hashlib.sha256(body).hexdigest())
+
+        # A session this process has not hashed from the start is read back.
+        response = self.client.post(
+            f"/api/contracts/{contract.id}/documents/uploads/",
+            {"filename": "other.txt", "size": 30},
+            format="json",
+        )
+        url = f"/api/contracts/{contract.id}/documents/uploads/{response.data['id']}/"
+        body = b"0123456789" * 3
+        with mock.patch("contract.uploads._take_digest", return_value=None):
+            response = upload(body)
+        self.assertEqual(response.data["sha256"], hashlib.sha256(body).hexdigest())
+
+    def test_documents_cannot_be_replaced_in_place(self):
+        contract = self.make_contract()
+        response = self.client.post(
+            f"/api/contracts/{contract.id}/documents/",
+            {"files": [SimpleUploadedFile("one.txt", b"one")]},
+            format="multipart",
+        )
+        url = f"/api/contracts/{contract.id}/documents/{response.data[0]['id']}/"
+        for method in ("put", "patch"):
+            response = getattr(self.client, method)(
+                url,
+                {"file": SimpleUploadedFile("two.txt", b"two two")},
+                format="multipart",
+            )
+            self.assertEqual(response.status_code, 405)
+        document = ContractDocument.objects.get(contract=contract)
+        with document.file.open("rb") as handle:
+            self.assertEqual(handle.read(), b"one")
+
+
+class DocumentDownloadTests(DocumentStorageMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.body = bytes(range(256)) * 4
+        self.contract = self.make_contract()
+        response = self.client.post(
+            f"/api/contracts/{self.contract.id}/documents/",
+            {"files": [SimpleUploadedFile("scan.pdf", self.body)]},
+            format="multipart",
+        )
+        self.document = response.data[0]
+        self.url = (
+            f"/api/contracts/{self.contract.id}/documents/"
+            f"{self.document['id']}/download/"
+        )
+
+    def test_full_download(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), self.body)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertEqual(response["ETag"], f'"{self.document["sha256"]}"')
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+
+    def test_range_requests(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=10-19")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 10-19/{len(self.body)}")
+        self.assertEqual(response["Content-Length"], "10")
+        self.assertEqual(b"".join(response.streaming_content), self.body[10:20])
+
+        response = self.client.get(self.url, HTTP_RANGE="bytes=-4")
+        self.assertEqual(b"".join(response.streaming_content), self.body[-4:])
+
+        response = self.client.get(
+            self.url, HTTP_RANGE="bytes=10-19", HTTP_IF_RANGE='"stale"'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), self.body)
+
+        response = self.client.get(self.url, HTTP_RANGE=f"bytes={len(self.body)}-")
+        self.assertEqual(response.status_code, 416)
+
+    def test_access_is_checked(self):
+        outsider = User.objects.create_user(
+            email="outsider@example.com",
+            password="password",
+            full_name="Outsider",
+            role="legal_reviewer",
+        )
+        self.client.force_authenticate(outsider)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    @override_settings(DOCUMENT_DOWNLOAD_MODE="x-accel")
+    def test_proxy_offload(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"")
+        sha256 = self.document["sha256"]
+        self.assertEqual(
+            response["X-Accel-Redirect"],
+            f"/protected-media/blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}",
+        )
+
+
+class DocumentArchiveTests(DocumentStorageMixin, TestCase):
+    def upload(self, contract, *files):
+        response = self.client.post(
+            f"/api/contracts/{contract.id}/documents/",
+            {"files": [SimpleUploadedFile(name, body) for name, body in files]},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 201)
+
+    def read_archive(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/zip")
+        return zipfile.ZipFile(BytesIO(b"".join(response.streaming_content)))
+
+    def test_contract_archive(self):
+        contract = self.make_contract()
+        text = b"Terms and conditions\n" * 500
+        self.upload(contract, ("terms.txt", text), ("scan.pdf", b"%PDF-1.4 scan"))
+        self.upload(contract, ("terms.txt", b"Revised terms"))
+
+        archive = self.read_archive(
+            self.client.get(f"/api/contracts/{contract.id}/documents/archive/")
+        )
+
+        self.assertEqual(archive.namelist(), ["terms.txt", "scan.pdf", "terms (2).txt"])
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(archive.read("terms.txt"), text)
+        self.assertEqual(
+            archive.getinfo("terms.txt").compress_type, zipfile.ZIP_DEFLATED
+        )
+        self.assertEqual(archive.getinfo("scan.pdf").compress_type, zipfile.ZIP_STORED)
+
+    def test_multi_contract_archive(self):
+        first, second = self.make_contract(), self.make_contract()
+        self.upload(first, ("a.txt", b"first"))
+        self.upload(second, ("a.txt", b"second"))
+
+        archive = self.read_archive(
+            self.client.get(
+                f"/api/contracts/documents/archive/?ids={first.id},{second.id}"
+            )
+        )
+        self.assertEqual(archive.read(f"{first.contract_code}/a.txt"), b"first")
+        self.assertEqual(archive.read(f"{second.contract_code}/a.txt"), b"second")
+
+        response = self.client.get(
+            f"/api/contracts/documents/archive/?ids={first.id},0"
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_access_is_checked(self):
+        contract = self.make_contract()
+        outsider = User.objects.create_user(
+            email="outsider@example.com",
+            password="password",
+            full_name="Outsider",
+            role="legal_reviewer",
+        )
+        self.client.force_authenticate(outsider)
+        response = self.client.get(f"/api/contracts/{contract.id}/documents/archive/")
+        self.assertEqual(response.status_code, 403)
+        response = self.client.get(
+            f"/api/contracts/documents/archive/?ids={contract.id}"
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+class ContractCodeAllocationTests(ContractTestMixin, TestCase):
+    def test_codes_follow_per_year_counter(self):
+        year = timezone.localdate().year
+        ContractCodeSequence.objects.create(year=year, last_value=41)
+        self.assertEqual(self.make_contract().contract_code, f"CON-{year}-0042")
+
+    def test_block_reservation(self):
+        codes = Contract.allocate_codes(3, year=2031)
+        self.assertEqual(codes, ["CON-2031-0001", "CON-2031-0002", "CON-2031-0003"])
+        self.assertEqual(Contract.allocate_codes(year=2031), ["CON-2031-0004"])
+        self.assertEqual(Contract.allocate_codes(year=2032), ["CON-2032-0001"])
+
+
+class ContractCodeConcurrencyBenchmark(TransactionTestCase):
+    def test_concurrent_creates_get_unique_codes(self):
+        if connection.vendor == "sqlite":
+            self.skipTest("SQLite serialises writers")
+        department = Department.objects.create(name="Benchmark")
+        contract_type = ContractType.objects.create(type_name="Benchmark")
+
+        result = run_code_allocation_benchmark(
+            contract_type, department, threads=8, per_thread=10
+        )
+
+        self.assertEqual(result["errors"], [])
+        self.assertEqual(result["created"], 80)
+        self.assertEqual(result["unique_codes"], 80)
+
+
+class ApiBenchmarkTests(TestCase):
+    def test_seed_and_run_every_scenario(self):
+        users = seed_benchmark_data(
+            departments=2, users_per_role=2, contracts=20, documents=1, comments=1
+        )
+        self.assertEqual(Contract.objects.count(), 20)
+        self.assertEqual(ContractDocument.objects.count(), 20)
+        self.assertEqual(verify_contract_stats(), {})
+
+        results = run_api_benchmark(users, iterations=3, warmup=1, memory_runs=1)
+
+        self.assertEqual(len(results), 8)
+        for result in results.values():
+            self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+            self.assertGreater(result["peak_kib"], 0)
+        self.assertEqual(
+            compare_to_baseline(results, {"login": {"queries": 0}}),
+            [("login", "queries", results["login"]["queries"], 0)],
+        )
+
+
+class BulkStatusTests(ContractTestMixin, TestCase):
+    def test_bulk_transition_reports_failures(self):
+        drafts = [self.make_contract() for _ in range(5)]
+        approved = self.make_contract(status="approved")
+
+        ids = [c.id for c in drafts] + [approved.id, 999999]
+        response = self.client.post(
+            "/api/contracts/bulk-status/",
+            {"ids": ids, "status": "submitted", "remarks": "Batch"},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["updated"], [c.id for c in drafts])
+        self.assertEqual(
+            {row["id"] for row in response.data["failed"]}, {approved.id, 999999}
+        )
+        self.assertEqual(
+            Contract.objects.filter(status="submitted", remarks="Batch").count(), 5
+        )
+        self.assertEqual(
+            ContractStatusHistory.objects.filter(
+                old_status="draft", new_status="submitted", changed_by=self.officer
+            ).count(),
+            5,
+        )
+
+    def test_query_count_is_independent_of_batch_size(self):
+        ids = [self.make_contract().id for _ in range(20)]
+        # savepoint, lock+read, update, rollup upsert, history insert, release
+        with self.assertNumQueries(6):
+            updated, failures = bulk_change_status(ids, "submitted", user=self.officer)
+        self.assertEqual(len(updated), 20)
+        self.assertEqual(failures, {})
+
+
+class ContractExpiryTests(ContractTestMixin, TestCase):
+    def test_annotations_match_properties(self):
+        today = timezone.localdate()
+        self.make_contract(status="approved", end_date=today + timedelta(days=10))
+        self.make_contract(status="approved", end_date=today + timedelta(days=90))
+        self.make_contract(status="draft", end_date=today + timedelta(days=5))
+
+        for contract in Contract.objects.with_expiry():
+            plain = Contract.objects.get(pk=contract.pk)
+            self.assertEqual(contract.remaining_days, plain.days_remaining)
+            self.assertEqual(contract.currently_active, plain.is_active)
+            self.assertEqual(contract.expiring_soon, plain.is_expiring_soon)
+
+    def test_expiring_endpoint(self):
+        today = timezone.localdate()
+        later = self.make_contract(status="approved", end_date=today + timedelta(days=20))
+        sooner = self.make_contract(status="approved", end_date=today + timedelta(days=3))
+        self.make_contract(status="approved", end_date=today + timedelta(days=60))
+        self.make_contract(status="draft", end_date=today + timedelta(days=3))
+
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/contracts/expiring/?days=30")
+        self.assertEqual(
+            [row["id"] for row in response.data["results"]], [sooner.id, later.id]
+        )
+        self.assertEqual(response.data["results"][0]["days_remaining"], 3)
+        self.assertTrue(response.data["results"][0]["is_expiring_soon"])
+
+
+class ContractExportTests(ContractTestMixin, TestCase):
+    def read(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_export_applies_list_filters(self):
+        approved = self.make_contract(
+            status="approved", estimated_contract_value=Decimal("12.50")
+        )
+        self.make_contract(status="draft")
+
+        listed = self.client.get("/api/contracts/?status=approved")
+        self.assertEqual([row["id"] for row in listed.data["results"]], [approved.id])
+
+        with override_settings(EXPORT_CHUNK_SIZE=1):
+            body = self.read(self.client.get("/api/contracts/export/?status=approved"))
+        rows = list(csv.DictReader(StringIO(body)))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["contract_code"], approved.contract_code)
+        self.assertEqual(rows[0]["department"], "Finance")
+        self.assertEqual(rows[0]["estimated_contract_value"], "12.50")
+        self.assertEqual(rows[0]["created_by"], self.officer.email)
+
+    def test_history_ndjson_export(self):
+        contract = self.make_contract()
+        contract.set_status("submitted", user=self.officer)
+        self.make_contract().set_status("submitted", user=self.officer)
+
+        body = self.read(
+            self.client.get(
+                f"/api/contracts/history/export/?output=ndjson&contract={contract.id}"
+            )
+        )
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["contract_code"], contract.contract_code)
+        self.assertEqual(rows[0]["new_status"], "submitted")
+        self.assertEqual(rows[0]["changed_by"], self.officer.email)
+
+    def test_history_export_requires_audit_access(self):
+        reviewer = User.objects.create_user(
+            email="reviewer@example.com",
+            password="password",
+            full_name="Reviewer",
+            role="legal_reviewer",
+        )
+        self.client.force_authenticate(reviewer)
+        response = self.client.get("/api/contracts/history/export/")
+        self.assertEqual(response.status_code, 403)
+        self.client.force_authenticate(None)
+        response = self.client.get("/api/contracts/history/export/")
+        self.assertEqual(response.status_code, 401)
+
+    def test_invalid_parameters(self):
+        response = self.client.get("/api/contracts/export/?output=xlsx")
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get("/api/contracts/history/export/?contract=abc")
+        self.assertEqual(response.status_code, 400)
+
+
+class ContractImportTests(ContractTestMixin, TestCase):
+    CSV = (
+        "contract_title,vendor_name,contract_type,department,start_date,end_date,"
+        "payment_terms,estimated_contract_value,legal_officer\n"
+        "Cleaning,Acme,Service,,2020-01-01,2020-12-31,installment,100.00,"
+        "reviewer@example.com\n"
+        "Catering,Foodco,Unknown,,2020-01-01,2020-12-31,installment,,\n"
+        "Security,Guards,Service,Finance,2021-01-01,2020-01-01,installment,,\n"
+        "Printing,Inkworks,Service,Finance,2021-01-01,2021-06-30,others,5.50,"
+        "nobody@example.com\n"
+        "Transport,Wheels,Service,Finance,2021-01-01,2021-06-30,one_time_payment,,\n"
+    )
+
+    def setUp(self):
+        super().setUp()
+        self.reviewer = User.objects.create_user(
+            email="reviewer@example.com",
+            password="password",
+            full_name="Reviewer",
+            role="legal_reviewer",
+        )
+
+    def test_csv_import_reports_row_errors(self):
+        upload = SimpleUploadedFile("legacy.csv", self.CSV.encode(), "text/csv")
+        with self.assertNumQueries(12):
+            response = self.client.post(
+                "/api/contracts/import/", {"file": upload}, format="multipart"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(
+            [error["row"] for error in response.data["errors"]], [2, 3, 4]
+        )
+        self.assertIn("contract_type", response.data["errors"][0]["errors"])
+        self.assertIn("legal_officer", response.data["errors"][2]["errors"])
+
+        first, second = response.data["contracts"]
+        contract = Contract.objects.get(pk=first["id"])
+        self.assertEqual(contract.contract_code, first["contract_code"])
+        self.assertEqual(contract.department, self.department)
+        self.assertEqual(contract.created_by, self.officer)
+        self.assertEqual(contract.legal_officer, self.reviewer)
+        self.assertNotEqual(first["contract_code"], second["contract_code"])
+        self.assertTrue(
+            Notification.objects.filter(
+                recipient=self.reviewer, contract=contract, category="assignment"
+            ).exists()
+        )
+        self.assertEqual(verify_contract_stats(), {})
+
+    def test_unreadable_rows_are_reported(self):
+        lines = self.CSV.encode().splitlines(keepends=True)
+        lines[1] = lines[1].replace(b"Acme", "Acm\u00e9".encode("cp1252"))
+        lines[5] = lines[5].replace(b"Wheels", b"Whe\x00ls")
+        upload = SimpleUploadedFile("legacy.csv", b"".join(lines), "text/csv")
+        response = self.client.post(
+            "/api/contracts/import/", {"file": upload}, format="multipart"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [error["row"] for error in response.data["errors"]], [1, 2, 3, 4, 5]
+        )
+        for error in (response.data["errors"][0], response.data["errors"][4]):
+            self.assertIn("not UTF-8", error["errors"]["non_field_errors"][0])
+
+        row = {
+            "contract_title": "Caf\u00e9",
+            "vendor_name": "Acme",
+            "contract_type": "Service",
+            "start_date": "2020-01-01",
+            "end_date": "2020-12-31",
+            "payment_terms": "installment",
+        }
+        body = (
+            json.dumps(row, ensure_ascii=False).encode("latin-1")
+            + b"\n"
+            + json.dumps(row).encode()
+        )
+        response = self.client.post(
+            "/api/contracts/import/",
+            {"file": SimpleUploadedFile("legacy.ndjson", body)},
+            format="multipart",
+        )
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual([error["row"] for error in response.data["errors"]], [1])
+
+        header = "contract_title,vendor_name\u00e9\n".encode("latin-1")
+        response = self.client.post(
+            "/api/contracts/import/",
+            {"file": SimpleUploadedFile("legacy.csv", header)},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_ndjson_command(self):
+        rows = [
+            {
+                "contract_title": f"Legacy {index}",
+                "vendor_name": "Acme",
+                "contract_type": "Service",
+                "department": "Finance",
+                "start_date": "2019-01-01",
+                "end_date": "2019-12-31",
+                "payment_terms": "installment",
+                "status": "approved",
+            }
+            for index in range(5)
+        ]
+        path = os.path.join(tempfile.mkdtemp(), "legacy.ndjson")
+        self.addCleanup(shutil.rmtree, os.path.dirname(path))
+        with open(path, "w") as handle:
+            handle.write("\n".join(json.dumps(row) for row in rows) + "\n[]\n")
+
+        stdout, stderr = StringIO(), StringIO()
+        call_command(
+            "import_contracts", path, "--batch-size", "2", stdout=stdout, stderr=stderr
+        )
+        self.assertIn("5 contract(s) imported, 1 row(s) failed", stdout.getvalue())
+        self.assertIn("row 6", stderr.getvalue())
+        self.assertEqual(Contract.objects.filter(status="approved").count(), 5)
+        self.assertEqual(verify_contract_stats(), {})
+
+
+class ContractParticipantTests(ContractTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.reviewer, self.other_reviewer = (
+            User.objects.create_user(
+                email=f"reviewer{index}@example.com",
+                password="password",
+                full_name=f"Reviewer {index}",
+                role="legal_reviewer",
+            )
+            for index in (1, 2)
+        )
+
+    def participants(self, contract):
+        return set(
+            ContractParticipant.objects.filter(contract=contract).values_list(
+                "user_id", "role"
+            )
+        )
+
+    def test_rows_follow_assignments(self):
+        contract = self.make_contract(legal_officer=self.reviewer)
+        self.assertEqual(
+            self.participants(contract),
+            {(self.officer.id, "creator"), (self.reviewer.id, "legal_officer")},
+        )
+
+        contract.legal_officer = self.other_reviewer
+        contract.save(update_fields=["legal_officer"])
+        self.assertEqual(
+            self.participants(contract),
+            {(self.officer.id, "creator"), (self.other_reviewer.id, "legal_officer")},
+        )
+
+        contract.legal_officer = None
+        contract.save()
+        self.assertEqual(self.participants(contract), {(self.officer.id, "creator")})
+
+    def test_comment_authorisation(self):
+        contract = self.make_contract(legal_officer=self.reviewer)
+        url = f"/api/contracts/{contract.id}/comments/"
+
+        self.client.force_authenticate(self.reviewer)
+        data = {"contract": contract.id, "comment": "Looks fine"}
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(self.client.get(url).data["results"]), 1)
+
+        self.client.force_authenticate(self.other_reviewer)
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(url).data["results"], [])
+
+    def test_mine_endpoint(self):
+        reviewing = self.make_contract(legal_officer=self.reviewer)
+        submitted = self.make_contract(legal_officer=self.reviewer)
+        submitted.set_status("submitted", user=self.officer)
+        self.make_contract(legal_officer=self.other_reviewer)
+
+        self.client.force_authenticate(self.reviewer)
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/contracts/mine/")
+        self.assertEqual(
+            [row["id"] for row in response.data["results"]],
+            [submitted.id, reviewing.id],
+        )
+        self.assertEqual(response.data["results"][0]["roles"], ["legal_officer"])
+
+        response = self.client.get("/api/contracts/mine/?status=submitted")
+        self.assertEqual([row["id"] for row in response.data["results"]], [submitted.id])
+
+        self.client.force_authenticate(self.officer)
+        response = self.client.get("/api/contracts/mine/?role=legal_officer")
+        self.assertEqual(response.data["results"], [])
+        response = self.client.get("/api/contracts/mine/?role=creator")
+        self.assertEqual(len(response.data["results"]), 3)
+        response = self.client.get("/api/contracts/mine/?role=owner")
+        self.assertEqual(response.status_code, 400)
+
+
+class StatusHistoryAuditTests(ContractTestMixin, TestCase):
+    url = "/api/audit/status-history/"
+
+    def test_filters_and_keyset_pages(self):
+        other = User.objects.create_user(
+            email="other@example.com",
+            password="password",
+            full_name="Other Officer",
+            role="procurement_officer",
+            department=self.department,
+        )
+        legal = Department.objects.create(name="Legal")
+        contracts = [self.make_contract() for _ in range(3)]
+        for contract in contracts:
+            contract.set_status("submitted", user=self.officer)
+        legal_contract = self.make_contract(department=legal)
+        legal_contract.set_status("submitted", user=other)
+        old = ContractStatusHistory.objects.get(contract=contracts[0])
+        old.changed_at = timezone.now() - timedelta(days=200)
+        old.save(update_fields=["changed_at"])
+
+        with self.assertNumQueries(1):
+            response = self.client.get(f"{self.url}?changed_by={self.officer.id}")
+        self.assertEqual(
+            [row["contract"] for row in response.data["results"]],
+            [contracts[2].id, contracts[1].id, contracts[0].id],
+        )
+        self.assertEqual(
+            response.data["results"][0]["changed_by_email"], self.officer.email
+        )
+
+        since = (timezone.now() - timedelta(days=90)).isoformat()
+        response = self.client.get(self.url, {"changed_at__gte": since, "page_size": 2})
+        self.assertEqual(len(response.data["results"]), 2)
+        response = self.client.get(response.data["next"])
+        self.assertEqual(
+            [row["contract"] for row in response.data["results"]], [contracts[1].id]
+        )
+        self.assertIsNone(response.data["next"])
+
+        response = self.client.get(f"{self.url}?department={legal.id}")
+        self.assertEqual(
+            [row["contract_code"] for row in response.data["results"]],
+            [legal_contract.contract_code],
+        )
+
+    def test_reviewers_cannot_read_the_audit_log(self):
+        reviewer = User.objects.create_user(
+            email="reviewer@example.com",
+            password="password",
+            full_name="Reviewer",
+            role="legal_reviewer",
+        )
+        self.client.force_authenticate(reviewer)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class ContractStatsRollupTests(ContractTestMixin, TestCase):
+    def test_rollups_follow_every_write_path(self):
+        other_department = Department.objects.create(name="Legal")
+        first = self.make_contract(estimated_contract_value=Decimal("100.00"))
+        second = self.make_contract(estimated_contract_value=Decimal("50.50"))
+        self.make_contract()
+
+        first.set_status("submitted", user=self.officer)
+        second.department = other_department
+        second.save()
+        bulk_change_status([first.id], "approved", user=self.officer)
+        Contract.objects.get(pk=second.pk).delete()
+
+        self.assertEqual(verify_contract_stats(), {})
+
+        with self.assertNumQueries(4):
+            response = self.client.get("/api/contracts/stats/")
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(response.data["total_value"], Decimal("100.00"))
+        by_status = {row["status"]: row["count"] for row in response.data["by_status"]}
+        self.assertEqual(by_status, {"approved": 1, "draft": 1})
+
+    def test_deleting_department_or_type_with_contracts(self):
+        other_type = ContractType.objects.create(type_name="Supply")
+        self.make_contract()
+        self.make_contract(contract_type=other_type)
+
+        other_type.delete()
+        connection.check_constraints()
+        self.assertEqual(verify_contract_stats(), {})
+
+        self.department.delete()
+        connection.check_constraints()
+        self.assertFalse(Contract.objects.exists())
+        self.assertEqual(verify_contract_stats(), {})
+
+    def test_rebuild_repairs_drift(self):
+        self.make_contract(estimated_contract_value=Decimal("10.00"))
+        ContractStatsRollup.objects.update(contract_count=5)
+        self.assertNotEqual(verify_contract_stats(), {})
+
+        call_command("rebuild_contract_stats", stdout=StringIO())
+        self.assertEqual(verify_contract_stats(), {})
+
+
+class BootstrapTests(ContractTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        invalidate_bootstrap()
+
+    def test_cached_payload_and_etag(self):
+        reviewer = User.objects.create_user(
+            email="reviewer@example.com",
+            password="password",
+            full_name="Legal Reviewer",
+            role="legal_reviewer",
+        )
+        response = self.client.get("/api/bootstrap/")
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        data = response.json()
+        self.assertEqual(data["contract_types"][0]["type_name"], "Service")
+        self.assertEqual([u["id"] for u in data["legal_reviewers"]], [reviewer.id])
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/bootstrap/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # Activity timestamps do not invalidate; reference data changes do.
+        reviewer.save(update_fields=["last_active"])
+        with self.assertNumQueries(0):
+            self.client.get("/api/bootstrap/")
+        with self.captureOnCommitCallbacks(execute=True):
+            ContractType.objects.create(type_name="Supply")
+            # Not before the change is committed
+            response = self.client.get("/api/bootstrap/", HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+        response = self.client.get("/api/bootstrap/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+class ConditionalGetTests(ContractTestMixin, TestCase):
+    def test_detail_not_modified_until_related_change(self):
+        contract = self.make_contract()
+        url = f"/api/contracts/{contract.id}/"
+        response = self.client.get(url)
+        etag = response["ETag"]
+        self.assertTrue(response.has_header("Last-Modified"))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        ContractDocument.objects.create(contract=contract, file="contracts/x/a.pdf")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_list_not_modified(self):
+        contract = self.make_contract()
+        response = self.client.get("/api/contracts/")
+        etag = response["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/contracts/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        contract.contract_title = "Renamed"
+        contract.save()
+        response = self.client.get("/api/contracts/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_modified_since_after_deleting_newest_row(self):
+        contract = self.make_contract()
+        document = ContractDocument.objects.create(
+            contract=contract, file="contracts/x/a.pdf"
+        )
+        ContractDocument.objects.filter(pk=document.pk).update(
+            uploaded_at=timezone.now() + timedelta(days=1)
+        )
+        since = http_date((timezone.now() + timedelta(days=1)).timestamp())
+        document.delete()
+
+        for url in ("/api/contracts/", f"/api/contracts/{contract.id}/"):
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+            self.assertEqual(response.status_code, 200)
+        self.assertFalse(self.client.get("/api/contracts/").has_header("Last-Modified"))
+
+
+class RequestMetricsTests(ContractTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        reset_metrics()
+        self.addCleanup(reset_metrics)
+
+    def test_route_histograms(self):
+        self.make_contract()
+        self.client.get("/api/contracts/")
+        self.client.get("/api/contracts/")
+
+        text = render_metrics()
+        labels = 'route="contracts-list",method="GET"'
+        self.assertIn(f"cms_db_queries_count{{{labels}}} 2", text)
+        self.assertIn(f"cms_view_duration_seconds_count{{{labels}}} 2", text)
+        self.assertIn(f"cms_render_duration_seconds_count{{{labels}}} 2", text)
+        self.assertIn(f"cms_response_size_bytes_count{{{labels}}} 2", text)
+        self.assertIn(
+            f'cms_request_duration_seconds_count{{{labels},status="200"}} 2', text
+        )
+
+    def test_server_timing_is_admin_opt_in(self):
+        response = self.client.get("/api/contracts/", HTTP_X_SERVER_TIMING="1")
+        self.assertFalse(response.has_header("Server-Timing"))
+
+        admin = User.objects.create_user(
+            email="admin@example.com",
+            password="password",
+            full_name="Admin",
+            role="admin",
+        )
+        self.client.force_authenticate(admin)
+        self.assertFalse(self.client.get("/api/contracts/").has_header("Server-Timing"))
+        response = self.client.get("/api/contracts/", HTTP_X_SERVER_TIMING="1")
+        self.assertRegex(
+            response["Server-Timing"],
+            r'^db;dur=[\d.]+;desc="\d+ queries", view;dur=[\d.]+, '
+            r"render;dur=[\d.]+, total;dur=[\d.]+$",
+        )
+
+    def test_metrics_endpoint_requires_token(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 404)
+        with override_settings(METRICS_TOKEN="scrape-secret"):
+            self.assertEqual(
+                self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer nope").status_code,
+                401,
+            )
+            response = self.client.get(
+                "/metrics", HTTP_AUTHORIZATION="Bearer scrape-secret"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("# TYPE cms_db_queries histogram", response.content.decode())
+
+
+class ReplicaRoutingTests(ContractTestMixin, TestCase):
+    """Routing decisions only: "replica_1" is never queried"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+        self.token = f"Bearer {AccessToken.for_user(self.officer)}"
+        choose = mock.patch.object(pool, "choose", return_value="replica_1")
+        self.choose = choose.start()
+        self.addCleanup(choose.stop)
+        replicas = override_settings(DATABASE_REPLICAS={"replica_1": 1})
+        replicas.enable()
+        self.addCleanup(replicas.disable)
+
+    def request(self, method, path, view=None, **headers):
+        """``(database of reads in the view, response)``"""
+        seen = {}
+
+        def get_response(request):
+            response = view(request) if view else HttpResponse()
+            seen["read"] = self.router.db_for_read(Contract)
+            return response
+
+        request = getattr(self.factory, method)(path, **headers)
+        response = ReplicaMiddleware(get_response)(request)
+        return seen["read"], response
+
+    def test_only_safe_api_requests_read_from_replica(self):
+        self.assertEqual(self.request("get", "/api/contracts/")[0], "replica_1")
+        self.assertEqual(self.request("head", "/api/contracts/")[0], "replica_1")
+        self.assertEqual(self.request("post", "/api/contracts/")[0], "default")
+        self.assertEqual(self.request("get", "/admin/")[0], "default")
+        self.assertEqual(self.router.db_for_read(Contract), "default")
+        self.assertEqual(self.router.db_for_write(Contract), "default")
+
+    def test_write_pins_client_to_primary(self):
+        def write(request):
+            self.router.db_for_write(Contract)
+            return HttpResponse()
+
+        read, _ = self.request(
+            "get", "/api/contracts/", view=write, HTTP_AUTHORIZATION=self.token
+        )
+        self.assertEqual(read, "default")
+        read, _ = self.request("get", "/api/contracts/", HTTP_AUTHORIZATION=self.token)
+        self.assertEqual(read, "default")
+        # Other clients are not pinned
+        self.assertEqual(self.request("get", "/api/contracts/")[0], "replica_1")
+
+        cache.clear()
+        read, _ = self.request("get", "/api/contracts/", HTTP_AUTHORIZATION=self.token)
+        self.assertEqual(read, "replica_1")
+
+    def test_pin_outlasts_replica_lag(self):
+        # A real pool whose replica is as far behind as rotation allows
+        self.choose.side_effect = ReplicaPool().choose
+        lag = mock.patch(
+            "CMS_Backend.db_router.replica_lag",
+            return_value=settings.READ_REPLICA_MAX_LAG,
+        )
+        lag.start()
+        self.addCleanup(lag.stop)
+        wall, monotonic = time.time(), time.monotonic()
+
+        def read_after(seconds):
+            with mock.patch("time.time", return_value=wall + seconds), mock.patch(
+                "time.monotonic", return_value=monotonic + seconds
+            ):
+                read, _ = self.request(
+                    "get", "/api/contracts/", HTTP_AUTHORIZATION=self.token
+                )
+            return read
+
+        def write(request):
+            self.router.db_for_write(Contract)
+            return HttpResponse()
+
+        self.request(
+            "post", "/api/contracts/", view=write, HTTP_AUTHORIZATION=self.token
+        )
+        # The write may not have been replayed yet
+        self.assertEqual(read_after(settings.READ_REPLICA_MAX_LAG + 1), "default")
+        sticky = settings.READ_REPLICA_STICKY_SECONDS
+        self.assertEqual(read_after(sticky - 1), "default")
+        self.assertEqual(read_after(sticky + 1), "replica_1")
+
+    def test_pin_shorter_than_lag_is_rejected(self):
+        with override_settings(
+            READ_REPLICA_STICKY_SECONDS=5,
+            READ_REPLICA_MAX_LAG=10,
+            READ_REPLICA_CHECK_INTERVAL=5,
+        ):
+            with self.assertRaises(ImproperlyConfigured):
+                ReplicaMiddleware(HttpResponse)
+
+    def test_cache_fills_read_from_primary(self):
+        def fill(request):
+            with reads_from_primary():
+                request.fill_read = self.router.db_for_read(Contract)
+            return HttpResponse(request.fill_read)
+
+        read, response = self.request("get", "/api/bootstrap/", view=fill)
+        self.assertEqual(response.content, b"default")
+        self.assertEqual(read, "replica_1")
+
+    def test_unread_count_fills_cache_from_primary(self):
+        Notification.objects.create(recipient=self.officer, title="Assigned")
+
+        def count(request):
+            return HttpResponse(unread_count(self.officer))
+
+        with CaptureQueriesContext(connection) as captured:
+            read, response = self.request("get", "/api/notifications/", view=count)
+        self.assertEqual(read, "replica_1")
+        self.assertEqual(response.content, b"1")
+        self.assertEqual(len(captured), 1)
+
+    def test_streaming_responses(self):
+        def reads():
+            yield self.router.db_for_read(Contract)
+
+        _, response = self.request(
+            "get",
+            "/api/contracts/export/",
+            view=lambda r: StreamingHttpResponse(reads()),
+        )
+        self.assertEqual(b"".join(response.streaming_content), b"replica_1")
+
+        async def events():
+            yield b"data: {}\n\n"
+
+        _, response = self.request(
+            "get",
+            "/api/notifications/stream/",
+            view=lambda r: StreamingHttpResponse(events()),
+        )
+        self.assertTrue(response.is_async)
+        self.assertTrue(hasattr(response.streaming_content, "__aiter__"))
+
+        _, response = self.request(
+            "get",
+            "/api/contracts/1/documents/1/download/",
+            view=lambda r: FileResponse(BytesIO(b"document")),
+        )
+        self.assertIsNotNone(response.file_to_stream)
+        self.assertEqual(b"".join(response.streaming_content), b"document")
+
+    def test_pool_drops_unhealthy_replicas(self):
+        # The default database stands in for a replica; it is never behind.
+        replicas = ReplicaPool()
+        with override_settings(DATABASE_REPLICAS={"default": 1}):
+            self.assertEqual(replicas.choose(), "default")
+            replicas.reset()
+            with override_settings(READ_REPLICA_MAX_LAG=-1):
+                self.assertIsNone(replicas.choose())
+            # Until the next check is due
+            self.assertIsNone(replicas.choose())
+            with override_settings(READ_REPLICA_CHECK_INTERVAL=0):
+                self.assertEqual(replicas.choose(), "default")
+        with override_settings(DATABASE_REPLICAS={"default": 0}):
+            self.assertIsNone(replicas.choose())
+
+
+REPLICA_ALIASES = [alias for alias in settings.DATABASES if alias != "default"]
+
+
+@skipUnless(
+    REPLICA_ALIASES,
+    "set DATABASE_REPLICA_URLS (e.g. to a second local database) to run",
+)
+class ReadReplicaTests(TransactionTestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        self.department = Department.objects.create(name="Finance")
+        self.contract_type = ContractType.objects.create(type_name="Service")
+        self.officer = User.objects.create_user(
+            email="officer@example.com",
+            password="password",
+            full_name="Procurement Officer",
+            role="procurement_officer",
+            department=self.department,
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.officer)}"
+        )
+        self.replica = REPLICA_ALIASES[0]
+        pool.reset()
+        cache.clear()
+        self.addCleanup(pool.reset)
+        self.addCleanup(activity.discard)
+
+    def replica_queries(self, method, path, data=None):
+        with CaptureQueriesContext(connections[self.replica]) as captured:
+            response = getattr(self.client, method)(path, data, format="json")
+        self.assertLess(response.status_code, 400, response.content)
+        return len(captured)
+
+    def test_reads_use_replica_until_client_writes(self):
+        with override_settings(DATABASE_REPLICAS={self.replica: 1}):
+            self.assertGreater(self.replica_queries("get", "/api/contracts/"), 0)
+
+            today = timezone.localdate()
+            created = self.replica_queries(
+                "post",
+                "/api/contracts/",
+                {
+                    "contract_title": "Office cleaning",
+                    "vendor_name": "Acme Services",
+                    "contract_type_id": self.contract_type.pk,
+                    "department": self.department.pk,
+                    "start_date": today.isoformat(),
+                    "end_date": (today + timedelta(days=365)).isoformat(),
+                    "payment_terms": "installment",
+                },
+            )
+            self.assertEqual(created, 0)
+            # Pinned to the primary to read its own write
+            self.assertEqual(self.replica_queries("get", "/api/contracts/"), 0)
+
+            cache.clear()
+            self.assertGreater(self.replica_queries("get", "/api/contracts/"), 0)
+
+    def test_lagging_replica_leaves_rotation(self):
+        with override_settings(
+            DATABASE_REPLICAS={self.replica: 1}, READ_REPLICA_MAX_LAG=-1
+        ):
+            response = self.client.get("/api/contracts/")
+            self.assertEqual(response.status_code, 200)
+            self.assertIsNone(response.wsgi_request.db_replica)
+            self.assertIsNone(pool.choose())
+        pool.reset()
+        with override_settings(DATABASE_REPLICAS={self.replica: 0}):
+            self.assertIsNone(pool.choose())
@@ -0,0 +1,303 @@
+"""
+Content-addressed storage for contract documents.
+
+Files are stored once under ``blobs/ab/cd/<sha256>`` in the default storage,
+however many contracts they are attached to. The hash is computed while the
+upload streams in (the hashing upload handlers below are installed through
+``FILE_UPLOAD_HANDLERS``), so storing a file never needs an extra read.
+
+Large files can also be sent in pieces through a ContractDocumentUpload
+session: each ``PUT`` carries a ``Content-Range`` and is appended to a part
+file in ``DOCUMENT_UPLOAD_TEMP_DIR``; a client that loses its connection asks
+for the received offset and continues from there. Chunks are hashed as they
+are written. hashlib state cannot be stored in the database, so the running
+hash stays in the worker process: if a session's chunks go to several workers,
+or the worker restarts, the part file is hashed again once it is complete.
+"""
+
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import (
+    MemoryFileUploadHandler,
+    TemporaryFileUploadHandler,
+)
+from django.db import transaction
+from django.utils import timezone
+
+from .indexing import schedule_document_indexing
+from .models import ContractDocument, ContractDocumentUpload
+
+READ_BLOCK_SIZE = 64 * 1024
+CONTENT_RANGE_RE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+RUNNING_DIGESTS = 1000  # upload sessions whose running hash a process keeps
+
+
+class UploadError(Exception):
+    """Raised for a chunk that does not fit the upload session"""
+
+
+# -----------------------------
+# Upload handlers
+# -----------------------------
+class HashingUploadMixin:
+    """Attach ``sha256`` to uploaded files, computed as the chunks arrive"""
+
+    def new_file(self, *args, **kwargs):
+        self.digest = hashlib.sha256()
+        return super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.digest.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        if uploaded is not None:
+            uploaded.sha256 = self.digest.hexdigest()
+        return uploaded
+
+
+class HashingMemoryFileUploadHandler(HashingUploadMixin, MemoryFileUploadHandler):
+    pass
+
+
+class HashingTemporaryFileUploadHandler(
+    HashingUploadMixin, TemporaryFileUploadHandler
+):
+    pass
+
+
+# -----------------------------
+# Content-addressed blobs
+# -----------------------------
+def blob_name(sha256):
+    return f"blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+def file_digest(fileobj):
+    digest = hashlib.sha256()
+    fileobj.seek(0)
+    for block in iter(lambda: fileobj.read(READ_BLOCK_SIZE), b""):
+        digest.update(block)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def guess_mime_type(filename, declared=None):
+    guessed = mimetypes.guess_type(filename)[0]
+    if guessed:
+        return guessed
+    if declared and declared != "application/octet-stream":
+        return declared[:100]
+    return "application/octet-stream"
+
+
+def store_blob(fileobj, sha256):
+    """Save ``fileobj`` under its content address unless already stored"""
+    name = blob_name(sha256)
+    if default_storage.exists(name):
+        return name
+    fileobj.seek(0)
+    content = fileobj if isinstance(fileobj, File) else File(fileobj)
+    saved = default_storage.save(name, content)
+    if saved != name:
+        # Another request stored the same content concurrently.
+        default_storage.delete(saved)
+    return name
+
+
+def prepare_upload(uploaded):
+    """Store one uploaded file; returns unsaved ContractDocument field values"""
+    sha256 = getattr(uploaded, "sha256", None) or file_digest(uploaded)
+    return {
+        "file": store_blob(uploaded, sha256),
+        "filename": os.path.basename(uploaded.name)[:255],
+        "size": uploaded.size,
+        "mime_type": guess_mime_type(uploaded.name, uploaded.content_type),
+        "sha256": sha256,
+    }
+
+
+def attach_documents(contract, values):
+    """
+    Create documents for already stored blobs, reusing any document of the
+    contract with the same content and name. Returns documents in input order.
+    """
+    existing = {
+        (doc.sha256, doc.filename): doc
+        for doc in ContractDocument.objects.filter(
+            contract=contract, sha256__in={v["sha256"] for v in values}
+        )
+    }
+    documents, new = [], []
+    for entry in values:
+        document = existing.get((entry["sha256"], entry["filename"]))
+        if document is None:
+            document = ContractDocument(contract=contract, **entry)
+            existing[(entry["sha256"], entry["filename"])] = document
+            new.append(document)
+        documents.append(document)
+    with transaction.atomic():
+        ContractDocument.objects.bulk_create(new)
+        # bulk_create skips post_save, which normally schedules extraction.
+        schedule_document_indexing(doc.pk for doc in new)
+    return documents
+
+
+def store_uploads(contract, files):
+    """Write uploaded files to blob storage in parallel, then attach them"""
+    if len(files) == 1:
+        values = [prepare_upload(files[0])]
+    else:
+        workers = min(len(files), settings.DOCUMENT_UPLOAD_WORKERS)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            values = list(pool.map(prepare_upload, files))
+    return attach_documents(contract, values)
+
+
+# -----------------------------
+# Resumable upload sessions
+# -----------------------------
+def part_path(session):
+    return os.path.join(settings.DOCUMENT_UPLOAD_TEMP_DIR, f"{session.pk}.part")
+
+
+_digests = OrderedDict()  # session id -> (bytes hashed, sha256 object)
+_digests_lock = threading.Lock()
+
+
+def _take_digest(session_id, offset):
+    """The running hash of a session's first ``offset`` bytes, if kept here"""
+    if offset == 0:
+        return hashlib.sha256()
+    with _digests_lock:
+        entry = _digests.pop(session_id, None)
+    if entry is None or entry[0] != offset:
+        return None
+    return entry[1]
+
+
+def _keep_digest(session_id, offset, digest):
+    with _digests_lock:
+        _digests[session_id] = (offset, digest)
+        # Abandoned sessions are only dropped from the front.
+        while len(_digests) > RUNNING_DIGESTS:
+            _digests.popitem(last=False)
+
+
+def start_session(contract, user, filename, size, mime_type=None):
+    expire_sessions()
+    os.makedirs(settings.DOCUMENT_UPLOAD_TEMP_DIR, exist_ok=True)
+    filename = os.path.basename(filename)[:255]
+    session = ContractDocumentUpload.objects.create(
+        contract=contract,
+        created_by=user,
+        filename=filename,
+        mime_type=guess_mime_type(filename, mime_type),
+        size=size,
+    )
+    open(part_path(session), "wb").close()
+    return session
+
+
+def parse_content_range(header, size):
+    match = CONTENT_RANGE_RE.match(header or "")
+    if not match:
+        raise UploadError("Content-Range header must look like 'bytes 0-1023/4096'.")
+    start, end, total = (int(value) for value in match.groups())
+    if total != size or end < start or end >= size:
+        raise UploadError("Content-Range does not match the upload size.")
+    return start, end
+
+
+def append_chunk(sessions, session_id, content_range, stream):
+    """
+    Write one chunk to the part file of ``sessions.get(pk=session_id)``.
+    Returns ``(session, document)``; ``document`` is set once the last byte
+    has arrived.
+    """
+    with transaction.atomic():
+        session = sessions.select_for_update().get(pk=session_id)
+        start, end = parse_content_range(content_range, session.size)
+        if start != session.received:
+            raise UploadError(f"Expected a chunk starting at byte {session.received}.")
+
+        digest = _take_digest(session.pk, start)
+        expected = end - start + 1
+        written = 0
+        with open(part_path(session), "r+b") as part:
+            part.seek(start)
+            while written < expected:
+                block = stream.read(min(READ_BLOCK_SIZE, expected - written))
+                if not block:
+                    break
+                part.write(block)
+                if digest is not None:
+                    digest.update(block)
+                written += len(block)
+            part.truncate()
+        if written != expected:
+            raise UploadError("Chunk body is shorter than its Content-Range.")
+
+        session.received = end + 1
+        session.save(update_fields=["received", "updated_at"])
+        if session.received < session.size:
+            if digest is not None:
+                # Only once committed, or a rolled back chunk would stay hashed.
+                received = session.received
+                transaction.on_commit(
+                    lambda: _keep_digest(session.pk, received, digest)
+                )
+            return session, None
+        return session, _complete(session, digest)
+
+
+def _complete(session, digest=None):
+    path = part_path(session)
+    with open(path, "rb") as part:
+        sha256 = digest.hexdigest() if digest is not None else file_digest(part)
+        name = store_blob(part, sha256)
+    [document] = attach_documents(
+        session.contract,
+        [
+            {
+                "file": name,
+                "filename": session.filename,
+                "size": session.size,
+                "mime_type": session.mime_type,
+                "sha256": sha256,
+            }
+        ],
+    )
+    session.delete()
+    transaction.on_commit(lambda: _remove(path))
+    return document
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def discard_session(session):
+    path = part_path(session)
+    session.delete()
+    transaction.on_commit(lambda: _remove(path))
+
+
+def expire_sessions():
+    cutoff = timezone.now() - timedelta(seconds=settings.DOCUMENT_UPLOAD_SESSION_TTL)
+    for session in ContractDocumentUpload.objects.filter(updated_at__lt=cutoff):
+        discard_session(session)
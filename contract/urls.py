@@ -5,12 +5,17 @@ from .views import (
     ContractDocumentViewSet,
     ContractTypeViewSet,
     ContractCommentViewSet,
+    BootstrapView,
+    StatusHistoryAuditViewSet,
 )
 
 # Main router
 router = routers.SimpleRouter()
 router.register(r"contracts", ContractViewSet, basename="contracts")
 router.register(r"contract-types", ContractTypeViewSet, basename="contract-types")
+router.register(
+    r"audit/status-history", StatusHistoryAuditViewSet, basename="audit-status-history"
+)
 
 # Nested routers
 contracts_router = routers.NestedSimpleRouter(router, r"contracts", lookup="contract")
@@ -23,6 +28,7 @@ contracts_router.register(
 
 # URLs
 urlpatterns = [
+    path("bootstrap/", BootstrapView.as_view(), name="bootstrap"),
     path("", include(router.urls)),
     path("", include(contracts_router.urls)),
 ]
@@ -1,20 +1,102 @@
-from rest_framework import viewsets, status
+from io import BytesIO
+
+from rest_framework import mixins, viewsets, status
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db import transaction, models
-from rest_framework.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import OuterRef, Sum
+from django.contrib.postgres.expressions import ArraySubquery
+from rest_framework.exceptions import (
+    MethodNotAllowed,
+    PermissionDenied,
+    ValidationError,
+)
 from django.shortcuts import get_object_or_404
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import filters
 
-from .models import Contract, ContractType, ContractDocument, ContractComment
+from .models import (
+    Contract,
+    ContractStatsRollup,
+    ContractType,
+    ContractDocument,
+    ContractDocumentChunk,
+    ContractDocumentUpload,
+    ContractComment,
+    ContractStatusHistory,
+    ContractParticipant,
+    PARTICIPANT_ROLE_CHOICES,
+)
 from .serializers import (
     ContractSerializer,
     ContractTypeSerializer,
     ContractDocumentSerializer,
     ContractCommentSerializer,
+    ContractSearchResultSerializer,
+    BulkStatusChangeSerializer,
+    ContractExpirySerializer,
+    UploadSessionSerializer,
+    MyContractSerializer,
+    AuditStatusHistorySerializer,
+)
+from .permissions import (
+    IsProcurementOfficer,
+    IsAdminOrReadOnly,
+    CanViewAllContracts,
+    can_view_contract,
+)
+from .pagination import (
+    ContractPagination,
+    ContractCommentPagination,
+    ExpiringContractPagination,
+    StatusHistoryPagination,
+)
+from .search import search_contracts, search_document_chunks
+from .services import bulk_change_status
+from .uploads import (
+    UploadError,
+    append_chunk,
+    discard_session,
+    start_session,
+    store_uploads,
 )
-from .permissions import IsProcurementOfficer, IsAdminOrReadOnly
+from .bootstrap import get_bootstrap
+from .downloads import serve_document
+from .archives import (
+    MAX_ARCHIVE_CONTRACTS,
+    archive_response,
+    document_entries,
+    folder_name,
+)
+from .exports import (
+    CONTRACT_EXPORT_FIELDS,
+    EXPORT_FORMATS,
+    STATUS_HISTORY_EXPORT_FIELDS,
+    export_response,
+)
+from .imports import IMPORT_FORMATS, detect_format, import_contracts, read_rows
+from .filters import ContractFilter, ContractStatusHistoryFilter
+from .participants import is_participant, participating_contract_ids
+from .conditional import compute_validators, set_validators, with_validators
+
+
+class BootstrapView(APIView):
+    """Reference data for page loads, served from cache with a strong ETag"""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        etag, body = get_bootstrap()
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(body, content_type="application/json")
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
 
 
 class ContractTypeViewSet(viewsets.ModelViewSet):
@@ -27,31 +109,155 @@ class ContractDocumentViewSet(viewsets.ModelViewSet):
     queryset = ContractDocument.objects.all()
     serializer_class = ContractDocumentSerializer
     permission_classes = [IsProcurementOfficer]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ["contract_code", "vendor_name", "contract_title"]
-    ordering_fields = ["created_at", "end_date", "status"]
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ["uploaded_at", "id"]
 
-    def create(self, request, *args, **kwargs):
+    def get_queryset(self):
+        queryset = super().get_queryset()
         contract_id = self.kwargs.get("contract_pk")
-        contract = Contract.objects.get(pk=contract_id)
+        if contract_id:
+            queryset = queryset.filter(contract_id=contract_id)
+        return queryset
+
+    def get_contract(self):
+        return get_object_or_404(Contract, pk=self.kwargs.get("contract_pk"))
+
+    def create(self, request, *args, **kwargs):
+        contract = self.get_contract()
 
         files = request.FILES.getlist("files")
         if not files:
             return Response({"error": "No files provided."}, status=400)
 
-        created_docs = []
-        for file in files:
-            doc = ContractDocument.objects.create(contract=contract, file=file)
-            created_docs.append(doc)
-
+        created_docs = store_uploads(contract, files)
         serializer = self.get_serializer(created_docs, many=True)
         return Response(serializer.data, status=201)
 
+    def update(self, request, *args, **kwargs):
+        # Replacing the file in place would leave sha256, size and filename
+        # (and so ETags and the search index) describing the old content.
+        raise MethodNotAllowed(request.method)
+
+    @action(detail=True, methods=["get"])
+    def download(self, request, pk=None, contract_pk=None):
+        """The file itself; supports Range/If-Range. ``?download=1`` for attachment"""
+        document = self.get_object()
+        if not can_view_contract(request.user, document.contract):
+            raise PermissionDenied("You do not have access to this contract.")
+        return serve_document(
+            request, document, as_attachment=request.query_params.get("download") == "1"
+        )
+
+    @action(detail=False, methods=["get"])
+    def archive(self, request, contract_pk=None):
+        """Every document of the contract as one ZIP, streamed as it is built"""
+        contract = self.get_contract()
+        if not can_view_contract(request.user, contract):
+            raise PermissionDenied("You do not have access to this contract.")
+        return archive_response(
+            document_entries([contract], folders=False),
+            f"{folder_name(contract)}-documents.zip",
+        )
+
+    @action(detail=False, methods=["post"], serializer_class=UploadSessionSerializer)
+    def uploads(self, request, contract_pk=None):
+        """Start a resumable upload; send the bytes with PUT to the session URL"""
+        contract = self.get_contract()
+        serializer = UploadSessionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        session = start_session(
+            contract,
+            request.user,
+            serializer.validated_data["filename"],
+            serializer.validated_data["size"],
+            serializer.validated_data.get("mime_type"),
+        )
+        return Response(UploadSessionSerializer(session).data, status=201)
+
+    @action(
+        detail=False,
+        methods=["get", "put", "delete"],
+        url_path=r"uploads/(?P<session_id>[0-9a-f-]{36})",
+        serializer_class=UploadSessionSerializer,
+    )
+    def upload_session(self, request, session_id, contract_pk=None):
+        """
+        GET reports the received offset, PUT appends a chunk (raw body with a
+        ``Content-Range: bytes start-end/size`` header) and DELETE aborts.
+        The response to the final chunk is the created document.
+        """
+        sessions = ContractDocumentUpload.objects.filter(contract_id=contract_pk)
+        session = get_object_or_404(sessions, pk=session_id)
+        if request.method == "GET":
+            return Response(UploadSessionSerializer(session).data)
+        if request.method == "DELETE":
+            discard_session(session)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        try:
+            session, document = append_chunk(
+                sessions,
+                session_id,
+                request.headers.get("Content-Range"),
+                request.stream or BytesIO(),
+            )
+        except UploadError as exc:
+            session.refresh_from_db()
+            return Response(
+                {"error": str(exc), "received": session.received},
+                status=status.HTTP_409_CONFLICT,
+            )
+        if document is None:
+            return Response(UploadSessionSerializer(session).data)
+        serializer = ContractDocumentSerializer(
+            document, context=self.get_serializer_context()
+        )
+        return Response(serializer.data, status=201)
+
 
 class ContractViewSet(viewsets.ModelViewSet):
     queryset = Contract.objects.all()
     serializer_class = ContractSerializer
     permission_classes = [IsProcurementOfficer]
+    pagination_class = ContractPagination
+    filterset_class = ContractFilter
+
+    def get_queryset(self):
+        """Eager-load what ContractSerializer renders so a page costs a fixed number of queries"""
+        return self.get_serializer_class().setup_eager_loading(super().get_queryset())
+
+    def _conditional_response(self, rows):
+        # Only the ETag decides: Last-Modified is the newest remaining row, so
+        # it moves backwards when that row is deleted and If-Modified-Since
+        # alone would be answered with a stale 304.
+        etag, last_modified = compute_validators(rows, self.request)
+        return get_conditional_response(self.request, etag=etag), etag, last_modified
+
+    def list(self, request, *args, **kwargs):
+        """Answer If-None-Match from one lightweight page query"""
+        queryset = with_validators(self.filter_queryset(Contract.objects.all()))
+        rows = self.pagination_class().paginate_queryset(queryset, request, view=self)
+        not_modified, etag, _ = self._conditional_response(rows)
+        if not_modified is not None:
+            return not_modified
+        response = super().list(request, *args, **kwargs)
+        # Rows leave a page in ways no timestamp records; the ETag covers them.
+        return set_validators(response, etag, None)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        lookup = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        try:
+            rows = list(with_validators(Contract.objects.filter(**lookup).order_by()))
+        except (TypeError, ValueError, DjangoValidationError):
+            rows = []
+        if not rows:
+            return super().retrieve(request, *args, **kwargs)
+        not_modified, etag, last_modified = self._conditional_response(rows)
+        if not_modified is not None:
+            return not_modified
+        response = super().retrieve(request, *args, **kwargs)
+        return set_validators(response, etag, last_modified)
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
@@ -59,6 +265,186 @@ class ContractViewSet(viewsets.ModelViewSet):
     def perform_update(self, serializer):
         serializer.save(updated_by=self.request.user)
 
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        """Ranked full-text search: /contracts/search/?q=cleaning&limit=20"""
+        text = request.query_params.get("q", "")
+        if len(text.strip()) < 2:
+            raise ValidationError({"q": "Enter at least 2 characters."})
+        try:
+            limit = min(max(int(request.query_params.get("limit", 20)), 1), 100)
+        except ValueError:
+            raise ValidationError({"limit": "Must be an integer."})
+
+        queryset = search_contracts(Contract.objects.all(), text).only(
+            "id",
+            "contract_code",
+            "contract_title",
+            "vendor_name",
+            "department",
+            "status",
+            "end_date",
+        )
+        serializer = ContractSearchResultSerializer(queryset[:limit], many=True)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=["get"])
+    def mine(self, request):
+        """
+        Contracts the user takes part in, with their roles on each. Accepts the
+        list filters plus ``?role=legal_officer|department_head|signatory|creator``.
+        """
+        role = request.query_params.get("role")
+        if role and role not in dict(PARTICIPANT_ROLE_CHOICES):
+            raise ValidationError(
+                {"role": f"Choose one of {list(dict(PARTICIPANT_ROLE_CHOICES))}."}
+            )
+        roles = (
+            ContractParticipant.objects.filter(contract=OuterRef("pk"), user=request.user)
+            .order_by("role")
+            .values("role")
+        )
+        queryset = (
+            self.filter_queryset(Contract.objects.all())
+            .filter(id__in=participating_contract_ids(request.user, role))
+            .annotate(roles=ArraySubquery(roles))
+        )
+        paginator = ContractPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = MyContractSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=["get"])
+    def stats(self, request):
+        """Dashboard totals, read from the incrementally maintained rollup table"""
+        rows = ContractStatsRollup.objects.filter(contract_count__gt=0)
+        totals = {"count": Sum("contract_count"), "total_value": Sum("total_value")}
+
+        def grouped(*fields):
+            return list(rows.values(*fields).annotate(**totals).order_by(*fields))
+
+        overall = rows.aggregate(**totals)
+        return Response(
+            {
+                "count": overall["count"] or 0,
+                "total_value": overall["total_value"] or 0,
+                "by_status": grouped("status"),
+                "by_department": grouped("department", "department__name"),
+                "by_contract_type": grouped(
+                    "contract_type", "contract_type__type_name"
+                ),
+            }
+        )
+
+    @action(detail=False, methods=["get"])
+    def expiring(self, request):
+        """Approved contracts ending within ?days= (default 30), soonest first"""
+        try:
+            days = int(request.query_params.get("days", 30))
+        except ValueError:
+            raise ValidationError({"days": "Must be an integer."})
+        if not 1 <= days <= 3650:
+            raise ValidationError({"days": "Must be between 1 and 3650."})
+
+        queryset = Contract.objects.expiring_within(days).with_expiry()
+        paginator = ExpiringContractPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = ContractExpirySerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=["get"], url_path="documents/search")
+    def search_documents(self, request):
+        """Full-text search over extracted document text: /contracts/documents/search/?q=indemnity"""
+        text = request.query_params.get("q", "")
+        if len(text.strip()) < 2:
+            raise ValidationError({"q": "Enter at least 2 characters."})
+        try:
+            limit = min(max(int(request.query_params.get("limit", 20)), 1), 100)
+        except ValueError:
+            raise ValidationError({"limit": "Must be an integer."})
+
+        results = search_document_chunks(
+            ContractDocumentChunk.objects.all(), text, limit=limit
+        )
+        return Response(results)
+
+    @action(detail=False, methods=["get"], url_path="documents/archive")
+    def archive_documents(self, request):
+        """Documents of several contracts as one ZIP, a folder per contract: ?ids=1,2,3"""
+        try:
+            raw = request.query_params.get("ids", "")
+            ids = {int(value) for value in raw.split(",") if value}
+        except ValueError:
+            raise ValidationError({"ids": "Must be a comma-separated list of ids."})
+        if not ids:
+            raise ValidationError({"ids": "This parameter is required."})
+        if len(ids) > MAX_ARCHIVE_CONTRACTS:
+            raise ValidationError(
+                {"ids": f"At most {MAX_ARCHIVE_CONTRACTS} contracts per archive."}
+            )
+
+        contracts = list(Contract.objects.filter(pk__in=ids).order_by("contract_code"))
+        if len(contracts) != len(ids):
+            raise ValidationError({"ids": "Some contracts do not exist."})
+        if not all(can_view_contract(request.user, contract) for contract in contracts):
+            raise PermissionDenied("You do not have access to all of these contracts.")
+        return archive_response(document_entries(contracts), "contract-documents.zip")
+
+    @action(detail=False, methods=["post"], url_path="import")
+    def bulk_import(self, request):
+        """
+        Create contracts from an uploaded CSV or NDJSON ``file``; rows that fail
+        validation are reported by row number and the rest are still created.
+        """
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": "Upload a CSV or NDJSON file."})
+        import_format = request.data.get("input") or detect_format(
+            upload.name, upload.content_type
+        )
+        if import_format not in IMPORT_FORMATS:
+            raise ValidationError({"input": f"Choose one of {list(IMPORT_FORMATS)}."})
+        report = import_contracts(read_rows(upload, import_format), user=request.user)
+        return Response(report.as_dict())
+
+    def _export_format(self):
+        # Not "format": DRF reserves that for renderer selection.
+        export_format = self.request.query_params.get("output", "csv")
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError({"output": f"Choose one of {sorted(EXPORT_FORMATS)}."})
+        return export_format
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """All contracts matching the list filters as CSV or NDJSON (?output=ndjson)"""
+        export_format = self._export_format()
+        queryset = self.filter_queryset(Contract.objects.all()).order_by(
+            "-created_at", "-id"
+        )
+        return export_response(
+            queryset, CONTRACT_EXPORT_FIELDS, export_format, "contracts"
+        )
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="history/export",
+        # The same audit trail as StatusHistoryAuditViewSet, under its rule
+        permission_classes=[IsAuthenticated, CanViewAllContracts],
+    )
+    def export_history(self, request):
+        """Status history as CSV or NDJSON: ?contract=&new_status=&changed_at__gte="""
+        export_format = self._export_format()
+        filterset = ContractStatusHistoryFilter(
+            request.query_params, queryset=ContractStatusHistory.objects.all()
+        )
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        queryset = filterset.qs.order_by("-changed_at", "-id")
+        return export_response(
+            queryset, STATUS_HISTORY_EXPORT_FIELDS, export_format, "status-history"
+        )
+
     @action(detail=True, methods=["post"])
     def change_status(self, request, pk=None):
         contract = self.get_object()
@@ -74,22 +460,34 @@ class ContractViewSet(viewsets.ModelViewSet):
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=["post"], url_path="bulk-status")
+    def bulk_status(self, request):
+        """Transition many contracts at once; reports failures per id"""
+        serializer = BulkStatusChangeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        updated, failures = bulk_change_status(
+            data["ids"], data["status"], user=request.user, remarks=data.get("remarks")
+        )
+        return Response(
+            {
+                "updated": updated,
+                "failed": [{"id": pk, "error": error} for pk, error in failures.items()],
+            }
+        )
+
 
 class ContractCommentViewSet(viewsets.ModelViewSet):
     queryset = ContractComment.objects.all()
     serializer_class = ContractCommentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ContractCommentPagination
 
     def get_queryset(self):
         """Filter comments by contract if nested under /contracts/{id}/comments/"""
-        user = self.request.user
         queryset = ContractComment.objects.filter(
-            contract__in=Contract.objects.filter(
-                models.Q(legal_officer=user)
-                | models.Q(department_head=user)
-                | models.Q(signatory=user)
-                | models.Q(created_by=user)
-            )
+            contract_id__in=participating_contract_ids(self.request.user)
         )
         contract_id = self.kwargs.get("contract_pk")  # <-- from nested router
         if contract_id:
@@ -101,15 +499,31 @@ class ContractCommentViewSet(viewsets.ModelViewSet):
         contract = get_object_or_404(Contract, pk=contract_id)
         user = self.request.user
 
-        allowed_users = {
-            contract.legal_officer,
-            contract.department_head,
-            contract.signatory,
-            contract.created_by,
-        }
-        allowed_users.discard(None)
-
-        if user not in allowed_users:
+        if not is_participant(user.pk, contract.pk):
             raise ValidationError("You are not authorized to comment on this contract.")
 
         serializer.save(user=user, contract=contract)
+
+
+class StatusHistoryAuditViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Status transitions across all contracts, newest first:
+    ?changed_at__gte=2026-07-01&changed_at__lt=2026-10-01&changed_by=12
+
+    Time ranges are served by the BRIN index on changed_at and per-user
+    queries by the (changed_by, changed_at, id) index.
+    """
+
+    serializer_class = AuditStatusHistorySerializer
+    permission_classes = [CanViewAllContracts]
+    pagination_class = StatusHistoryPagination
+    filterset_class = ContractStatusHistoryFilter
+
+    def get_queryset(self):
+        return ContractStatusHistory.objects.select_related(
+            "contract", "changed_by"
+        ).only(
+            *(f.name for f in ContractStatusHistory._meta.concrete_fields),
+            "contract__contract_code",
+            "changed_by__email",
+        )
@@ -1,3 +1,63 @@
 from django.contrib import admin
+from django.db.models import Q
+from django.utils import timezone
 
-# Register your models here.
+from .models import EmailOutbox, Notification
+from .outbox import outbox_metrics
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ("title", "recipient", "category", "is_read", "created_at")
+    list_filter = ("category", "is_read")
+    search_fields = ("title", "recipient__email", "recipient__full_name")
+    raw_id_fields = ("recipient", "actor", "contract")
+    list_select_related = ("recipient",)
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = (
+        "subject",
+        "recipient_list",
+        "status",
+        "attempts",
+        "next_attempt_at",
+        "created_at",
+        "sent_at",
+    )
+    list_filter = ("status",)
+    search_fields = ("subject", "recipients")
+    readonly_fields = (
+        "attempts",
+        "locked_until",
+        "last_error",
+        "created_at",
+        "sent_at",
+    )
+    ordering = ("-created_at",)
+    actions = ["retry_now"]
+
+    def recipient_list(self, obj):
+        return ", ".join(obj.recipients)
+
+    recipient_list.short_description = "Recipients"
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = extra_context or {}
+        extra_context["outbox_metrics"] = outbox_metrics()
+        return super().changelist_view(request, extra_context=extra_context)
+
+    def retry_now(self, request, queryset):
+        # A "sending" row under a live lease may be on the wire right now;
+        # releasing it would let a second worker send it again.
+        now = timezone.now()
+        retryable = Q(status__in=["pending", "failed"]) | Q(
+            status="sending", locked_until__lt=now
+        )
+        updated = queryset.filter(retryable).update(
+            status="pending", next_attempt_at=now, locked_until=None
+        )
+        self.message_user(request, f"{updated} message(s) queued for delivery.")
+
+    retry_now.short_description = "Retry selected messages now"
@@ -0,0 +1,176 @@
+"""
+Pub/sub for the live notification stream (``/api/notifications/stream/``).
+
+Publishers are ordinary synchronous code (views, services, on_commit hooks);
+subscribers are SSE responses running on the ASGI event loop. The broker is
+selected with ``settings.NOTIFICATION_BROKER``:
+
+* ``InProcessBroker`` (default) delivers within one server process, which is
+  enough when the ASGI server runs the whole API in one process per host.
+  Deployments that publish from other processes plug in a shared broker with
+  the same interface.
+* ``RecordingBroker`` additionally keeps every published event in memory, as
+  a stand-in for tests.
+
+Events carry ids of the form ``<epoch>-<sequence>``. The broker keeps the
+last ``SSE_REPLAY_BUFFER`` events so a reconnecting client can resume from
+``Last-Event-ID``; if that id is unknown (buffer overrun or a restarted
+process) the subscriber is told to resync instead.
+"""
+
+import asyncio
+import itertools
+import threading
+import uuid
+from collections import deque
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class Event:
+    __slots__ = ("id", "sequence", "channel", "type", "data")
+
+    def __init__(self, epoch, sequence, channel, type, data):
+        self.id = f"{epoch}-{sequence}"
+        self.sequence = sequence
+        self.channel = channel
+        self.type = type
+        self.data = data
+
+
+class Subscription:
+    """A bounded event queue bound to the subscriber's event loop"""
+
+    RESYNC = object()
+
+    def __init__(self, broker, channels, loop, maxsize):
+        self.broker = broker
+        self.channels = frozenset(channels)
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def deliver(self, item):
+        # Runs on self.loop. A subscriber that cannot keep up loses its backlog
+        # and is asked to resync rather than holding memory without bound.
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(self.RESYNC)
+
+    async def get(self, timeout=None):
+        """Next Event, Subscription.RESYNC, or None on timeout"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    def __init__(self, replay_size=None, queue_size=None):
+        self.epoch = uuid.uuid4().hex[:8]
+        self._sequence = itertools.count(1)
+        self._history = deque(maxlen=replay_size or settings.SSE_REPLAY_BUFFER)
+        self._subscriptions = set()
+        self._queue_size = queue_size or settings.SSE_QUEUE_SIZE
+        self._lock = threading.Lock()
+
+    def publish(self, channels, type, data):
+        """Send ``data`` as an event of ``type`` to every subscriber of ``channels``"""
+        with self._lock:
+            events = []
+            for channel in channels:
+                event = Event(self.epoch, next(self._sequence), channel, type, data)
+                self._history.append(event)
+                events.append(event)
+            subscriptions = list(self._subscriptions)
+        for event in events:
+            for subscription in subscriptions:
+                if event.channel not in subscription.channels:
+                    continue
+                try:
+                    subscription.loop.call_soon_threadsafe(
+                        subscription.deliver, event
+                    )
+                except RuntimeError:  # its event loop has been closed
+                    self.unsubscribe(subscription)
+        return events
+
+    def _replay(self, channels, last_event_id):
+        epoch, _, sequence = last_event_id.partition("-")
+        if epoch != self.epoch or not sequence.isdigit():
+            return None
+        sequence = int(sequence)
+        history = list(self._history)
+        if history and history[0].sequence > sequence + 1:
+            return None  # events in between were already evicted
+        return [
+            event
+            for event in history
+            if event.sequence > sequence and event.channel in channels
+        ]
+
+    def subscribe(self, channels, last_event_id=None):
+        """Must be called from the subscriber's event loop"""
+        subscription = Subscription(
+            self, channels, asyncio.get_running_loop(), self._queue_size
+        )
+        with self._lock:
+            self._subscriptions.add(subscription)
+            if last_event_id:
+                backlog = self._replay(subscription.channels, last_event_id)
+                if backlog is None:
+                    subscription.deliver(Subscription.RESYNC)
+                else:
+                    for event in backlog:
+                        subscription.deliver(event)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscriptions)
+
+
+class RecordingBroker(InProcessBroker):
+    """InProcessBroker that also records what was published"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.published = []
+
+    def publish(self, channels, type, data):
+        events = super().publish(channels, type, data)
+        self.published.extend(events)
+        return events
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(settings.NOTIFICATION_BROKER)()
+        return _broker
+
+
+def reset_broker():
+    """Forget the current broker (tests, settings changes)"""
+    global _broker
+    with _broker_lock:
+        _broker = None
+
+
+def user_channel(user_id):
+    return f"user:{user_id}"
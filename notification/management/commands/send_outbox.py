@@ -0,0 +1,61 @@
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from notification.outbox import deliver_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver queued emails from the outbox. Runs until interrupted unless "
+        "--once is given; several workers may run concurrently."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the currently due messages and exit.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.EMAIL_OUTBOX_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--idle-sleep",
+            type=float,
+            default=5.0,
+            help="Seconds to wait when nothing is due.",
+        )
+
+    def handle(self, *args, **options):
+        connection = get_connection()
+        total_sent = total_failed = 0
+        try:
+            while True:
+                started = time.monotonic()
+                sent, failed = deliver_batch(options["batch_size"], connection)
+                total_sent += sent
+                total_failed += failed
+                if sent or failed:
+                    elapsed = time.monotonic() - started
+                    self.stdout.write(
+                        f"Sent {sent}, failed {failed} in {elapsed:.2f}s "
+                        f"({sent / elapsed if elapsed else 0:.1f} msg/s)"
+                    )
+                    continue
+                if options["once"]:
+                    break
+                # Drop the SMTP session while idle rather than let it time out.
+                connection.close()
+                time.sleep(options["idle_sleep"])
+                close_old_connections()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
+        self.stdout.write(
+            self.style.SUCCESS(f"Done. Sent {total_sent}, failed {total_failed}.")
+        )
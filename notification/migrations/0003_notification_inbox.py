@@ -0,0 +1,105 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def delete_unaddressed_notifications(apps, schema_editor):
+    # Rows from before notifications had a recipient cannot be delivered.
+    Notification = apps.get_model("notification", "Notification")
+    Notification.objects.filter(recipient__isnull=True).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contract", "0007_contract_stats_rollup"),
+        ("notification", "0002_email_outbox"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="recipient",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="notifications",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.RunPython(
+            delete_unaddressed_notifications, migrations.RunPython.noop
+        ),
+        migrations.AlterField(
+            model_name="notification",
+            name="recipient",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="notifications",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="actor",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="contract",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="notifications",
+                to="contract.contract",
+            ),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="message",
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name="notification",
+            name="category",
+            field=models.CharField(
+                choices=[
+                    ("status_change", "Status change"),
+                    ("comment", "Comment"),
+                    ("assignment", "Assignment"),
+                ],
+                max_length=100,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="notification",
+            name="status",
+            field=models.CharField(blank=True, max_length=50),
+        ),
+        migrations.AlterModelOptions(
+            name="notification",
+            options={"ordering": ["-created_at", "-id"]},
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["recipient", "is_read", "-created_at", "-id"],
+                name="notification_inbox_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["recipient", "-created_at", "-id"],
+                name="notification_recipient_idx",
+            ),
+        ),
+    ]
@@ -1,13 +1,97 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
+
+
+NOTIFICATION_CATEGORIES = (
+    ("status_change", "Status change"),
+    ("comment", "Comment"),
+    ("assignment", "Assignment"),
+)
 
 
 class Notification(models.Model):
+    """One inbox entry for one user; created in bulk by notification.services"""
+
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="notifications",
+    )
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    contract = models.ForeignKey(
+        "contract.Contract",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="notifications",
+    )
     title = models.CharField(max_length=200)
-    category = models.CharField(max_length=100)
-    status = models.CharField(max_length=50)
+    message = models.TextField(blank=True)
+    category = models.CharField(max_length=100, choices=NOTIFICATION_CATEGORIES)
+    status = models.CharField(max_length=50, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     is_read = models.BooleanField(default=False)
 
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(
+                fields=["recipient", "is_read", "-created_at", "-id"],
+                name="notification_inbox_idx",
+            ),
+            models.Index(
+                fields=["recipient", "-created_at", "-id"],
+                name="notification_recipient_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
+
+class EmailOutbox(models.Model):
+    """
+    Outgoing email written in the caller's transaction and delivered later by
+    ``manage.py send_outbox`` (see notification.outbox).
+    """
+
+    STATUS_CHOICES = (
+        ("pending", "Pending"),
+        ("sending", "Sending"),
+        ("sent", "Sent"),
+        ("failed", "Failed"),
+    )
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255, blank=True)
+    recipients = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Email outbox entry"
+        verbose_name_plural = "Email outbox"
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at", "id"],
+                condition=models.Q(status__in=["pending", "sending"]),
+                name="email_outbox_due_idx",
+            ),
+            models.Index(fields=["status", "sent_at"], name="email_outbox_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)}"
@@ -0,0 +1,170 @@
+"""
+Transactional email outbox.
+
+``enqueue_email`` only inserts an EmailOutbox row, so it commits or rolls back
+with the surrounding transaction and never waits on SMTP. ``deliver_batch``
+(driven by ``manage.py send_outbox``) claims due rows with
+``SELECT ... FOR UPDATE SKIP LOCKED`` so several workers can run side by side,
+sends them over one SMTP connection and reschedules failures with exponential
+backoff. A claim is a lease: rows left in "sending" by a crashed worker are
+picked up again once ``locked_until`` passes, which counts as a failed
+attempt.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Avg, Count, F, Min, Q
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(subject, body, recipients, from_email=None):
+    return EmailOutbox.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=list(recipients),
+    )
+
+
+def retry_delay(attempts):
+    """Seconds to wait after the ``attempts``-th failed delivery"""
+    delay = settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** max(attempts - 1, 0)
+    return min(delay, settings.EMAIL_OUTBOX_MAX_RETRY_DELAY)
+
+
+def claim_batch(size, lease_seconds=None):
+    """Lease up to ``size`` due messages to this worker"""
+    now = timezone.now()
+    lease = lease_seconds or settings.EMAIL_OUTBOX_LEASE
+    due = Q(status="pending", next_attempt_at__lte=now) | Q(
+        status="sending", locked_until__lt=now
+    )
+    with transaction.atomic():
+        rows = list(
+            EmailOutbox.objects.filter(due)
+            .select_for_update(skip_locked=True)
+            .order_by("next_attempt_at", "id")
+            .values_list("id", "status")[:size]
+        )
+        ids = [pk for pk, _ in rows]
+        expired = [pk for pk, status in rows if status == "sending"]
+        if expired:
+            # The worker holding the lease died mid-send; count that as an
+            # attempt so a message that keeps crashing workers still gives up.
+            EmailOutbox.objects.filter(id__in=expired).update(
+                attempts=F("attempts") + 1,
+                last_error="Lease expired before delivery finished",
+            )
+            EmailOutbox.objects.filter(
+                id__in=expired, attempts__gte=settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+            ).update(status="failed", locked_until=None)
+        if ids:
+            EmailOutbox.objects.filter(id__in=ids).exclude(status="failed").update(
+                status="sending", locked_until=now + timedelta(seconds=lease)
+            )
+    return list(EmailOutbox.objects.filter(id__in=ids, status="sending").order_by("id"))
+
+
+def _record_failure(message, exc):
+    message.attempts += 1
+    message.last_error = f"{type(exc).__name__}: {exc}"
+    message.locked_until = None
+    if message.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        message.status = "failed"
+    else:
+        message.status = "pending"
+        message.next_attempt_at = timezone.now() + timedelta(
+            seconds=retry_delay(message.attempts)
+        )
+    message.save(
+        update_fields=[
+            "attempts",
+            "last_error",
+            "locked_until",
+            "status",
+            "next_attempt_at",
+        ]
+    )
+
+
+def deliver_batch(size=None, connection=None):
+    """Claim and send one batch; returns ``(sent, failed)``"""
+    messages = claim_batch(size or settings.EMAIL_OUTBOX_BATCH_SIZE)
+    if not messages:
+        return 0, 0
+
+    own_connection = connection is None
+    connection = connection or get_connection()
+    sent_ids, failed = [], 0
+    try:
+        for message in messages:
+            email = EmailMessage(
+                message.subject,
+                message.body,
+                message.from_email or None,
+                message.recipients,
+                connection=connection,
+            )
+            try:
+                connection.open()  # no-op while the connection is up
+                email.send()
+            except Exception as exc:
+                logger.warning("Sending outbox message %s failed: %s", message.id, exc)
+                _record_failure(message, exc)
+                failed += 1
+                # The server may have dropped us; reconnect for the next one.
+                connection.close()
+            else:
+                sent_ids.append(message.id)
+    finally:
+        EmailOutbox.objects.filter(id__in=sent_ids).update(
+            status="sent",
+            sent_at=timezone.now(),
+            attempts=F("attempts") + 1,
+            locked_until=None,
+            last_error="",
+        )
+        if own_connection:
+            connection.close()
+    return len(sent_ids), failed
+
+
+def outbox_metrics():
+    """Queue depth and throughput figures for the admin"""
+    now = timezone.now()
+    by_status = dict(
+        EmailOutbox.objects.values_list("status").annotate(n=Count("id")).order_by()
+    )
+    recent = EmailOutbox.objects.filter(status="sent")
+    last_hour = recent.filter(sent_at__gte=now - timedelta(hours=1)).aggregate(
+        count=Count("id"), latency=Avg(F("sent_at") - F("created_at"))
+    )
+    last_day = recent.filter(sent_at__gte=now - timedelta(days=1)).count()
+    oldest = EmailOutbox.objects.filter(status__in=["pending", "sending"]).aggregate(
+        created=Min("created_at")
+    )["created"]
+    return {
+        "pending": by_status.get("pending", 0),
+        "sending": by_status.get("sending", 0),
+        "sent": by_status.get("sent", 0),
+        "failed": by_status.get("failed", 0),
+        "sent_last_hour": last_hour["count"],
+        "sent_last_day": last_day,
+        "per_minute_last_hour": round(last_hour["count"] / 60, 2),
+        "avg_latency_seconds": (
+            round(last_hour["latency"].total_seconds(), 1)
+            if last_hour["latency"]
+            else None
+        ),
+        "oldest_pending_seconds": (
+            int((now - oldest).total_seconds()) if oldest else None
+        ),
+    }
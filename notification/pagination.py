@@ -0,0 +1,5 @@
+from CMS_Backend.pagination import KeysetPagination
+
+
+class NotificationPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
@@ -0,0 +1,40 @@
+from rest_framework import serializers
+
+from .models import Notification
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    actor = serializers.StringRelatedField(read_only=True)
+    contract_code = serializers.CharField(
+        source="contract.contract_code", read_only=True, default=None
+    )
+
+    class Meta:
+        model = Notification
+        fields = [
+            "id",
+            "title",
+            "message",
+            "category",
+            "status",
+            "contract",
+            "contract_code",
+            "actor",
+            "is_read",
+            "created_at",
+        ]
+        read_only_fields = fields
+
+
+class MarkReadSerializer(serializers.Serializer):
+    """Either a list of ids or ``all: true``"""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, max_length=1000
+    )
+    all = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        if not attrs["all"] and not attrs.get("ids"):
+            raise serializers.ValidationError("Provide 'ids' or set 'all' to true.")
+        return attrs
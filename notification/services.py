@@ -0,0 +1,168 @@
+"""
+Fan-out of contract events into per-user inbox rows.
+
+Every event becomes one Notification per participant, written with a single
+``bulk_create`` in the caller's transaction. Unread counts are cached per user
+and dropped once the transaction that changes them commits; live events for
+the SSE stream (notification.broker) are published at the same point.
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+
+from CMS_Backend.db_router import reads_from_primary
+from contract.models import ASSIGNMENT_FIELDS, CONTRACT_STATUS, PARTICIPANT_FIELDS
+from .broker import get_broker, user_channel
+from .models import Notification
+
+UNREAD_COUNT_KEY = "notifications:unread:{}"
+UNREAD_COUNT_TIMEOUT = 60 * 10
+
+
+def contract_values(contract):
+    """The contract columns fan-out needs, as read by ``.values()``"""
+    values = {field: getattr(contract, field) for field in PARTICIPANT_FIELDS}
+    values.update(id=contract.pk, contract_code=contract.contract_code)
+    return values
+
+
+def participants(values, exclude=None):
+    return {values[field] for field in PARTICIPANT_FIELDS if values[field]} - {exclude}
+
+
+def unread_count(user):
+    key = UNREAD_COUNT_KEY.format(user.pk)
+    count = cache.get(key)
+    if count is None:
+        # Cached for minutes: never from a replica that may predate a change
+        with reads_from_primary():
+            count = Notification.objects.filter(recipient=user, is_read=False).count()
+        cache.set(key, count, UNREAD_COUNT_TIMEOUT)
+    return count
+
+
+def invalidate_unread_counts(user_ids):
+    keys = [UNREAD_COUNT_KEY.format(pk) for pk in set(user_ids)]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def publish_on_commit(user_ids, type, data):
+    """Push an event to the users' live streams once the transaction commits"""
+    channels = [user_channel(pk) for pk in sorted(set(user_ids))]
+    if channels:
+        transaction.on_commit(lambda: get_broker().publish(channels, type, data))
+
+
+def create_notifications(notifications):
+    notifications = list(notifications)
+    if not notifications:
+        return []
+    created = Notification.objects.bulk_create(notifications)
+    invalidate_unread_counts(n.recipient_id for n in created)
+    for notification in created:
+        publish_on_commit(
+            [notification.recipient_id],
+            "notification",
+            {
+                "id": notification.pk,
+                "title": notification.title,
+                "message": notification.message,
+                "category": notification.category,
+                "status": notification.status,
+                "contract": notification.contract_id,
+                "created_at": notification.created_at,
+            },
+        )
+    return created
+
+
+def mark_read(user, ids=None):
+    """Mark the user's unread notifications (or only ``ids``) read in one UPDATE"""
+    queryset = Notification.objects.filter(recipient=user, is_read=False)
+    if ids is not None:
+        queryset = queryset.filter(id__in=ids)
+    updated = queryset.update(is_read=True)
+    if updated:
+        invalidate_unread_counts([user.pk])
+    return updated
+
+
+def notify_status_changes(rows, new_status, actor=None):
+    """``rows``: contract_values()-shaped dicts of contracts now in ``new_status``"""
+    label = dict(CONTRACT_STATUS).get(new_status, new_status)
+    actor_id = actor.pk if actor else None
+    for row in rows:
+        publish_on_commit(
+            participants(row),
+            "contract.status",
+            {
+                "contract": row["id"],
+                "contract_code": row["contract_code"],
+                "status": new_status,
+            },
+        )
+    return create_notifications(
+        Notification(
+            recipient_id=recipient_id,
+            actor_id=actor_id,
+            contract_id=row["id"],
+            title=f"{row['contract_code']} is now {label}",
+            category="status_change",
+            status=new_status,
+        )
+        for row in rows
+        for recipient_id in sorted(participants(row, exclude=actor_id))
+    )
+
+
+def notify_comment(comment):
+    contract = comment.contract
+    publish_on_commit(
+        participants(contract_values(contract)),
+        "contract.comment",
+        {
+            "contract": contract.pk,
+            "contract_code": contract.contract_code,
+            "comment": comment.pk,
+            "user": comment.user_id,
+            "created_at": comment.created_at,
+        },
+    )
+    return create_notifications(
+        Notification(
+            recipient_id=recipient_id,
+            actor_id=comment.user_id,
+            contract_id=contract.pk,
+            title=f"New comment on {contract.contract_code}",
+            message=comment.comment[:500],
+            category="comment",
+            status=contract.status,
+        )
+        for recipient_id in sorted(
+            participants(contract_values(contract), exclude=comment.user_id)
+        )
+    )
+
+
+def assignment_notifications(contract, assignments):
+    """``assignments`` maps reviewer fields (ASSIGNMENT_FIELDS) to new user ids"""
+    actor_id = contract.updated_by_id or contract.created_by_id
+    return [
+        Notification(
+            recipient_id=user_id,
+            actor_id=actor_id,
+            contract_id=contract.pk,
+            title=(
+                f"You were assigned as {ASSIGNMENT_FIELDS[field]} "
+                f"on {contract.contract_code}"
+            ),
+            category="assignment",
+            status=contract.status,
+        )
+        for field, user_id in assignments.items()
+    ]
+
+
+def notify_assignments(contract, assignments):
+    return create_notifications(assignment_notifications(contract, assignments))
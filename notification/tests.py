@@ -1,3 +1,313 @@
-from django.test import TestCase
+import asyncio
+from datetime import timedelta
+from smtplib import SMTPServerDisconnected
+from unittest import mock
 
-# Create your tests here.
+from django.contrib import admin
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from io import StringIO
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from contract.models import Contract, ContractComment, ContractType
+from contract.services import bulk_change_status
+from users.models import CustomUser, Department
+from .admin import EmailOutboxAdmin
+from .broker import (
+    InProcessBroker,
+    Subscription,
+    get_broker,
+    reset_broker,
+    user_channel,
+)
+from .models import EmailOutbox, Notification
+from .outbox import claim_batch, deliver_batch, enqueue_email, outbox_metrics
+from .services import notify_status_changes
+
+
+class FlakyBackend(EmailBackend):
+    """Fails every message addressed to bounce@example.com"""
+
+    def send_messages(self, messages):
+        for message in messages:
+            if "bounce@example.com" in message.to:
+                raise SMTPServerDisconnected("connection dropped")
+        return super().send_messages(messages)
+
+
+class EmailOutboxTests(TestCase):
+    def test_user_creation_queues_instead_of_sending(self):
+        CustomUser.objects.create_user(
+            email="new@example.com",
+            password="pass1234",
+            full_name="New User",
+            role="legal_reviewer",
+        )
+        self.assertEqual(len(mail.outbox), 0)
+        queued = EmailOutbox.objects.get()
+        self.assertEqual(queued.recipients, ["new@example.com"])
+        self.assertEqual(queued.status, "pending")
+
+    def test_worker_delivers_batch(self):
+        for i in range(3):
+            enqueue_email("Hello", "Body", [f"user{i}@example.com"])
+        out = StringIO()
+        call_command("send_outbox", "--once", stdout=out)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(EmailOutbox.objects.filter(status="sent").count(), 3)
+        self.assertEqual(outbox_metrics()["sent_last_hour"], 3)
+
+    @override_settings(
+        EMAIL_BACKEND="notification.tests.FlakyBackend", EMAIL_OUTBOX_MAX_ATTEMPTS=2
+    )
+    def test_failures_back_off_then_give_up(self):
+        bad = enqueue_email("Hello", "Body", ["bounce@example.com"])
+        good = enqueue_email("Hello", "Body", ["ok@example.com"])
+
+        self.assertEqual(deliver_batch(), (1, 1))
+        bad.refresh_from_db()
+        good.refresh_from_db()
+        self.assertEqual(good.status, "sent")
+        self.assertEqual((bad.status, bad.attempts), ("pending", 1))
+        self.assertGreater(bad.next_attempt_at, timezone.now())
+        self.assertIn("connection dropped", bad.last_error)
+
+        self.assertEqual(deliver_batch(), (0, 0))  # not due yet
+        EmailOutbox.objects.filter(pk=bad.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver_batch(), (0, 1))
+        bad.refresh_from_db()
+        self.assertEqual((bad.status, bad.attempts), ("failed", 2))
+
+    @override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=2)
+    def test_expired_lease_counts_as_attempt(self):
+        message = enqueue_email("Hello", "Body", ["crash@example.com"])
+        expired = timezone.now() - timedelta(seconds=1)
+        for attempts in (1, 2):
+            self.assertEqual(claim_batch(10), [message])
+            EmailOutbox.objects.filter(pk=message.pk).update(locked_until=expired)
+            message.refresh_from_db()
+            self.assertEqual(message.attempts, attempts - 1)
+
+        self.assertEqual(claim_batch(10), [])
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), ("failed", 2))
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_retry_now_skips_live_leases(self):
+        now = timezone.now()
+        EmailOutbox.objects.create(
+            subject="Live", status="sending", locked_until=now + timedelta(minutes=5)
+        )
+        EmailOutbox.objects.create(
+            subject="Stale", status="sending", locked_until=now - timedelta(minutes=5)
+        )
+        EmailOutbox.objects.create(subject="Failed", status="failed")
+        EmailOutbox.objects.create(subject="Sent", status="sent")
+
+        model_admin = EmailOutboxAdmin(EmailOutbox, admin.site)
+        with mock.patch.object(model_admin, "message_user"):
+            model_admin.retry_now(None, EmailOutbox.objects.all())
+
+        statuses = dict(EmailOutbox.objects.values_list("subject", "status"))
+        self.assertEqual(
+            statuses,
+            {
+                "Live": "sending",
+                "Stale": "pending",
+                "Failed": "pending",
+                "Sent": "sent",
+            },
+        )
+
+
+class NotificationInboxTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        def user(role):
+            return CustomUser.objects.create_user(
+                email=f"{role}@example.com",
+                password="pass1234",
+                full_name=role.replace("_", " ").title(),
+                role=role,
+            )
+
+        cls.officer = user("procurement_officer")
+        cls.reviewer = user("legal_reviewer")
+        cls.head = user("department_head")
+        cls.contract = Contract.objects.create(
+            contract_title="Office cleaning",
+            vendor_name="Acme Services",
+            contract_type=ContractType.objects.create(type_name="Service"),
+            department=Department.objects.create(name="Finance"),
+            start_date=timezone.now().date(),
+            end_date=timezone.now().date(),
+            payment_terms="installment",
+            legal_officer=cls.reviewer,
+            created_by=cls.officer,
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.reviewer)
+
+    def inbox(self, user):
+        return list(
+            Notification.objects.filter(recipient=user).values_list("category", flat=True)
+        )
+
+    def test_creation_notifies_assigned_reviewer(self):
+        self.assertEqual(self.inbox(self.reviewer), ["assignment"])
+        self.assertEqual(self.inbox(self.officer), [])
+
+    def test_reassignment_notifies_only_new_reviewer(self):
+        self.contract.department_head = self.head
+        self.contract.save()
+        self.assertEqual(self.inbox(self.head), ["assignment"])
+        self.assertEqual(self.inbox(self.reviewer), ["assignment"])
+
+    def test_status_change_and_comment_fan_out(self):
+        self.contract.set_status("submitted", user=self.officer)
+        self.assertCountEqual(self.inbox(self.reviewer), ["assignment", "status_change"])
+        self.assertEqual(self.inbox(self.officer), [])
+
+        ContractComment.objects.create(
+            contract=self.contract, user=self.reviewer, comment="Looks fine"
+        )
+        self.assertEqual(self.inbox(self.officer), ["comment"])
+
+    def test_bulk_status_change_fans_out(self):
+        updated, _ = bulk_change_status([self.contract.pk], "submitted", user=self.head)
+        self.assertEqual(updated, [self.contract.pk])
+        self.assertEqual(self.inbox(self.officer), ["status_change"])
+
+    def test_fan_out_is_one_insert(self):
+        row = {
+            "id": self.contract.pk,
+            "contract_code": self.contract.contract_code,
+            "legal_officer_id": self.reviewer.pk,
+            "department_head_id": self.head.pk,
+            "signatory_id": None,
+            "created_by_id": self.officer.pk,
+        }
+        with self.assertNumQueries(1):
+            created = notify_status_changes([row] * 5, "approved")
+        self.assertEqual(len(created), 15)
+
+    def test_inbox_api(self):
+        self.contract.set_status("submitted", user=self.officer)
+        response = self.client.get("/api/notifications/?page_size=1")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["category"], "status_change")
+        self.assertIsNotNone(response.data["next"])
+
+        response = self.client.get("/api/notifications/unread-count/")
+        self.assertEqual(response.data, {"unread": 2})
+        with self.assertNumQueries(0):
+            self.client.get("/api/notifications/unread-count/")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(1):
+                response = self.client.post(
+                    "/api/notifications/mark-read/", {"all": True}, format="json"
+                )
+        self.assertEqual(response.data, {"updated": 2})
+        response = self.client.get("/api/notifications/unread-count/")
+        self.assertEqual(response.data, {"unread": 0})
+
+
+class BrokerReplayTests(TestCase):
+    async def test_resume_from_last_event_id(self):
+        broker = InProcessBroker(replay_size=3)
+        first = broker.publish(["user:1", "user:2"], "notification", {"n": 1})
+        broker.publish(["user:1"], "notification", {"n": 2})
+
+        subscription = broker.subscribe(["user:1"], last_event_id=first[0].id)
+        event = await subscription.get(timeout=1)
+        self.assertEqual(event.data, {"n": 2})
+        self.assertIsNone(await subscription.get(timeout=0.01))
+        subscription.close()
+        self.assertEqual(broker.subscriber_count, 0)
+
+    async def test_unknown_or_evicted_id_requests_resync(self):
+        broker = InProcessBroker(replay_size=2)
+        first = broker.publish(["user:1"], "notification", {})
+        broker.publish(["user:1"] * 3, "notification", {})
+        for last_event_id in (first[0].id, "restarted-1"):
+            subscription = broker.subscribe(["user:1"], last_event_id)
+            self.assertIs(await subscription.get(timeout=1), Subscription.RESYNC)
+            subscription.close()
+
+
+@override_settings(NOTIFICATION_BROKER="notification.broker.RecordingBroker")
+class NotificationStreamTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email="stream@example.com",
+            password="pass1234",
+            full_name="Stream User",
+            role="legal_reviewer",
+        )
+
+    def setUp(self):
+        reset_broker()
+        self.addCleanup(reset_broker)
+
+    async def test_requires_token(self):
+        response = await self.async_client.get("/api/notifications/stream/")
+        self.assertEqual(response.status_code, 401)
+
+    async def test_streams_published_events(self):
+        token = str(AccessToken.for_user(self.user))
+        response = await self.async_client.get(
+            "/api/notifications/stream/", {"token": token}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await anext(stream)).startswith(b"retry:"))
+        broker = get_broker()
+        channel = user_channel(self.user.pk)
+        event = broker.publish([channel], "notification", {"id": 7})[0]
+        chunk = await anext(stream)
+        self.assertEqual(
+            chunk.decode(),
+            f'id: {event.id}\nevent: notification\ndata: {{"id":7}}\n\n',
+        )
+
+        # A client disconnect cancels the pending read; the stream unsubscribes.
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        pending.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await pending
+        self.assertEqual(broker.subscriber_count, 0)
+
+    def test_status_change_published_after_commit(self):
+        contract = Contract.objects.create(
+            contract_title="Office cleaning",
+            vendor_name="Acme Services",
+            contract_type=ContractType.objects.create(type_name="Service"),
+            department=Department.objects.create(name="Finance"),
+            start_date=timezone.now().date(),
+            end_date=timezone.now().date(),
+            payment_terms="installment",
+            created_by=self.user,
+        )
+        broker = get_broker()
+        with self.captureOnCommitCallbacks(execute=True):
+            contract.set_status("submitted")
+            self.assertEqual(broker.published, [])
+        self.assertEqual(
+            [(e.channel, e.type, e.data["status"]) for e in broker.published],
+            [
+                (user_channel(self.user.pk), "contract.status", "submitted"),
+                (user_channel(self.user.pk), "notification", "submitted"),
+            ],
+        )
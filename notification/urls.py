@@ -0,0 +1,13 @@
+from django.urls import path, include
+from rest_framework.routers import SimpleRouter
+
+from .views import NotificationViewSet, notification_stream
+
+router = SimpleRouter()
+router.register(r"notifications", NotificationViewSet, basename="notifications")
+
+urlpatterns = [
+    # Before the router, which would treat "stream" as a notification id
+    path("notifications/stream/", notification_stream, name="notification-stream"),
+    path("", include(router.urls)),
+]
@@ -1,3 +1,127 @@
-from django.shortcuts import render
+import json
 
-# Create your views here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework import mixins, viewsets
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from users.authentication import CachedJWTAuthentication
+from .broker import Subscription, get_broker, user_channel
+from .models import Notification
+from .pagination import NotificationPagination
+from .serializers import MarkReadSerializer, NotificationSerializer
+from .services import mark_read, unread_count
+
+
+class NotificationViewSet(
+    mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet
+):
+    """The requesting user's inbox, newest first"""
+
+    serializer_class = NotificationSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = NotificationPagination
+    filterset_fields = ["is_read", "category", "contract"]
+
+    def get_queryset(self):
+        return (
+            Notification.objects.filter(recipient=self.request.user)
+            .select_related("actor", "contract")
+            .only(
+                *(f.name for f in Notification._meta.concrete_fields),
+                "actor__full_name",
+                "actor__role",
+                "contract__contract_code",
+            )
+        )
+
+    @action(detail=False, methods=["get"], url_path="unread-count")
+    def unread_count(self, request):
+        return Response({"unread": unread_count(request.user)})
+
+    @action(detail=False, methods=["post"], url_path="mark-read")
+    def mark_read(self, request):
+        serializer = MarkReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = None if serializer.validated_data["all"] else serializer.validated_data["ids"]
+        updated = mark_read(request.user, ids)
+        return Response({"updated": updated})
+
+
+# -----------------------------
+# Live stream (Server-Sent Events, ASGI)
+# -----------------------------
+def _bearer_token(request):
+    # EventSource cannot set headers, so browsers pass ?token=<access token>.
+    header = request.headers.get("Authorization", "")
+    if header.startswith("Bearer "):
+        return header[len("Bearer ") :]
+    return request.GET.get("token")
+
+
+async def _authenticate(request):
+    raw_token = _bearer_token(request)
+    if not raw_token:
+        return None
+    authentication = CachedJWTAuthentication()
+    try:
+        validated_token = authentication.get_validated_token(raw_token)
+        return await sync_to_async(authentication.get_user)(validated_token)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+def _format_event(event):
+    data = json.dumps(event.data, cls=DjangoJSONEncoder, separators=(",", ":"))
+    return f"id: {event.id}\nevent: {event.type}\ndata: {data}\n\n"
+
+
+async def _event_stream(channels, last_event_id):
+    # Subscribing here rather than in the view ties the subscription to the
+    # response actually being consumed; the finally block runs on disconnect.
+    subscription = get_broker().subscribe(channels, last_event_id)
+    try:
+        yield f"retry: {settings.SSE_RETRY_MILLISECONDS}\n\n"
+        while True:
+            item = await subscription.get(timeout=settings.SSE_HEARTBEAT_SECONDS)
+            if item is None:
+                yield ": keep-alive\n\n"
+            elif item is Subscription.RESYNC:
+                yield "event: resync\ndata: {}\n\n"
+            else:
+                yield _format_event(item)
+    finally:
+        subscription.close()
+
+
+@require_GET
+async def notification_stream(request):
+    """
+    Contract status changes, new comments and new notifications for the
+    requesting user as ``text/event-stream``. Clients resume with the
+    ``Last-Event-ID`` header (or ``?last_event_id=``); a ``resync`` event means
+    events were missed and the inbox should be reloaded.
+    """
+    user = await _authenticate(request)
+    if user is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided or are invalid."},
+            status=401,
+        )
+    last_event_id = request.headers.get("Last-Event-ID") or request.GET.get(
+        "last_event_id"
+    )
+    response = StreamingHttpResponse(
+        _event_stream([user_channel(user.pk)], last_event_id),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # stop nginx from buffering the stream
+    return response
@@ -0,0 +1,112 @@
+"""
+Write-behind buffer for ``CustomUser.last_active``.
+
+Requests and logins only record a timestamp in process memory; a daemon
+thread flushes the buffer every ``LAST_ACTIVE_FLUSH_INTERVAL`` seconds with a
+single ``UPDATE ... FROM (VALUES ...)``, and once more when the worker exits.
+With an interval of 0 every record is written immediately (useful in tests
+and management commands).
+"""
+
+import atexit
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from .models import CustomUser
+
+logger = logging.getLogger(__name__)
+
+_pending = {}
+_lock = threading.Lock()
+_flusher = None
+
+
+def record(user_id, when=None):
+    """Remember that ``user_id`` was active at ``when`` (default: now)"""
+    when = when or timezone.now()
+    with _lock:
+        previous = _pending.get(user_id)
+        if previous is None or when > previous:
+            _pending[user_id] = when
+    if settings.LAST_ACTIVE_FLUSH_INTERVAL <= 0:
+        flush()
+    else:
+        _ensure_flusher()
+
+
+def _write(entries):
+    table = connection.ops.quote_name(CustomUser._meta.db_table)
+    values = ", ".join(["(%s::bigint, %s::timestamptz)"] * len(entries))
+    params = [value for entry in entries for value in entry]
+    sql = (
+        f"UPDATE {table} AS u SET last_active = v.ts "
+        f"FROM (VALUES {values}) AS v (id, ts) "
+        "WHERE u.id = v.id AND (u.last_active IS NULL OR u.last_active < v.ts)"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def flush():
+    """Write buffered timestamps in one statement; returns the rows updated"""
+    with _lock:
+        if not _pending:
+            return 0
+        entries = sorted(_pending.items())
+        _pending.clear()
+    try:
+        return _write(entries)
+    except Exception:
+        # Put them back (unless newer ones arrived) so the next flush retries.
+        with _lock:
+            for user_id, when in entries:
+                if user_id not in _pending or _pending[user_id] < when:
+                    _pending[user_id] = when
+        raise
+
+
+def discard():
+    """Drop buffered timestamps without writing them"""
+    with _lock:
+        _pending.clear()
+
+
+def _flush_loop(stop):
+    while not stop.wait(settings.LAST_ACTIVE_FLUSH_INTERVAL):
+        close_old_connections()
+        try:
+            flush()
+        except Exception:
+            logger.exception("Flushing last_active updates failed")
+        finally:
+            close_old_connections()
+
+
+def _flush_at_exit():
+    try:
+        flush()
+    except Exception:
+        logger.exception("Flushing last_active updates at shutdown failed")
+
+
+def _ensure_flusher():
+    global _flusher
+    pid = os.getpid()
+    if _flusher is not None and _flusher[0] == pid:
+        return
+    with _lock:
+        # A flusher started before a fork does not exist in the child.
+        if _flusher is None or _flusher[0] != pid:
+            stop = threading.Event()
+            thread = threading.Thread(
+                target=_flush_loop, args=(stop,), name="last-active-flush", daemon=True
+            )
+            thread.start()
+            atexit.register(_flush_at_exit)
+            _flusher = (pid, thread, stop)
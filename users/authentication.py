@@ -0,0 +1,105 @@
+import copy
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from CMS_Backend.db_router import reads_from_primary
+
+GENERATION_KEY = "auth:user-generation:{}"
+# Backends whose entries other processes cannot see
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+class UserCache:
+    """Bounded LRU of resolved users whose entries expire after ``ttl`` seconds"""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, generation):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, cached_generation, user = entry
+            if expires < time.monotonic() or cached_generation != generation:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return user
+
+    def set(self, key, generation, user):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, generation, user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard_user(self, user_id):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def user_cache_ttl():
+    """
+    AUTH_USER_CACHE_TTL if invalidations reach every process, otherwise a few
+    seconds: other workers would keep serving a revoked user until expiry.
+    """
+    if settings.CACHES["default"]["BACKEND"] in PROCESS_LOCAL_CACHES:
+        return min(settings.AUTH_USER_CACHE_TTL, settings.AUTH_USER_CACHE_LOCAL_TTL)
+    return settings.AUTH_USER_CACHE_TTL
+
+
+user_cache = UserCache(maxsize=settings.AUTH_USER_CACHE_SIZE, ttl=user_cache_ttl())
+
+
+def user_generation(user_id):
+    return cache.get(GENERATION_KEY.format(user_id), "0")
+
+
+def invalidate_cached_user(user_id):
+    """Drop cached copies of a user in this process and, via the shared cache, in others"""
+    user_id = str(user_id)
+    cache.set(GENERATION_KEY.format(user_id), uuid.uuid4().hex, None)
+    user_cache.discard_user(user_id)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the token's user from a per-process cache,
+    so steady-state authenticated requests do not query users_customuser.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = str(validated_token[api_settings.USER_ID_CLAIM])
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        key = (user_id, validated_token.get(api_settings.JTI_CLAIM))
+        generation = user_generation(user_id)
+        user = user_cache.get(key, generation)
+        if user is None:
+            with reads_from_primary():
+                user = super().get_user(validated_token)
+            user_cache.set(key, generation, user)
+        # Requests may modify the user they get; never hand out the shared copy.
+        return copy.copy(user)
@@ -1,5 +1,4 @@
-from django.utils import timezone
-from datetime import timedelta
+from .activity import record
 
 
 class LastActiveMiddleware:
@@ -13,11 +12,7 @@ class LastActiveMiddleware:
         if getattr(user, "is_authenticated", False) and request.path.startswith(
             "/api/"
         ):
-            # Update only if more than 1 minute has passed
-            if not user.last_active or timezone.now() - user.last_active > timedelta(
-                minutes=1
-            ):
-                user.last_active = timezone.now()
-                user.save(update_fields=["last_active"])
+            # Buffered; users.activity flushes in batches
+            record(user.pk)
 
         return response
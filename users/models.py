@@ -50,6 +50,11 @@ class CustomUser(AbstractUser):
 
     objects = CustomUserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="users_created_id_idx"),
+        ]
+
     def __str__(self):
         return f"{self.full_name} ({self.role})"
 
@@ -0,0 +1,5 @@
+from CMS_Backend.pagination import KeysetPagination
+
+
+class UserPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
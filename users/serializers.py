@@ -1,3 +1,4 @@
+from django.db import transaction
 from rest_framework import serializers
 from .models import CustomUser, Department
 
@@ -33,6 +34,7 @@ class UserSerializer(serializers.ModelSerializer):
             "password",
         ]
 
+    @transaction.atomic  # the welcome email is queued in the same transaction
     def create(self, validated_data):
         password = validated_data.pop("password")
         user = super().create(validated_data)
@@ -1,11 +1,13 @@
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
 from django.urls import reverse
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.contrib.auth.signals import user_logged_in
 from django.dispatch import receiver
-from django.utils import timezone
+from notification.outbox import enqueue_email
+from .activity import record
+from .authentication import invalidate_cached_user
 from .models import CustomUser
 
 
@@ -16,10 +18,20 @@ def send_password_reset_email(sender, instance, created, **kwargs):
         reset_url = f"{settings.FRONTEND_URL}/reset-password/{instance.pk}/{token}/"
         subject = "Set your password"
         message = f"Hi {instance.full_name},\n\nPlease set your password by clicking the link below:\n{reset_url}\n\nThis link will expire shortly."
-        send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [instance.email])
+        # Queued in the creating transaction; `manage.py send_outbox` delivers it
+        enqueue_email(subject, message, [instance.email])
 
 
 @receiver(user_logged_in)
 def update_last_active(sender, user, request, **kwargs):
-    user.last_active = timezone.now()
-    user.save(update_fields=["last_active"])
+    record(user.pk)
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def drop_cached_user(sender, instance, **kwargs):
+    """Covers profile edits, password changes/resets and deactivation"""
+    # After commit: invalidating earlier would let a concurrent request cache
+    # the old committed row under the new generation.
+    user_id = instance.pk
+    transaction.on_commit(lambda: invalidate_cached_user(user_id))
@@ -1,3 +1,96 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import activity
+from .authentication import user_cache, user_cache_ttl
+from .models import CustomUser
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.user = CustomUser.objects.create_user(
+            email="viewer@example.com",
+            password="pass1234",
+            full_name="Viewer",
+            role="legal_reviewer",
+            last_active=timezone.now(),
+        )
+        self.addCleanup(activity.discard)
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def user_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/api/departments/")
+        self.assertEqual(response.status_code, 200)
+        return [q for q in ctx.captured_queries if "users_customuser" in q["sql"]]
+
+    def test_user_loaded_once_per_token(self):
+        self.assertEqual(len(self.user_queries()), 1)
+        self.assertEqual(len(self.user_queries()), 0)
+
+    def test_save_invalidates_cached_user(self):
+        self.user_queries()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+            # Still cached until the change is committed
+            self.assertEqual(len(self.user_queries()), 0)
+        response = self.client.get("/api/departments/")
+        self.assertEqual(response.status_code, 401)
+
+
+    def test_short_ttl_without_shared_cache(self):
+        backends = "django.core.cache.backends"
+        local = {"default": {"BACKEND": f"{backends}.locmem.LocMemCache"}}
+        shared = {"default": {"BACKEND": f"{backends}.redis.RedisCache"}}
+        with override_settings(
+            CACHES=local, AUTH_USER_CACHE_TTL=300, AUTH_USER_CACHE_LOCAL_TTL=5
+        ):
+            self.assertEqual(user_cache_ttl(), 5)
+        with override_settings(CACHES=shared, AUTH_USER_CACHE_TTL=300):
+            self.assertEqual(user_cache_ttl(), 300)
+
+
+class LastActiveBufferTests(TestCase):
+    def setUp(self):
+        self.addCleanup(activity.discard)
+        self.users = [
+            CustomUser.objects.create_user(
+                email=f"user{i}@example.com",
+                password="pass1234",
+                full_name=f"User {i}",
+                role="legal_reviewer",
+            )
+            for i in range(3)
+        ]
+
+    def test_request_does_not_write_last_active(self):
+        client = APIClient()
+        client.force_authenticate(self.users[0])
+        with CaptureQueriesContext(connection) as ctx:
+            client.get("/api/departments/")
+        self.assertFalse(
+            [q for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+        )
+
+    def test_flush_writes_latest_timestamps_in_one_query(self):
+        later = timezone.now() + timedelta(hours=1)
+        for user in self.users:
+            activity.record(user.pk, later - timedelta(minutes=5))
+            activity.record(user.pk, later)
+        with self.assertNumQueries(1):
+            self.assertEqual(activity.flush(), 3)
+        for user in self.users:
+            user.refresh_from_db()
+            self.assertEqual(user.last_active, later)
+        self.assertEqual(activity.flush(), 0)
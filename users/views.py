@@ -2,14 +2,14 @@ from rest_framework import generics, filters, permissions, status, viewsets
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.utils import timezone
 
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.views import TokenObtainPairView
 
+from notification.outbox import enqueue_email
+
 from .models import CustomUser, Department
 from .serializers import (
     UserSerializer,
@@ -19,6 +19,8 @@ from .serializers import (
     DepartmentSerializer,
 )
 from .permissions import IsAdminOrReadOnly, IsAdmin
+from .pagination import UserPagination
+from .activity import record
 
 User = get_user_model()
 
@@ -29,9 +31,8 @@ User = get_user_model()
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
     def validate(self, attrs):
         data = super().validate(attrs)
-        # Update last_active immediately after successful login
-        self.user.last_active = timezone.now()
-        self.user.save(update_fields=["last_active"])
+        # Record last_active (written in the next batched flush)
+        record(self.user.pk)
         return data
 
 
@@ -43,9 +44,10 @@ class MyTokenObtainPairView(TokenObtainPairView):
 # User CRUD
 # -----------------------------
 class UserListCreateView(generics.ListCreateAPIView):
-    queryset = CustomUser.objects.all().order_by("-created_at")
+    queryset = CustomUser.objects.all().order_by("-created_at", "-id")
     serializer_class = UserSerializer
     permission_classes = [IsAdmin]
+    pagination_class = UserPagination
     filter_backends = [filters.SearchFilter, DjangoFilterBackend]
     search_fields = ["full_name", "email"]
     filterset_fields = ["role", "status"]
@@ -104,10 +106,9 @@ class ForgotPasswordView(generics.GenericAPIView):
         token = default_token_generator.make_token(user)
         reset_url = f"{settings.FRONTEND_URL}/reset-password/{user.pk}/{token}/"
 
-        send_mail(
+        enqueue_email(
             "Reset your password",
             f"Click here to reset your password: {reset_url}",
-            settings.DEFAULT_FROM_EMAIL,
             [user.email],
         )
 